@@ -1,13 +1,30 @@
-from fastapi import FastAPI, Depends, HTTPException, Query, BackgroundTasks
+from fastapi import FastAPI, Depends, HTTPException, Query, Request, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
+from fastapi.responses import Response, StreamingResponse
+from sqlalchemy import func, literal_column
+from sqlalchemy.orm import Session, Query as SAQuery
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Iterable, Iterator, List, Optional
+from datetime import datetime
+import csv
+import io
 import json
 import asyncio
+import time
+import orjson
 
-from database import get_db, Tender, TenderStatus, init_db
-from config import PORTALS
+import metrics
+from database import (
+    get_db, SessionLocal, Tender, TenderStatus, TenderFacetCount, DroppedTender, NotificationOutboxEntry,
+    Subscription, CrawlRun, FACET_COLUMNS, init_db,
+)
+from crawlers.categorizer import categorize_many, get_all_categories
+from crawlers.text_classifier import train_classifier
+from config import PORTALS, API_PROFILING, SLOW_REQUEST_MS
+from normalize import normalize_text
+from notifier import configured_channels, get_dispatcher
+import outbox
+from subscriptions import is_valid_email, load_list
 
 # FastAPI App
 app = FastAPI(
@@ -26,6 +43,28 @@ app.add_middleware(
 )
 
 
+# Request-Dauer pro Route fuer /metrics
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    start = time.perf_counter()
+    response = await call_next(request)
+    route = request.scope.get("route")
+    metrics.observe(
+        "tenderscout_http_request_duration_seconds",
+        time.perf_counter() - start,
+        method=request.method,
+        route=route.path if route else "unmatched",
+        status=str(response.status_code),
+    )
+    return response
+
+
+# Optional: SQL-Profiling pro Request (API_PROFILING=1)
+if API_PROFILING:
+    from profiling import ProfilingMiddleware
+    app.add_middleware(ProfilingMiddleware, slow_request_ms=SLOW_REQUEST_MS)
+
+
 # Pydantic Models
 class AIAnalysis(BaseModel):
     summary: Optional[str] = None
@@ -41,6 +80,9 @@ class TenderResponse(BaseModel):
     location: str
     deadline: str
     budget: Optional[str] = None
+    budgetMin: Optional[float] = None
+    budgetMax: Optional[float] = None
+    budgetCurrency: Optional[str] = None
     category: str
     description: str
     status: str
@@ -57,6 +99,34 @@ class TenderStatusUpdate(BaseModel):
     status: str
 
 
+class TenderFilter(BaseModel):
+    status: Optional[str] = None
+    search: Optional[str] = None
+    category: Optional[List[str]] = None
+    portal: Optional[List[str]] = None
+    country: Optional[str] = None
+    city: Optional[str] = None
+    deadlineFrom: Optional[str] = None  # ISO-Datum, inklusive
+    deadlineTo: Optional[str] = None  # ISO-Datum, inklusive
+    dedupe: bool = False  # Nur ein Repraesentant pro Duplikat-Cluster
+    minBudget: Optional[float] = None  # Obergrenze des Budgets >= minBudget
+    maxBudget: Optional[float] = None  # Untergrenze des Budgets <= maxBudget
+
+    def has_only_status(self) -> bool:
+        """True wenn hoechstens der Status-Filter gesetzt ist (minBudget=0 zaehlt als gesetzt)"""
+        return not self.model_dump(exclude={"status"}, exclude_defaults=True)
+
+
+class BulkStatusUpdate(BaseModel):
+    status: str
+    ids: Optional[List[str]] = None
+    filters: Optional[TenderFilter] = None
+
+
+class TenderCategoryUpdate(BaseModel):
+    category: str
+
+
 class AIAnalysisUpdate(BaseModel):
     summary: str
     relevanceScore: int
@@ -82,6 +152,9 @@ class CrawlResponse(BaseModel):
 @app.on_event("startup")
 def startup():
     init_db()
+    # Outbox auch zwischen den Crawls abarbeiten (Wiederholungen, Crawls ueber /api/crawl)
+    if configured_channels():
+        get_dispatcher()
 
 
 # Helper Functions
@@ -111,56 +184,296 @@ def tender_to_response(tender: Tender) -> dict:
         "deadline": tender.deadline,
         "publishedAt": tender.published_at if hasattr(tender, 'published_at') else None,
         "budget": tender.budget,
+        "budgetMin": tender.budget_min,
+        "budgetMax": tender.budget_max,
+        "budgetCurrency": tender.budget_currency,
         "category": tender.category,
         "description": tender.description,
         "status": tender.status.value,
         "sourceUrl": tender.source_url,
         "sourcePortal": tender.source_portal,
         "crawledAt": tender.crawled_at.isoformat() if tender.crawled_at else "",
+        "clusterId": tender.cluster_id or tender.id,
         "aiAnalysis": ai_analysis
     }
 
 
+def encode_tender(tender: Tender) -> bytes:
+    """Serialisiert einen Tender direkt zu JSON-Bytes (orjson)"""
+    return orjson.dumps(tender_to_response(tender))
+
+
+def encode_tender_list(tenders: Iterable[Tender]) -> bytes:
+    """Serialisiert eine Tender-Liste als JSON-Array aus vorab kodierten Zeilen"""
+    return b"[" + b",".join(encode_tender(t) for t in tenders) + b"]"
+
+
+class TenderJSONResponse(Response):
+    """Response fuer bereits serialisierte JSON-Bytes - ohne erneute Validierung"""
+    media_type = "application/json"
+
+
 # API Endpoints
 
-@app.get("/api/tenders", response_model=List[dict])
-def get_tenders(
+def tender_filter_params(
     status: Optional[str] = Query(None, description="Filter by status"),
     search: Optional[str] = Query(None, description="Search in title and authority"),
-    db: Session = Depends(get_db)
-):
-    """Alle Ausschreibungen abrufen"""
-    query = db.query(Tender)
-    
+    category: Optional[List[str]] = Query(None, description="Kategorie (mehrfach moeglich)"),
+    portal: Optional[List[str]] = Query(None, description="Quellportal (mehrfach moeglich)"),
+    country: Optional[str] = Query(None, description="Land, z.B. Oesterreich"),
+    city: Optional[str] = Query(None, description="Stadt"),
+    deadlineFrom: Optional[str] = Query(None, description="Frist ab (YYYY-MM-DD)"),
+    deadlineTo: Optional[str] = Query(None, description="Frist bis (YYYY-MM-DD)"),
+    dedupe: bool = Query(False, description="Nur ein Tender pro Duplikat-Cluster"),
+    minBudget: Optional[float] = Query(None, description="Budget mindestens (Obergrenze des Bereichs)"),
+    maxBudget: Optional[float] = Query(None, description="Budget hoechstens (Untergrenze des Bereichs)"),
+) -> TenderFilter:
+    """Dependency: gemeinsame Filter aus den Query-Parametern"""
+    return TenderFilter(
+        status=status, search=search, category=category, portal=portal,
+        country=country, city=city, deadlineFrom=deadlineFrom, deadlineTo=deadlineTo,
+        dedupe=dedupe, minBudget=minBudget, maxBudget=maxBudget,
+    )
+
+
+# Geschaetzter Anteil der Tenders, die einen Budget-Filter erfuellen (Hinweis fuer den Planer,
+# SQLite verlangt eine Konstante statt eines Parameters)
+BUDGET_LIKELIHOOD = literal_column("0.05")
+
+
+def apply_tender_filters(query: SAQuery, filters: TenderFilter) -> SAQuery:
+    """Wendet die gemeinsamen Listen-Filter auf eine Query an"""
     # Status Filter
-    if status and status != "ALL":
+    if filters.status and filters.status != "ALL":
         try:
-            status_enum = TenderStatus(status)
+            status_enum = TenderStatus(filters.status)
             query = query.filter(Tender.status == status_enum)
         except ValueError:
             pass
     
-    # Suche
-    if search:
-        search_term = f"%{search}%"
+    if filters.category:
+        query = query.filter(Tender.category.in_(filters.category))
+    if filters.portal:
+        query = query.filter(Tender.source_portal.in_(filters.portal))
+    if filters.country:
+        query = query.filter(Tender.location_country == filters.country)
+    if filters.city:
+        query = query.filter(Tender.location_city == filters.city)
+    
+    # Fristen sind als ISO-Datum gespeichert und damit als Text sortierbar
+    if filters.deadlineFrom:
+        query = query.filter(Tender.deadline >= filters.deadlineFrom)
+    if filters.deadlineTo:
+        query = query.filter(Tender.deadline <= filters.deadlineTo)
+    
+    # Budget-Bereich ueberlappt [minBudget, maxBudget]; ohne bekanntes Budget ausgeschlossen.
+    # Ohne Statistiken haelt SQLite Bereichsbedingungen fuer wenig selektiv und liest lieber
+    # die ganze Tabelle in Sortierreihenfolge; likelihood() markiert sie als selektiv, damit
+    # ueber ix_tenders_budget_max/_min gesucht wird (ein Status-Index bleibt vorrangig)
+    if filters.minBudget is not None:
+        query = query.filter(func.likelihood(Tender.budget_max >= filters.minBudget, BUDGET_LIKELIHOOD))
+    if filters.maxBudget is not None:
+        query = query.filter(func.likelihood(Tender.budget_min <= filters.maxBudget, BUDGET_LIKELIHOOD))
+    
+    # Duplikate: nur Repraesentanten (noch nicht indizierte Tenders zaehlen als eigener Cluster)
+    if filters.dedupe:
+        query = query.filter((Tender.cluster_id == None) | (Tender.cluster_id == Tender.id))
+    
+    # Suche auf den normalisierten Texten ("muenchen" findet "München")
+    if filters.search:
+        search_term = f"%{normalize_text(filters.search)}%"
         query = query.filter(
-            (Tender.title.ilike(search_term)) | 
-            (Tender.authority.ilike(search_term))
+            (Tender.title_norm.like(search_term)) | 
+            (Tender.authority_norm.like(search_term))
         )
     
-    # Neueste zuerst
-    tenders = query.order_by(Tender.crawled_at.desc()).all()
+    return query
+
+
+# Sortierschluessel -> Spalte
+SORT_COLUMNS = {
+    "crawledAt": Tender.crawled_at,
+    "deadline": Tender.deadline,
+    "publishedAt": Tender.published_at,
+    "title": Tender.title,
+}
+
+
+def apply_tender_sort(query: SAQuery, sort: str = "crawledAt", order: str = "desc") -> SAQuery:
+    """Sortiert nach dem gewuenschten Schluessel; ID als stabiler Tiebreaker fuer Paging"""
+    column = SORT_COLUMNS[sort]
+    if order == "asc":
+        return query.order_by(column.asc(), Tender.id.asc())
+    return query.order_by(column.desc(), Tender.id.desc())
+
+
+@app.get("/api/tenders", response_class=TenderJSONResponse)
+def get_tenders(
+    filters: TenderFilter = Depends(tender_filter_params),
+    sort: str = Query("crawledAt", pattern="^(crawledAt|deadline|publishedAt|title)$"),
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Maximale Anzahl (Paging)"),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db)
+):
+    """Alle Ausschreibungen abrufen"""
+    query = apply_tender_filters(db.query(Tender), filters)
+    
+    headers = {}
+    if limit is not None:
+        headers["X-Total-Count"] = str(query.count())
+        query = apply_tender_sort(query, sort, order).offset(offset).limit(limit)
+    else:
+        query = apply_tender_sort(query, sort, order)
+    
+    return TenderJSONResponse(encode_tender_list(query.all()), headers=headers)
+
+
+# Export
+EXPORT_BATCH_SIZE = 500
+
+EXPORT_CSV_COLUMNS = [
+    "id", "title", "authority", "location", "deadline", "publishedAt", "budget",
+    "budgetMin", "budgetMax", "budgetCurrency",
+    "category", "description", "status", "sourceUrl", "sourcePortal", "crawledAt",
+    "aiRelevanceScore", "aiRecommendation",
+]
+
+
+def iter_export_tenders(filters: TenderFilter) -> Iterator[Tender]:
+    """
+    Liefert gefilterte Tenders zeilenweise ueber einen serverseitigen Cursor.
+    
+    Nutzt eine eigene Session, da der Stream erst nach dem Ende des
+    Request-Handlers gelesen wird. Dank yield_per bleiben nur
+    EXPORT_BATCH_SIZE Objekte gleichzeitig im Speicher.
+    """
+    db = SessionLocal()
+    try:
+        query = apply_tender_filters(db.query(Tender), filters)
+        query = apply_tender_sort(query).yield_per(EXPORT_BATCH_SIZE)
+        for tender in query:
+            yield tender
+    finally:
+        db.close()
+
+
+def stream_ndjson(tenders: Iterator[Tender]) -> Iterator[bytes]:
+    """Kodiert Tenders als NDJSON, gebuendelt in Bloecken"""
+    chunk = []
+    for tender in tenders:
+        chunk.append(encode_tender(tender))
+        if len(chunk) >= EXPORT_BATCH_SIZE:
+            yield b"\n".join(chunk) + b"\n"
+            chunk = []
+    if chunk:
+        yield b"\n".join(chunk) + b"\n"
+
+
+def stream_csv(tenders: Iterator[Tender]) -> Iterator[bytes]:
+    """Kodiert Tenders als CSV (Semikolon, UTF-8 mit BOM fuer Excel)"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, delimiter=";")
+    buffer.write("\ufeff")
+    writer.writerow(EXPORT_CSV_COLUMNS)
     
-    return [tender_to_response(t) for t in tenders]
+    for i, tender in enumerate(tenders, 1):
+        row = tender_to_response(tender)
+        ai_analysis = row["aiAnalysis"] or {}
+        row["aiRelevanceScore"] = ai_analysis.get("relevanceScore")
+        row["aiRecommendation"] = ai_analysis.get("recommendation")
+        writer.writerow([row.get(column) for column in EXPORT_CSV_COLUMNS])
+        
+        if i % EXPORT_BATCH_SIZE == 0:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate(0)
+    
+    yield buffer.getvalue().encode("utf-8")
 
 
-@app.get("/api/tenders/{tender_id}", response_model=dict)
+@app.get("/api/tenders/export")
+def export_tenders(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="ndjson oder csv"),
+    filters: TenderFilter = Depends(tender_filter_params),
+):
+    """Alle (gefilterten) Ausschreibungen als Stream exportieren"""
+    tenders = iter_export_tenders(filters)
+    filename = f"tenders_{datetime.now().strftime('%Y%m%d')}.{format}"
+    
+    if format == "csv":
+        content, media_type = stream_csv(tenders), "text/csv; charset=utf-8"
+    else:
+        content, media_type = stream_ndjson(tenders), "application/x-ndjson"
+    
+    return StreamingResponse(
+        content,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@app.get("/api/tenders/{tender_id}", response_class=TenderJSONResponse)
 def get_tender(tender_id: str, db: Session = Depends(get_db)):
     """Einzelne Ausschreibung abrufen"""
     tender = db.query(Tender).filter(Tender.id == tender_id).first()
     if not tender:
         raise HTTPException(status_code=404, detail="Tender nicht gefunden")
-    return tender_to_response(tender)
+    return TenderJSONResponse(encode_tender(tender))
+
+
+# SQLite erlaubt nur begrenzt viele Parameter pro Statement
+BULK_CHUNK_SIZE = 500
+
+
+@app.put("/api/tenders/status")
+def bulk_update_tender_status(update: BulkStatusUpdate, db: Session = Depends(get_db)):
+    """Status mehrerer Ausschreibungen in einer Transaktion ändern"""
+    try:
+        new_status = TenderStatus(update.status)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Ungültiger Status")
+    
+    # Ein leerer Filter wuerde alle Ausschreibungen treffen
+    if update.ids is None and (update.filters is None or not update.filters.model_dump(exclude_defaults=True)):
+        raise HTTPException(status_code=400, detail="ids oder mindestens ein Filter erforderlich")
+    
+    # Ziel-IDs bestimmen (explizite Liste oder Filter)
+    if update.ids is not None:
+        requested = list(dict.fromkeys(update.ids))
+        existing = set()
+        for i in range(0, len(requested), BULK_CHUNK_SIZE):
+            chunk = requested[i:i + BULK_CHUNK_SIZE]
+            existing.update(
+                row.id for row in db.query(Tender.id).filter(Tender.id.in_(chunk))
+            )
+    else:
+        query = apply_tender_filters(db.query(Tender.id), update.filters)
+        requested = [row.id for row in query]
+        existing = set(requested)
+    
+    target_ids = [tender_id for tender_id in requested if tender_id in existing]
+    
+    try:
+        for i in range(0, len(target_ids), BULK_CHUNK_SIZE):
+            chunk = target_ids[i:i + BULK_CHUNK_SIZE]
+            db.query(Tender).filter(Tender.id.in_(chunk)).update(
+                {Tender.status: new_status}, synchronize_session=False
+            )
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    
+    return {
+        "message": "Status aktualisiert",
+        "status": update.status,
+        "updated": len(target_ids),
+        "results": {
+            tender_id: "updated" if tender_id in existing else "not_found"
+            for tender_id in requested
+        },
+    }
 
 
 @app.put("/api/tenders/{tender_id}/status")
@@ -202,6 +515,128 @@ def update_tender_analysis(
     return {"message": "Analyse gespeichert"}
 
 
+@app.put("/api/tenders/{tender_id}/category")
+def update_tender_category(
+    tender_id: str,
+    update: TenderCategoryUpdate,
+    db: Session = Depends(get_db)
+):
+    """Kategorie korrigieren - dient als Trainingsdatum fuer das Kategorie-Modell"""
+    if update.category not in get_all_categories():
+        raise HTTPException(status_code=400, detail="Ungültige Kategorie")
+    
+    tender = db.query(Tender).filter(Tender.id == tender_id).first()
+    if not tender:
+        raise HTTPException(status_code=404, detail="Tender nicht gefunden")
+    
+    tender.category = update.category
+    tender.category_corrected = True
+    db.commit()
+    return {"message": "Kategorie aktualisiert", "category": update.category}
+
+
+@app.post("/api/categories/retrain")
+def retrain_categories(db: Session = Depends(get_db)):
+    """
+    Trainiert das Kategorie-Modell mit allen korrigierten Kategorien und
+    kategorisiert alle nicht korrigierten Ausschreibungen neu.
+    """
+    corrected = db.query(Tender.title_norm, Tender.description_norm, Tender.category).filter(
+        Tender.category_corrected == True
+    ).all()
+    errors = train_classifier(
+        [(row.title_norm, row.description_norm) for row in corrected],
+        [row.category for row in corrected],
+    )
+    
+    changed = {}
+    query = db.query(Tender.id, Tender.title_norm, Tender.description_norm, Tender.category).filter(
+        (Tender.category_corrected == False) | (Tender.category_corrected == None)
+    )
+    rows = query.all()
+    for i in range(0, len(rows), BULK_CHUNK_SIZE):
+        chunk = rows[i:i + BULK_CHUNK_SIZE]
+        categories = categorize_many(
+            [(row.title_norm, row.description_norm) for row in chunk], normalized=True
+        )
+        for row, category in zip(chunk, categories):
+            if category != row.category:
+                changed.setdefault(category, []).append(row.id)
+    
+    try:
+        for category, ids in changed.items():
+            for i in range(0, len(ids), BULK_CHUNK_SIZE):
+                db.query(Tender).filter(Tender.id.in_(ids[i:i + BULK_CHUNK_SIZE])).update(
+                    {Tender.category: category}, synchronize_session=False
+                )
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    
+    return {
+        "message": "Kategorie-Modell trainiert",
+        "trainingSamples": len(corrected),
+        "trainingErrors": errors,
+        "recategorized": sum(len(ids) for ids in changed.values()),
+    }
+
+
+# Facetten: DB-Spalte -> Feldname in der Response
+FACET_FIELDS = {
+    "category": "category",
+    "source_portal": "sourcePortal",
+    "location_country": "locationCountry",
+    "location_city": "locationCity",
+    "status": "status",
+}
+
+
+@app.get("/api/facets")
+def get_facets(
+    filters: TenderFilter = Depends(tender_filter_params),
+    db: Session = Depends(get_db)
+):
+    """Anzahl Ausschreibungen pro Kategorie, Portal, Land, Stadt und Status"""
+    counts = {column: {} for column in FACET_COLUMNS}
+    status = filters.status
+    
+    if not filters.has_only_status():
+        # Freie Filter: direkt ueber die gefilterte Menge zaehlen
+        filtered = apply_tender_filters(db.query(Tender), filters).subquery()
+        for column in FACET_COLUMNS:
+            facet_column = filtered.c[column]
+            for value, count in db.query(facet_column, func.count()).group_by(facet_column):
+                if isinstance(value, TenderStatus):
+                    value = value.value
+                counts[column][value or ""] = count
+    else:
+        # Ohne weitere Filter: vorberechnete Zaehler (optional nach Status)
+        query = db.query(
+            TenderFacetCount.facet, TenderFacetCount.value, func.sum(TenderFacetCount.count)
+        )
+        if status and status != "ALL":
+            try:
+                query = query.filter(TenderFacetCount.status == TenderStatus(status).name)
+            except ValueError:
+                pass
+        for facet, value, count in query.group_by(TenderFacetCount.facet, TenderFacetCount.value):
+            counts[facet][value] = count
+    
+    # Alle Kategorien anzeigen, auch ohne Treffer
+    for category in get_all_categories():
+        counts["category"].setdefault(category, 0)
+    
+    return {
+        FACET_FIELDS[column]: [
+            {"value": value or None, "count": count}
+            for value, count in sorted(values.items(), key=lambda item: (-item[1], item[0]))
+            if count > 0 or column == "category"
+        ]
+        for column, values in counts.items()
+    }
+
+
 @app.get("/api/stats", response_model=StatsResponse)
 def get_stats(db: Session = Depends(get_db)):
     """Dashboard-Statistiken"""
@@ -227,6 +662,153 @@ def get_stats(db: Session = Depends(get_db)):
     )
 
 
+@app.get("/api/notifications/outbox")
+def get_notification_outbox(
+    status: Optional[str] = Query(None, description="pending, sending, sent oder failed"),
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db),
+):
+    """Benachrichtigungen der Outbox (Standard: alle ausser verschickten), neueste zuerst"""
+    query = db.query(NotificationOutboxEntry)
+    if status:
+        if status not in outbox.STATUSES:
+            raise HTTPException(status_code=400, detail=f"Ungueltiger Status: {status}")
+        query = query.filter(NotificationOutboxEntry.status == status)
+    else:
+        query = query.filter(NotificationOutboxEntry.status != outbox.STATUS_SENT)
+    
+    entries = query.order_by(NotificationOutboxEntry.created_at.desc()).limit(limit)
+    return {
+        "counts": outbox.status_counts(db),
+        "entries": [
+            {
+                "id": entry.id,
+                "channel": entry.channel,
+                "recipient": entry.recipient,
+                "status": entry.status,
+                "attempts": entry.attempts,
+                "lastError": entry.last_error,
+                "createdAt": entry.created_at.isoformat() if entry.created_at else None,
+                "nextAttemptAt": entry.next_attempt_at.isoformat() if entry.next_attempt_at else None,
+                "sentAt": entry.sent_at.isoformat() if entry.sent_at else None,
+            }
+            for entry in entries
+        ],
+    }
+
+
+@app.post("/api/notifications/outbox/{entry_id}/retry")
+def retry_notification(entry_id: int, db: Session = Depends(get_db)):
+    """Fehlgeschlagene Benachrichtigung erneut versuchen"""
+    if not outbox.retry(db, entry_id):
+        raise HTTPException(status_code=404, detail="Keine fehlgeschlagene Benachrichtigung mit dieser ID")
+    if configured_channels():
+        get_dispatcher().wake()
+    return {"message": "Benachrichtigung wird erneut versucht", "id": entry_id}
+
+
+class SubscriptionModel(BaseModel):
+    recipient: str
+    keywords: List[str] = []
+    categories: List[str] = []
+    regions: List[str] = []  # Stadt, Region oder Land
+    minBudget: Optional[float] = None
+    active: bool = True
+
+
+def subscription_to_response(subscription: Subscription) -> dict:
+    return {
+        "id": subscription.id,
+        "recipient": subscription.recipient,
+        "keywords": load_list(subscription.keywords),
+        "categories": load_list(subscription.categories),
+        "regions": load_list(subscription.regions),
+        "minBudget": subscription.min_budget,
+        "active": subscription.active,
+        "createdAt": subscription.created_at.isoformat() if subscription.created_at else None,
+    }
+
+
+def apply_subscription(subscription: Subscription, data: SubscriptionModel):
+    """Uebernimmt validierte Werte aus dem Request"""
+    if not is_valid_email(data.recipient.strip()):
+        # Sonst bliebe die Benachrichtigung bis OUTBOX_MAX_ATTEMPTS in der Outbox
+        raise HTTPException(status_code=400, detail=f"Ungueltige E-Mail-Adresse: {data.recipient}")
+    unknown = set(data.categories) - set(get_all_categories())
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unbekannte Kategorie: {', '.join(sorted(unknown))}")
+    subscription.recipient = data.recipient.strip()
+    subscription.keywords = json.dumps([k.strip() for k in data.keywords if k.strip()], ensure_ascii=False)
+    subscription.categories = json.dumps(data.categories, ensure_ascii=False)
+    subscription.regions = json.dumps([r.strip() for r in data.regions if r.strip()], ensure_ascii=False)
+    subscription.min_budget = data.minBudget
+    subscription.active = data.active
+
+
+@app.get("/api/subscriptions")
+def get_subscriptions(recipient: Optional[str] = None, db: Session = Depends(get_db)):
+    """Abos fuer die Benachrichtigung ueber neue Ausschreibungen"""
+    query = db.query(Subscription)
+    if recipient:
+        query = query.filter(Subscription.recipient == recipient)
+    return [subscription_to_response(s) for s in query.order_by(Subscription.recipient, Subscription.id)]
+
+
+@app.post("/api/subscriptions")
+def create_subscription(data: SubscriptionModel, db: Session = Depends(get_db)):
+    """Neues Abo anlegen"""
+    subscription = Subscription()
+    apply_subscription(subscription, data)
+    db.add(subscription)
+    db.commit()
+    return subscription_to_response(subscription)
+
+
+@app.put("/api/subscriptions/{subscription_id}")
+def update_subscription(subscription_id: int, data: SubscriptionModel, db: Session = Depends(get_db)):
+    """Abo aendern"""
+    subscription = db.query(Subscription).filter(Subscription.id == subscription_id).first()
+    if not subscription:
+        raise HTTPException(status_code=404, detail="Abo nicht gefunden")
+    apply_subscription(subscription, data)
+    db.commit()
+    return subscription_to_response(subscription)
+
+
+@app.delete("/api/subscriptions/{subscription_id}")
+def delete_subscription(subscription_id: int, db: Session = Depends(get_db)):
+    """Abo loeschen"""
+    deleted = db.query(Subscription).filter(Subscription.id == subscription_id).delete()
+    db.commit()
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Abo nicht gefunden")
+    return {"message": "Abo geloescht"}
+
+
+@app.get("/api/dropped")
+def get_dropped_tenders(
+    portal: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db),
+):
+    """Vom Relevanzfilter verworfene Ausschreibungen (neueste zuerst)"""
+    query = db.query(DroppedTender)
+    if portal:
+        query = query.filter(DroppedTender.source_portal == portal)
+    return [
+        {
+            "id": dropped.id,
+            "sourcePortal": dropped.source_portal,
+            "title": dropped.title,
+            "sourceUrl": dropped.source_url,
+            "stage": dropped.stage,
+            "reason": dropped.reason,
+            "droppedAt": dropped.dropped_at.isoformat() if dropped.dropped_at else None,
+        }
+        for dropped in query.order_by(DroppedTender.dropped_at.desc()).limit(limit)
+    ]
+
+
 @app.get("/api/portals")
 def get_portals():
     """Liste aller konfigurierten Portale"""
@@ -380,7 +962,8 @@ def get_settings():
 @app.post("/api/settings")
 def update_settings(settings: SettingsModel):
     """Crawler-Einstellungen speichern"""
-    settings_dict = settings.dict()
+    # Nicht im Formular enthaltene Eintraege (customPortals, schedules) bleiben erhalten
+    settings_dict = {**load_settings(), **settings.dict()}
     save_settings_to_file(settings_dict)
     return {"message": "Einstellungen gespeichert"}
 
@@ -510,6 +1093,40 @@ def get_crawl_status_endpoint():
     return get_crawl_status()
 
 
+@app.get("/api/crawl/runs")
+def get_crawl_runs(
+    portal: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db),
+):
+    """Crawl-Historie der Scheduler-Laeufe (neueste zuerst), Grundlage des adaptiven Takts"""
+    query = db.query(CrawlRun)
+    if portal:
+        query = query.filter(CrawlRun.source_portal == portal)
+    return [
+        {
+            "id": run.id,
+            "sourcePortal": run.source_portal,
+            "startedAt": run.started_at.isoformat(),
+            "finishedAt": run.finished_at.isoformat(),
+            "result": run.result,
+            "tendersFound": run.tenders_found,
+            "tendersNew": run.tenders_new,
+            "pagesFetched": run.pages_fetched,
+        }
+        for run in query.order_by(CrawlRun.started_at.desc()).limit(limit)
+    ]
+
+
+@app.get("/metrics")
+def get_metrics():
+    """Metriken im Prometheus-Textformat"""
+    return Response(
+        content=metrics.render_latest(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
 # Health Check
 @app.get("/api/health")
 def health_check():
@@ -0,0 +1,251 @@
+"""
+Wendet die aktuellen Extraktoren auf alle gespeicherten Tenders an.
+
+Ausführen mit: cd backend && python backfill.py [--workers N] [--batch-size N] [--restart]
+
+Nach Verbesserungen an Ortserkennung, Budget-Parser, Normalisierung oder
+Kategorisierung muessen bestehende Tenders nicht neu gecrawlt werden:
+- Ort und Budget werden aus der gespeicherten Rohseite (crawlers/snapshot_store.py)
+  neu extrahiert, ohne Snapshot aus Titel/Auftraggeber bzw. dem Budget-Text
+- Normalisierte Texte und Kategorie werden neu berechnet
+  (manuell korrigierte Kategorien bleiben); Tenders mit geaenderten Texten
+  werden danach den Duplikat-Clustern neu zugeordnet
+
+Die Tenders werden in Batches nach ID gelesen und in einem Prozess-Pool
+verarbeitet; jeder Batch wird im Hauptprozess in einer Transaktion
+geschrieben (auch die neuen Eintraege des Kategorie-Caches - die Worker
+lesen nur, damit sich keine Schreibvorgaenge auf SQLite sperren). Nach jedem
+Batch wird die letzte ID in BACKFILL_CHECKPOINT gespeichert - ein
+abgebrochener Lauf setzt dort fort (--restart beginnt von vorn).
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+backend_dir = os.path.dirname(os.path.abspath(__file__))
+if backend_dir not in sys.path:
+    sys.path.insert(0, backend_dir)
+
+from sqlalchemy import update
+
+from budget import parse_budget
+from crawlers.dedup import index_unclustered
+from crawlers.extract import extract_page_fields
+from crawlers.gazetteer import find_place
+from crawlers.snapshot_store import load_snapshot
+from crawlers import category_cache
+from crawlers.categorizer import categorize_many
+from database import SessionLocal, Tender, COUNTRY_NAMES, engine, split_location, init_db
+from normalize import normalize_text
+
+
+BACKFILL_CHECKPOINT = os.path.join(backend_dir, "backfill_checkpoint.json")
+DEFAULT_BATCH_SIZE = 500
+
+_NORM_COLUMNS = {"title_norm", "authority_norm", "description_norm"}
+
+# Spalten, die ein Worker liest
+_COLUMNS = [
+    Tender.id, Tender.title, Tender.authority, Tender.description, Tender.location,
+    Tender.budget, Tender.category, Tender.category_corrected, Tender.snapshot_hash,
+    Tender.title_norm, Tender.authority_norm, Tender.description_norm,
+    Tender.location_city, Tender.location_country,
+    Tender.budget_min, Tender.budget_max, Tender.budget_currency,
+]
+
+
+def _relocate(location: str, city: str, country: str) -> str:
+    """Ersetzt die Stadt in "Stadt, Region"; das Land der Detailseite ersetzt nur ein Land"""
+    old_city, _ = split_location(location)
+    region = location.split(",", 1)[1].strip() if old_city and "," in location else (location or "")
+    if country and (not region or region in COUNTRY_NAMES):
+        region = country
+    return f"{city}, {region}" if region else city
+
+
+def extract_row(row: dict) -> dict:
+    """Neue Werte fuer einen Tender (ohne Kategorie)"""
+    result = {
+        "title_norm": normalize_text(row["title"]),
+        "authority_norm": normalize_text(row["authority"]),
+        "description_norm": normalize_text(row["description"]),
+        "location": row["location"],
+        "budget": row["budget"],
+    }
+
+    snapshot = load_snapshot(row["snapshot_hash"])
+    fields = extract_page_fields(snapshot["text"]) if snapshot else {}
+
+    # Ort: Detailseite, sonst Titel bzw. Auftraggeber (wie die Crawler)
+    city, country = fields.get("location"), fields.get("country")
+    if not city:
+        place = find_place(row["title"]) or find_place(row["authority"])
+        if place:
+            city, country = place.city, place.country
+    if city:
+        result["location"] = _relocate(row["location"], city, country)
+
+    if fields.get("budget"):
+        result["budget"] = fields["budget"]
+
+    result["location_city"], result["location_country"] = split_location(result["location"])
+    budget = parse_budget(result["budget"])
+    result["budget_min"], result["budget_max"], result["budget_currency"] = budget or (None, None, None)
+    return result
+
+
+def process_batch(rows: list) -> tuple:
+    """
+    Worker: extrahiert und kategorisiert einen Batch (ohne zu schreiben).
+    Returns:
+        (ein Dict pro geaendertem Tender mit id + geaenderten Spalten,
+         neue Eintraege fuer den Kategorie-Cache)
+    """
+    results = [extract_row(row) for row in rows]
+
+    # Ueber den Kategorie-Cache: der naechste Crawl findet die Ergebnisse dort
+    recategorize = [i for i, row in enumerate(rows) if not row["category_corrected"]]
+    cache_entries = []
+    categories = categorize_many(
+        [(results[i]["title_norm"], results[i]["description_norm"]) for i in recategorize],
+        normalized=True, new_entries=cache_entries,
+    )
+    for i, category in zip(recategorize, categories):
+        results[i]["category"] = category
+
+    changes = []
+    for row, result in zip(rows, results):
+        changed = {key: value for key, value in result.items() if row[key] != value}
+        if changed:
+            if changed.keys() & _NORM_COLUMNS:
+                # Signatur beruht auf den normalisierten Texten - neu clustern
+                changed["minhash"] = None
+            changed["id"] = row["id"]
+            changes.append(changed)
+    return changes, cache_entries
+
+
+def _init_worker():
+    """Geerbte Verbindungen des Elternprozesses nicht weiterverwenden (Worker lesen den Cache)"""
+    engine.dispose(close=False)
+
+
+def load_checkpoint() -> dict:
+    if os.path.exists(BACKFILL_CHECKPOINT):
+        with open(BACKFILL_CHECKPOINT, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return {"last_id": "", "processed": 0, "updated": 0}
+
+
+def save_checkpoint(checkpoint: dict):
+    tmp_path = f"{BACKFILL_CHECKPOINT}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp_path, BACKFILL_CHECKPOINT)
+
+
+def read_batches(last_id: str, batch_size: int):
+    """
+    Liest Tenders als Dicts in ID-Reihenfolge (Keyset-Paging ab last_id).
+    Eine Session pro Batch, damit keine Lesetransaktion die Schreibvorgaenge blockiert.
+    """
+    while True:
+        db = SessionLocal()
+        try:
+            rows = db.query(*_COLUMNS).filter(Tender.id > last_id).order_by(Tender.id).limit(batch_size).all()
+        finally:
+            db.close()
+        if not rows:
+            return
+        yield [row._asdict() for row in rows]
+        last_id = rows[-1].id
+
+
+def write_changes(changes: list):
+    """Schreibt einen Batch in einer Transaktion (Bulk-UPDATE nach Primaerschluessel)"""
+    if not changes:
+        return
+    # Gleiche Spaltenmenge je executemany
+    groups = {}
+    for change in changes:
+        groups.setdefault(frozenset(change), []).append(change)
+
+    db = SessionLocal()
+    try:
+        for group in groups.values():
+            db.execute(update(Tender), group)
+        db.commit()
+    finally:
+        db.close()
+
+
+def run_backfill(workers: int = None, batch_size: int = DEFAULT_BATCH_SIZE, restart: bool = False) -> dict:
+    init_db()
+    if restart and os.path.exists(BACKFILL_CHECKPOINT):
+        os.remove(BACKFILL_CHECKPOINT)
+    checkpoint = load_checkpoint()
+    if checkpoint["last_id"]:
+        print(f"Setze nach ID {checkpoint['last_id']} fort ({checkpoint['processed']} bereits verarbeitet)")
+
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    processed_at_start = checkpoint["processed"]
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        # Batches in Reihenfolge schreiben, damit der Checkpoint nur nach vorn wandert
+        pending = deque()
+        batches = read_batches(checkpoint["last_id"], batch_size)
+        exhausted = False
+        while pending or not exhausted:
+            while not exhausted and len(pending) < workers * 2:
+                rows = next(batches, None)
+                if rows is None:
+                    exhausted = True
+                    break
+                pending.append((rows[-1]["id"], len(rows), pool.submit(process_batch, rows)))
+            if not pending:
+                break
+
+            last_id, count, future = pending.popleft()
+            changes, cache_entries = future.result()
+            category_cache.store_entries(cache_entries)
+            write_changes(changes)
+
+            checkpoint["last_id"] = last_id
+            checkpoint["processed"] += count
+            checkpoint["updated"] += len(changes)
+            save_checkpoint(checkpoint)
+
+            elapsed = time.perf_counter() - start
+            rate = (checkpoint["processed"] - processed_at_start) / elapsed if elapsed else 0
+            print(f"  {checkpoint['processed']} verarbeitet, {checkpoint['updated']} aktualisiert ({rate:.0f}/s)")
+
+    # Tenders mit geaenderten Texten den Duplikat-Clustern neu zuordnen
+    db = SessionLocal()
+    try:
+        index_unclustered(db)
+        db.commit()
+    finally:
+        db.close()
+
+    print(f"Backfill abgeschlossen: {checkpoint['processed']} Tenders, {checkpoint['updated']} aktualisiert")
+    if os.path.exists(BACKFILL_CHECKPOINT):
+        os.remove(BACKFILL_CHECKPOINT)
+    return checkpoint
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extraktoren auf gespeicherte Tenders anwenden")
+    parser.add_argument("--workers", type=int, default=None, help="Anzahl Prozesse (Standard: alle Kerne)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--restart", action="store_true", help="Checkpoint verwerfen und von vorn beginnen")
+    args = parser.parse_args()
+    run_backfill(args.workers, args.batch_size, args.restart)
+
+
+if __name__ == "__main__":
+    main()
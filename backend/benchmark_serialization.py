@@ -0,0 +1,90 @@
+"""
+Benchmark: Serialisierung der Tender-Liste (alter Pfad vs. orjson)
+
+Ausführen mit: cd backend && python benchmark_serialization.py [anzahl]
+
+Alter Pfad: response_model=List[dict] -> Pydantic-Validierung,
+jsonable_encoder und json.dumps (wie FastAPI/Starlette JSONResponse).
+Neuer Pfad: vorab kodierte Zeilen mit orjson (encode_tender_list).
+"""
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from typing import List
+
+backend_dir = os.path.dirname(os.path.abspath(__file__))
+if backend_dir not in sys.path:
+    sys.path.insert(0, backend_dir)
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from api import encode_tender_list, tender_to_response
+from database import Tender, TenderStatus
+
+
+def make_tenders(count: int) -> list:
+    """Erzeugt Test-Tenders (nicht in der Datenbank)"""
+    return [
+        Tender(
+            id=f"bench_{i}",
+            title=f"Straßenbau Ortsdurchfahrt Abschnitt {i} - Asphaltierung und Pflasterarbeiten",
+            authority="Stadt München - Baureferat",
+            location="München, Deutschland",
+            deadline="2025-06-15",
+            published_at="2025-05-01",
+            budget="ca. 250.000 EUR",
+            category="Strassenbau",
+            description="Erneuerung der Fahrbahn und Gehwege. " * 40,
+            status=TenderStatus.NEW,
+            source_url=f"https://example.com/tender/{i}",
+            source_portal="tender24.de",
+            crawled_at=datetime(2025, 5, 1, 6, 0),
+            ai_summary="Zusammenfassung" if i % 3 == 0 else None,
+            ai_key_risks='["Frist knapp", "Hohe Auflagen"]' if i % 3 == 0 else None,
+        )
+        for i in range(count)
+    ]
+
+
+def old_path(tenders: list) -> bytes:
+    """Serialisierung wie bisher ueber response_model=List[dict]"""
+    content = [tender_to_response(t) for t in tenders]
+    validated = TypeAdapter(List[dict]).validate_python(content)
+    encoded = jsonable_encoder(validated)
+    return json.dumps(
+        encoded, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def new_path(tenders: list) -> bytes:
+    """Serialisierung ueber vorab kodierte orjson-Zeilen"""
+    return encode_tender_list(tenders)
+
+
+def measure(func, tenders: list, repeat: int = 5) -> float:
+    """Gibt die beste Laufzeit in Millisekunden zurueck"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(tenders)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    tenders = make_tenders(count)
+
+    # Beide Pfade muessen dasselbe JSON liefern
+    assert json.loads(old_path(tenders[:50])) == json.loads(new_path(tenders[:50]))
+
+    old_ms = measure(old_path, tenders)
+    new_ms = measure(new_path, tenders)
+
+    print(f"Serialisierung von {count} Tenders:")
+    print(f"  Alter Pfad (List[dict] + json): {old_ms:8.1f} ms")
+    print(f"  Neuer Pfad (orjson, vorab):     {new_ms:8.1f} ms")
+    print(f"  Faktor: {old_ms / new_ms:.1f}x")
@@ -0,0 +1,166 @@
+"""
+Budget-Erkennung fuer Ausschreibungen.
+
+parse_budget() wandelt Freitext wie "ca. 250.000 EUR", "1,2 Mio. €" oder
+"100.000 - 250.000 CHF" in einen Bereich (min, max, Waehrung) um.
+find_budget() sucht den Budget-Text in der Detailseite (nach Stichworten
+wie "Auftragswert" oder "Schätzwert" und nur mit Waehrungsangabe).
+
+Betraege mit Waehrung haben Vorrang vor blossen Zahlen (Laufzeiten,
+Losnummern, Jahreszahlen); Datumsangaben sind nie ein Betrag.
+
+Einzelwerte und offene Angaben ("bis 500.000 EUR", "ab 1 Mio. €") werden
+als min = max gespeichert, damit beide Spalten fuer Bereichsfilter gesetzt sind.
+"""
+import re
+from typing import NamedTuple, Optional
+
+from normalize import fold_text
+
+
+class Budget(NamedTuple):
+    min: float
+    max: float
+    currency: Optional[str]  # EUR, CHF oder None wenn nicht angegeben
+
+
+_CURRENCIES = {
+    "eur": "EUR", "euro": "EUR", "€": "EUR",
+    "chf": "CHF", "fr.": "CHF", "sfr.": "CHF",
+}
+
+_MULTIPLIERS = {
+    "tsd": 1e3, "tausend": 1e3, "t": 1e3,
+    "mio": 1e6, "million": 1e6, "millionen": 1e6,
+    "mrd": 1e9, "milliarde": 1e9, "milliarden": 1e9,
+}
+
+# 1.250.000,00 | 1'250'000 | 1 250 000 | 250000 | 1,2 | 1.2
+_NUMBER = r"\d{1,3}(?:[.' ]\d{3})+(?:,\d{1,2})?|\d+(?:[.,]\d+)?"
+_AMOUNT = re.compile(
+    rf"(?P<number>{_NUMBER})\s*"
+    r"(?P<multiplier>Mio\.?|Millionen|Million|Mrd\.?|Milliarden|Milliarde|Tsd\.?|Tausend|T(?=EUR|€))?\s*"
+    r"(?P<currency>EUR\b|Euro\b|€|CHF\b|S?Fr\.)?",
+    re.IGNORECASE,
+)
+_CURRENCY_PREFIX = re.compile(r"(EUR|Euro|€|CHF|S?Fr\.)\s*$", re.IGNORECASE)
+_RANGE_SEPARATOR = re.compile(r"^\s*(?:-|bis|und)\s*$", re.IGNORECASE)
+_THOUSANDS = re.compile(r"^\d{1,3}(?:[.' ]\d{3})+(?:,\d{1,2})?$")
+_DATE = re.compile(r"(?<![\d.])\d{1,2}\.\d{1,2}\.(?:\d{4}|\d{2})(?![\d.])")
+
+# Stichworte vor dem Budget in Detailseiten (Text mit fold_text, also ae/oe/ue)
+_BUDGET_LABEL = re.compile(
+    r"(?:Auftragswert|Gesamtwert|Schaetzwert|geschaetzte[rn]? (?:Wert|Kosten|Auftragswert)"
+    r"|Kostenschaetzung|Auftragsvolumen|Budget|Baukosten|Volumen)\s*[:-]?",
+    re.IGNORECASE,
+)
+_LABEL_WINDOW = 80  # Zeichen nach dem Stichwort, in denen der Betrag stehen muss
+
+
+class _Amount(NamedTuple):
+    start: int  # inklusive vorangestellter Waehrung
+    end: int
+    value: float  # ohne Multiplikator
+    multiplier: float  # 1 wenn nicht angegeben
+    currency: Optional[str]
+
+
+def _parse_number(number: str) -> Optional[float]:
+    """ "1.250.000,00" -> 1250000.0, "1,2" -> 1.2, "1.2" -> 1.2"""
+    if _THOUSANDS.match(number):
+        number = re.sub(r"[.' ]", "", number)
+    try:
+        return float(number.replace(",", "."))
+    except ValueError:
+        return None
+
+
+def _amounts(text: str) -> list:
+    """Alle Betraege im (mit fold_text vereinheitlichten) Text, ohne Datumsangaben"""
+    dates = [(date.start(), date.end()) for date in _DATE.finditer(text)]
+    amounts = []
+    previous_end = 0
+    for match in _AMOUNT.finditer(text):
+        if any(start <= match.start() < end for start, end in dates):
+            continue
+        value = _parse_number(match.group("number"))
+        if value is None:
+            continue
+        multiplier = (match.group("multiplier") or "").rstrip(".").lower()
+        currency = match.group("currency")
+        start = match.start()
+        if not currency:
+            # Waehrung vorangestellt: "EUR 250.000"
+            prefix = _CURRENCY_PREFIX.search(text, previous_end, match.start())
+            if prefix:
+                currency = prefix.group(1)
+                start = prefix.start()
+        previous_end = match.end()
+        amounts.append(_Amount(
+            start, match.end(), value,
+            _MULTIPLIERS[multiplier] if multiplier else 1.0,
+            _CURRENCIES.get(currency.lower()) if currency else None,
+        ))
+    return amounts
+
+
+def parse_budget(text: str) -> Optional[Budget]:
+    """Budget-Bereich aus Freitext oder None wenn kein Betrag erkennbar ist"""
+    text = fold_text(text or "")
+    amounts = _amounts(text)
+    if not amounts:
+        return None
+
+    first, second = _range(text, amounts)
+    low = high = first.value * first.multiplier
+    currency = first.currency
+    if second is not None:
+        # "1 - 2 Mio. EUR": Multiplikator und Waehrung gelten fuer beide Werte
+        if first.multiplier == 1.0:
+            low = first.value * second.multiplier
+        high = second.value * second.multiplier
+        currency = currency or second.currency
+
+    return Budget(min(low, high), max(low, high), currency)
+
+
+def _range(text: str, amounts: list) -> tuple:
+    """
+    Der erste Betrag mit Waehrung (sonst der erste ueberhaupt) und, falls er
+    Teil eines Bereichs ist ("100.000 - 250.000 CHF"), dessen zweiter Wert.
+    Returns:
+        (erster Wert, zweiter Wert oder None)
+    """
+    index = next((i for i, amount in enumerate(amounts) if amount.currency), 0)
+    amount = amounts[index]
+    if index > 0 and _RANGE_SEPARATOR.match(text[amounts[index - 1].end:amount.start]):
+        return amounts[index - 1], amount
+    if index + 1 < len(amounts) and _RANGE_SEPARATOR.match(text[amount.end:amounts[index + 1].start]):
+        return amount, amounts[index + 1]
+    return amount, None
+
+
+def parse_amount(value) -> Optional[float]:
+    """Einzelner Betrag aus Zahl oder Text ("50000", "50.000", "1,2 Mio.") oder None"""
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    budget = parse_budget(str(value))
+    return budget.min if budget else None
+
+
+def find_budget(text: str) -> str:
+    """
+    Budget-Angabe aus dem Text einer Detailseite ("" wenn keine gefunden).
+    Beruecksichtigt nur Betraege mit Waehrung kurz nach einem Budget-Stichwort
+    und gibt nur den Betrag (bzw. Bereich) zurueck, ohne den Text davor.
+    """
+    text = fold_text(text or "")
+    for label in _BUDGET_LABEL.finditer(text):
+        window = text[label.end():label.end() + _LABEL_WINDOW]
+        amounts = _amounts(window)
+        if any(amount.currency for amount in amounts):
+            first, second = _range(window, amounts)
+            return window[first.start:(second or first).end].strip()
+    return ""
@@ -0,0 +1,85 @@
+"""
+Adaptiver Crawl-Takt aus der Crawl-Historie (Tabelle crawl_runs).
+
+Jeder Lauf eines Portals wird mit gefundenen, neuen Tenders und geladenen
+Seiten gespeichert (crawlers.run_all.run_portal_crawler). Aus den letzten
+CRAWL_RATE_HISTORY erfolgreichen Laeufen wird die Ankunftsrate neuer
+Tenders (pro Stunde) exponentiell geglaettet geschaetzt: jeder Lauf liefert
+neue Tenders / Stunden seit dem vorherigen Lauf, gewichtet mit
+CRAWL_RATE_ALPHA.
+
+Das Intervall wird so gewaehlt, dass ein Lauf im Mittel etwa targetNew
+neue Tenders findet, begrenzt auf [minInterval, maxInterval]. Ein Lauf
+laedt die Ergebnisseiten unabhaengig davon, ob etwas Neues dabei ist -
+ruhige Portale werden deshalb seltener gecrawlt, aktive haeufiger, und
+die Ausbeute pro geladener Seite steigt. maxInterval begrenzt, wie alt
+ein neuer Tender bei ruhigen Portalen hoechstens wird.
+"""
+from datetime import datetime
+from typing import List, NamedTuple, Optional, Tuple
+
+from config import CRAWL_RATE_ALPHA, CRAWL_RATE_HISTORY
+from database import SessionLocal, CrawlRun
+
+
+class PortalCadence(NamedTuple):
+    rate: Optional[float]  # Neue Tenders pro Stunde; None = zu wenig Historie
+    last_started: Optional[datetime]  # Beginn des letzten Laufs (auch fehlgeschlagener)
+
+
+def record_run(portal: str, started_at: datetime, result: str,
+               found: int = 0, new: int = 0, pages: int = 0):
+    """Speichert einen Crawl-Lauf (result: ok, error, aborted)"""
+    db = SessionLocal()
+    try:
+        db.add(CrawlRun(
+            source_portal=portal, started_at=started_at, finished_at=datetime.now(),
+            result=result, tenders_found=found, tenders_new=new, pages_fetched=pages,
+        ))
+        db.commit()
+    finally:
+        db.close()
+
+
+def smoothed_rate(runs: List[Tuple[datetime, int]], alpha: float = CRAWL_RATE_ALPHA) -> Optional[float]:
+    """
+    Exponentiell geglaettete Ankunftsrate (pro Stunde) aus (started_at, neue Tenders)
+    erfolgreicher Laeufe, aufsteigend sortiert. Der erste Lauf zaehlt nur als
+    Bezugspunkt, da unbekannt ist, seit wann seine neuen Tenders angefallen sind.
+    """
+    rate = None
+    for (previous, _), (started, new) in zip(runs, runs[1:]):
+        hours = (started - previous).total_seconds() / 3600
+        if hours <= 0:
+            continue
+        observed = new / hours
+        rate = observed if rate is None else alpha * observed + (1 - alpha) * rate
+    return rate
+
+
+def load_cadence(db, portal: str, history: int = CRAWL_RATE_HISTORY) -> PortalCadence:
+    """Liest die letzten Laeufe eines Portals (ueber ix_crawl_runs_portal_started_at)"""
+    rows = (
+        db.query(CrawlRun.started_at, CrawlRun.result, CrawlRun.tenders_new)
+        .filter(CrawlRun.source_portal == portal)
+        .order_by(CrawlRun.started_at.desc())
+        .limit(history)
+        .all()
+    )
+    if not rows:
+        return PortalCadence(None, None)
+
+    successful = [(row.started_at, row.tenders_new) for row in reversed(rows) if row.result == "ok"]
+    return PortalCadence(smoothed_rate(successful), rows[0].started_at)
+
+
+def adaptive_interval(rate: Optional[float], target_new: float,
+                      min_interval: float, max_interval: float, default: float) -> float:
+    """Sekunden bis zum naechsten Lauf, damit im Mittel target_new neue Tenders anfallen"""
+    if rate is None:
+        interval = default
+    elif rate <= 0:
+        interval = max_interval
+    else:
+        interval = target_new / rate * 3600
+    return min(max(interval, min_interval), max_interval)
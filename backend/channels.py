@@ -0,0 +1,48 @@
+"""
+Schnittstelle der Benachrichtigungskanaele (E-Mail in notifier.py, Webhook in webhook.py).
+
+Ein Kanal legt Benachrichtigungen (neue Tenders, Fristerinnerungen) als
+Eintraege in der Outbox an (enqueue, in der Transaktion der Tenders) und
+verschickt spaeter vom NotificationDispatcher reservierte Eintraege (send).
+Der Dispatcher sammelt bis zu batch_size Eintraege eines Kanals und
+verschickt eine unvollstaendige Sammlung spaetestens nach flush_seconds.
+Bricht send() nach einem Teil der Eintraege ab, meldet der Kanal die
+bereits zugestellten mit PartialDelivery - nur der Rest wird wiederholt.
+"""
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List
+
+from outbox import OutboxItem, KIND_NEW_TENDERS
+
+
+class PartialDelivery(Exception):
+    """send() ist gescheitert, nachdem delivered bereits zugestellt waren"""
+
+    def __init__(self, delivered: List[OutboxItem], error: Exception):
+        super().__init__(str(error))
+        self.delivered = delivered
+        self.error = error
+
+
+class NotificationChannel(ABC):
+    name: str
+    batch_size: int = 1  # Outbox-Eintraege pro send()
+    flush_seconds: float = 0.0  # Hoechstens so lange auf eine volle Sammlung warten
+
+    @abstractmethod
+    def is_configured(self) -> bool:
+        """True wenn der Kanal in .env eingerichtet ist"""
+
+    @abstractmethod
+    def enqueue(self, db, tenders: List[Dict[str, Any]], kind: str = KIND_NEW_TENDERS):
+        """Legt die Outbox-Eintraege (kind: outbox.KIND_*) in der Transaktion von db an"""
+
+    @abstractmethod
+    def send(self, items: List[OutboxItem]):
+        """
+        Verschickt die Eintraege. Eine Exception gilt fuer alle Eintraege,
+        PartialDelivery nur fuer die nicht darin genannten.
+        """
+
+    def close(self):
+        """Offene Verbindungen schliessen (bei Leerlauf und Prozessende)"""
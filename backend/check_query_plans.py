@@ -0,0 +1,77 @@
+"""
+Prueft, dass jede Filter-/Sortier-Kombination der Tender-Liste einen Index nutzt.
+
+Ausführen mit: cd backend && python check_query_plans.py
+
+Die Textsuche (search) ist ausgenommen, da LIKE '%...%' keinen Index nutzen kann.
+Zusaetzlich wird die Abfrage der Fristerinnerungen (reminders.py) geprueft.
+"""
+import itertools
+import os
+import sys
+from datetime import date
+
+backend_dir = os.path.dirname(os.path.abspath(__file__))
+if backend_dir not in sys.path:
+    sys.path.insert(0, backend_dir)
+
+from api import TenderFilter, SORT_COLUMNS, apply_tender_filters, apply_tender_sort
+from database import SessionLocal, Tender, explain_query_plan, init_db
+from reminders import reminder_query
+
+
+FILTER_CASES = {
+    "ohne Filter": TenderFilter(),
+    "status": TenderFilter(status="NEW"),
+    "category": TenderFilter(category=["Tiefbau", "Hochbau"]),
+    "portal": TenderFilter(portal=["tender24.de"]),
+    "country": TenderFilter(country="Oesterreich"),
+    "country+city": TenderFilter(country="Oesterreich", city="Innsbruck"),
+    "deadline": TenderFilter(deadlineFrom="2025-01-01", deadlineTo="2025-03-31"),
+    "status+deadline": TenderFilter(status="INTERESTING", deadlineFrom="2025-01-01"),
+    "status+category": TenderFilter(status="NEW", category=["Tiefbau"]),
+    "budget": TenderFilter(minBudget=50000),
+    "budget-bereich": TenderFilter(minBudget=50000, maxBudget=500000),
+}
+
+
+def uses_index(plan: list, filtered: bool = True) -> bool:
+    """
+    Mit Filter: True nur bei einer Suche ueber einen Index (SEARCH tenders USING ... INDEX).
+    Ein SCAN ueber einen Index liest die ganze Tabelle in Indexreihenfolge und zaehlt nicht.
+    Ohne Filter genuegt es, dass die Sortierung einen Index nutzt.
+    """
+    if filtered:
+        return any(line.startswith("SEARCH tenders USING") and "INDEX" in line for line in plan)
+    return not any(
+        line.startswith("SCAN tenders") and "INDEX" not in line for line in plan
+    )
+
+
+def main() -> int:
+    init_db()
+    db = SessionLocal()
+    failures = 0
+    try:
+        for (name, filters), sort, order in itertools.product(
+            FILTER_CASES.items(), SORT_COLUMNS, ("desc", "asc")
+        ):
+            query = apply_tender_sort(apply_tender_filters(db.query(Tender), filters), sort, order)
+            plan = explain_query_plan(query)
+            ok = uses_index(plan, filtered=filters != TenderFilter())
+            failures += not ok
+            print(f"  [{'OK' if ok else 'FEHLER'}] {name:16} sort={sort}:{order:4}  {' | '.join(plan)}")
+
+        plan = explain_query_plan(reminder_query(db, date.today()))
+        ok = uses_index(plan)
+        failures += not ok
+        print(f"  [{'OK' if ok else 'FEHLER'}] {'erinnerungen':16}                {' | '.join(plan)}")
+    finally:
+        db.close()
+
+    print(f"\n{failures} Kombination(en) ohne Index")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -58,6 +58,40 @@ PORTALS = {
 # Datenbank
 DATABASE_URL = "sqlite:///./tenders.db"
 
+# Gemeinsamer Metrik-Speicher fuer API und Crawler-Prozesse
+METRICS_STORE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "metrics.db")
+
+# Trainiertes Kategorie-Modell (siehe crawlers/text_classifier.py)
+CATEGORY_MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "category_model.npz")
+
+# Ortsverzeichnis fuer die Ortserkennung (siehe crawlers/gazetteer.py)
+GAZETTEER_FILE = os.getenv(
+    "GAZETTEER_FILE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "dach_places.tsv")
+)
+
+# Rohseiten der Detailseiten fuer Neu-Extraktion (siehe crawlers/snapshot_store.py)
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "snapshots"))
+SNAPSHOT_ZSTD_LEVEL = int(os.getenv("SNAPSHOT_ZSTD_LEVEL", "10"))
+SNAPSHOT_RETENTION_DAYS = int(os.getenv("SNAPSHOT_RETENTION_DAYS", "365"))
+SNAPSHOT_MAX_MB = int(os.getenv("SNAPSHOT_MAX_MB", "2048"))
+
+# Zeitplan je Portal (siehe scheduler.py); ueberschreibbar in settings.json unter "schedules"
+DEFAULT_CRAWL_SCHEDULE = {"cron": "0 6,18 * * *", "jitter": 300, "maxRuntime": 3600}
+MAX_CONCURRENT_CRAWLS = int(os.getenv("MAX_CONCURRENT_CRAWLS", "2"))  # Gleichzeitig offene Browser
+
+# Adaptiver Crawl-Takt (siehe cadence.py): Glaettung der Ankunftsrate neuer Tenders,
+# ausgewertete Laeufe je Portal und angestrebte neue Tenders pro Lauf
+CRAWL_RATE_ALPHA = float(os.getenv("CRAWL_RATE_ALPHA", "0.3"))
+CRAWL_RATE_HISTORY = int(os.getenv("CRAWL_RATE_HISTORY", "30"))
+CRAWL_TARGET_NEW = float(os.getenv("CRAWL_TARGET_NEW", "5"))
+
+# Fristerinnerungen fuer vorgemerkte Tenders (siehe reminders.py): Tage vor der Frist
+REMINDER_DAYS = sorted({int(days) for days in os.getenv("REMINDER_DAYS", "7,3,1").split(",") if days.strip()})
+
+# API-Profiling (Server-Timing-Header, Log fuer langsame Requests)
+API_PROFILING = os.getenv("API_PROFILING", "0") == "1"
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "500"))
+
 # Crawler Einstellungen
 CRAWL_DELAY_SECONDS = 2  # Wartezeit zwischen Requests
 HEADLESS_MODE = True  # Browser ohne GUI
@@ -0,0 +1,38 @@
+"""
+Gemeinsames Starten und Schliessen der Playwright-Browser fuer alle Crawler.
+"""
+from collections import Counter
+
+from playwright.async_api import async_playwright
+
+import metrics
+
+
+# Geladene Seiten je Portal seit Prozessstart (fuer crawl_runs, Metriken werden beim Flush zurueckgesetzt)
+pages_fetched = Counter()
+
+
+def _page_loaded(portal: str):
+    pages_fetched[portal] += 1
+    metrics.inc("tenderscout_crawl_pages_fetched_total", portal=portal)
+
+
+async def launch_browser(portal: str):
+    """Startet Browser und Seite; zaehlt offene Browser und geladene Seiten"""
+    pw = await async_playwright().start()
+    browser = await pw.chromium.launch(headless=True)
+    page = await browser.new_page()
+    page.on("load", lambda _: _page_loaded(portal))
+    metrics.inc("tenderscout_browsers_open")
+    metrics.flush_to_store()
+    return pw, browser, page
+
+
+async def close_browser(pw, browser):
+    """Schliesst Browser und Playwright"""
+    try:
+        await browser.close()
+        await pw.stop()
+    finally:
+        metrics.inc("tenderscout_browsers_open", -1)
+        metrics.flush_to_store()
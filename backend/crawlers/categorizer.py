@@ -1,28 +1,34 @@
 """
 Intelligente Kategorisierung von Ausschreibungen basierend auf Titel und Beschreibung.
 """
+import json
 import re
+from typing import Optional
+
+from crawlers.trie_regex import build_trie_pattern
+from normalize import normalize_text
 
 
 # Kategorie-Definitionen mit Keywords
+# (Schreibweisen mit ae/oe/ue/ss sind ueber normalize_text abgedeckt)
 CATEGORIES = {
     # Hochbau
     "Hochbau": [
-        "hochbau", "neubau", "gebäude", "gebaeude", "wohnbau", "wohnhaus", 
-        "bürogebäude", "buerogebaeude", "geschossbau", "mehrfamilienhaus",
+        "hochbau", "neubau", "gebäude", "wohnbau", "wohnhaus",
+        "bürogebäude", "geschossbau", "mehrfamilienhaus",
         "einfamilienhaus", "rohbau", "mauerwerk", "betonbau"
     ],
     
     # Tiefbau
     "Tiefbau": [
-        "tiefbau", "kanalbau", "kanal", "entwässerung", "entwaesserung",
+        "tiefbau", "kanalbau", "kanal", "entwässerung",
         "abwasser", "kanalisation", "schacht", "rohrverlegung"
     ],
     
     # Straßenbau
     "Strassenbau": [
-        "straßenbau", "strassenbau", "asphalt", "pflaster", "gehweg",
-        "radweg", "fahrbahn", "verkehrsweg", "straßensanierung", "strassensanierung"
+        "straßenbau", "asphalt", "pflaster", "gehweg",
+        "radweg", "fahrbahn", "verkehrsweg", "straßensanierung"
     ],
     
     # Elektroinstallation
@@ -33,8 +39,8 @@ CATEGORIES = {
     
     # Heizung/Sanitär/Klima
     "Heizung/Sanitaer/Klima": [
-        "heizung", "sanitär", "sanitaer", "klima", "lüftung", "lueftung",
-        "hls", "hvac", "wärmepumpe", "waermepumpe", "gas", "fernwärme"
+        "heizung", "sanitär", "klima", "lüftung",
+        "hls", "hvac", "wärmepumpe", "gas", "fernwärme"
     ],
     
     # Maler/Lackierer
@@ -49,8 +55,8 @@ CATEGORIES = {
     
     # Fassade
     "Fassadenbau": [
-        "fassade", "wärmedämmung", "waermedaemmung", "wdvs", "außenwand",
-        "aussenwand", "verkleidung", "vorhangfassade"
+        "fassade", "wärmedämmung", "wdvs", "außenwand",
+        "verkleidung", "vorhangfassade"
     ],
     
     # Dach
@@ -61,7 +67,7 @@ CATEGORIES = {
     
     # Fenster/Türen
     "Fenster/Tueren": [
-        "fenster", "tür", "tuer", "verglasung", "glas", "türen", "tueren",
+        "fenster", "tür", "verglasung", "glas", "türen",
         "fensterbau", "rolladen", "jalousie"
     ],
     
@@ -73,8 +79,8 @@ CATEGORIES = {
     
     # Metallbau/Schlosser
     "Metallbau": [
-        "metall", "stahl", "schlosser", "geländer", "gelaender", "stahlbau",
-        "konstruktion", "schweißen", "schweissen"
+        "metall", "stahl", "schlosser", "geländer", "stahlbau",
+        "konstruktion", "schweißen"
     ],
     
     # Holzbau/Zimmerer
@@ -85,25 +91,25 @@ CATEGORIES = {
     
     # Garten/Landschaft
     "Garten-/Landschaftsbau": [
-        "garten", "landschaft", "grünanlage", "gruenanlage", "pflanz",
-        "baumpflege", "spielplatz", "außenanlage", "aussenanlage"
+        "garten", "landschaft", "grünanlage", "pflanz",
+        "baumpflege", "spielplatz", "außenanlage"
     ],
     
     # Abbruch/Entsorgung
     "Abbruch/Entsorgung": [
-        "abbruch", "abriss", "rückbau", "rueckbau", "entsorgung", "demontage",
+        "abbruch", "abriss", "rückbau", "entsorgung", "demontage",
         "schadstoff", "asbest", "kontaminiert"
     ],
     
     # Erdarbeiten
     "Erdarbeiten": [
-        "erdarbeit", "aushub", "erdbau", "baggerarbeit", "gründung", "gruendung",
+        "erdarbeit", "aushub", "erdbau", "baggerarbeit", "gründung",
         "fundament", "baugrube", "verfüllung"
     ],
     
     # Aufzüge
     "Aufzuege/Foerdertechnik": [
-        "aufzug", "fahrstuhl", "lift", "förderanlage", "foerderanlage",
+        "aufzug", "fahrstuhl", "lift", "förderanlage",
         "aufzugsanlage", "treppenlift"
     ],
     
@@ -116,7 +122,7 @@ CATEGORIES = {
     # Planung/Architektur
     "Planung/Architektur": [
         "planung", "architekt", "generalplan", "entwurf", "bauüberwachung",
-        "bauueberwachung", "projektsteuerung", "öba", "oeba"
+        "projektsteuerung", "öba"
     ],
     
     # IT/Technik
@@ -127,13 +133,13 @@ CATEGORIES = {
     
     # Reinigung
     "Reinigung": [
-        "reinigung", "gebäudereinigung", "gebaeudereinigung", "unterhaltsreinigung",
+        "reinigung", "gebäudereinigung", "unterhaltsreinigung",
         "glasreinigung", "sonderreinigung"
     ],
     
     # Möbel/Einrichtung
     "Moebel/Einrichtung": [
-        "möbel", "moebel", "einrichtung", "büromöbel", "bueromoebel",
+        "möbel", "einrichtung", "büromöbel",
         "schrank", "tisch", "stuhl", "ausstattung"
     ],
     
@@ -144,33 +150,84 @@ CATEGORIES = {
 }
 
 
-def categorize_tender(title: str, description: str = "") -> str:
+def _compile_keyword_index(categories: dict):
     """
-    Kategorisiert eine Ausschreibung basierend auf Titel und Beschreibung.
+    Kompiliert die Keyword-Tabelle einmalig zu einem einzigen Regex.
+    
+    Der Lookahead liefert an jeder Textposition das laengste passende
+    Keyword (auch ueberlappend). Alle anderen dort passenden Keywords
+    sind dessen Praefixe und werden ueber eine Tabelle ergaenzt.
+    Keywords werden wie die Texte normalisiert.
+    """
+    keyword_categories = {}
+    for category, keywords in categories.items():
+        for keyword in keywords:
+            categories_of_keyword = keyword_categories.setdefault(normalize_text(keyword), [])
+            if category not in categories_of_keyword:
+                categories_of_keyword.append(category)
+    
+    prefixes = {
+        keyword: [other for other in keyword_categories if keyword.startswith(other)]
+        for keyword in keyword_categories
+    }
+    pattern = re.compile("(?=(" + build_trie_pattern(keyword_categories) + "))")
+    return pattern, keyword_categories, prefixes
+
+
+_KEYWORD_PATTERN, _KEYWORD_CATEGORIES, _KEYWORD_PREFIXES = _compile_keyword_index(CATEGORIES)
+
+
+def match_keywords(title: str, description: str = "") -> dict:
+    """
+    Alle Keywords im Text in einem Durchlauf.
     
+    Args:
+        title, description: bereits normalisiert (normalize_text)
     Returns:
-        Kategorie-Name oder "Sonstige Bauleistungen" als Fallback
+        Dict Keyword -> True wenn (auch) im Titel gefunden
     """
     # Kombiniere Titel und Beschreibung
-    text = f"{title} {description}".lower()
+    text = f"{title} {description}"
+    title_end = len(title)
+    
+    matched = {}
+    for match in _KEYWORD_PATTERN.finditer(text):
+        start = match.start()
+        for keyword in _KEYWORD_PREFIXES[match.group(1)]:
+            in_title = start + len(keyword) <= title_end
+            matched[keyword] = matched.get(keyword, False) or in_title
+    return matched
+
+
+def score_categories(title: str, description: str = "") -> dict:
+    """
+    Gewichtete Treffer pro Kategorie in einem Durchlauf ueber den Text.
     
-    # Zähle Matches pro Kategorie
+    Jedes Keyword zaehlt einmal: 2 Punkte bei Treffer im Titel, sonst 1.
+    Returns:
+        Dict Kategorie -> Score (nur Kategorien mit Treffern, in CATEGORIES-Reihenfolge)
+    """
     scores = {}
+    matched = match_keywords(normalize_text(title), normalize_text(description))
+    for keyword, in_title in matched.items():
+        # Gewichtung: Titel-Match zählt doppelt
+        weight = 2 if in_title else 1
+        for category in _KEYWORD_CATEGORIES[keyword]:
+            scores[category] = scores.get(category, 0) + weight
     
-    for category, keywords in CATEGORIES.items():
-        score = 0
-        for keyword in keywords:
-            if keyword in text:
-                # Gewichtung: Titel-Match zählt doppelt
-                if keyword in title.lower():
-                    score += 2
-                else:
-                    score += 1
-        
-        if score > 0:
-            scores[category] = score
-    
-    # Beste Kategorie zurückgeben
+    return {category: scores[category] for category in CATEGORIES if category in scores}
+
+
+def categorize_tender(title: str, description: str = "") -> str:
+    """
+    Kategorisiert eine Ausschreibung basierend auf Titel und Beschreibung.
+    
+    Returns:
+        Kategorie-Name oder "Sonstige Bauleistungen" als Fallback
+    """
+    scores = score_categories(title, description)
+    
+    # Beste Kategorie zurückgeben (bei Gleichstand die erste in CATEGORIES)
     if scores:
         best_category = max(scores, key=scores.get)
         return best_category
@@ -178,6 +235,52 @@ def categorize_tender(title: str, description: str = "") -> str:
     return "Sonstige Bauleistungen"
 
 
+def categorize_many(texts, normalized: bool = False, new_entries: Optional[list] = None) -> list:
+    """
+    Kategorisiert viele Ausschreibungen auf einmal (vektorisiertes Modell).
+    
+    Bereits kategorisierte Texte kommen aus dem Cache (category_cache),
+    nur neue oder geaenderte Texte werden berechnet.
+    Args:
+        texts: Liste von (Titel, Beschreibung)-Tupeln oder einzelnen Texten
+        normalized: True wenn die Texte bereits normalize_text durchlaufen haben
+            (z.B. Tender.title_norm / description_norm)
+        new_entries: Neu berechnete Cache-Eintraege hier anhaengen statt sie zu
+            speichern (category_cache.store_entries) - fuer Worker-Prozesse, die
+            nicht gleichzeitig in die Datenbank schreiben sollen
+    Returns:
+        Liste der Kategorien in gleicher Reihenfolge
+    """
+    from crawlers import category_cache
+    from crawlers.text_classifier import get_classifier
+    
+    items = [(text, "") if isinstance(text, str) else text for text in texts]
+    if not normalized:
+        items = [(normalize_text(title), normalize_text(description)) for title, description in items]
+    classifier = get_classifier()
+    hashes = [category_cache.text_hash(title, description) for title, description in items]
+    categories = category_cache.lookup(classifier.version, hashes)
+    
+    missing = {}
+    for text_hash, item in zip(hashes, items):
+        if text_hash not in categories:
+            missing.setdefault(text_hash, item)
+    if missing:
+        scores = classifier.scores(list(missing.values()))
+        entries = []
+        for text_hash, row in zip(missing, scores):
+            category = classifier.classes[row.argmax()]
+            categories[text_hash] = category
+            row_scores = {c: round(float(s), 3) for c, s in zip(classifier.classes, row) if s > 0}
+            entries.append((text_hash, category, json.dumps(row_scores, ensure_ascii=False)))
+        if new_entries is None:
+            category_cache.store(classifier.version, entries)
+        else:
+            new_entries.extend((classifier.version, *entry) for entry in entries)
+    
+    return [categories[text_hash] for text_hash in hashes]
+
+
 def get_all_categories() -> list:
     """Gibt alle verfügbaren Kategorien zurück"""
     return list(CATEGORIES.keys()) + ["Sonstige Bauleistungen"]
@@ -0,0 +1,81 @@
+"""
+Persistenter Cache fuer Kategorisierungs-Ergebnisse.
+
+Schluessel ist (Hash des normalisierten Textes, Version des Kategorisierers).
+Die Version aendert sich mit CATEGORIES und jedem Training - danach werden
+genau die Texte neu berechnet, die wieder vorkommen. Eintraege alter
+Versionen loescht nur das Training (purge_except mit der gespeicherten
+Version): Prozesse mit unterschiedlichem Modellstand (API, Scheduler,
+Backfill) teilen sich den Cache, ohne sich gegenseitig Eintraege zu loeschen.
+"""
+import hashlib
+from typing import Dict, Iterable, Sequence, Tuple
+
+from sqlalchemy.dialects.sqlite import insert
+
+from database import SessionLocal, CategoryCacheEntry
+
+
+LOOKUP_CHUNK_SIZE = 500
+
+
+def text_hash(title_norm: str, description_norm: str = "") -> str:
+    """Hash ueber normalisierten Titel und Beschreibung (normalize_text)"""
+    return hashlib.sha1(f"{title_norm or ''}\n{description_norm or ''}".encode("utf-8")).hexdigest()
+
+
+def lookup(version: str, hashes: Iterable[str]) -> Dict[str, str]:
+    """Gecachte Kategorien fuer die Hashes (fehlende sind nicht enthalten)"""
+    hashes = list(dict.fromkeys(hashes))
+    found = {}
+    db = SessionLocal()
+    try:
+        for i in range(0, len(hashes), LOOKUP_CHUNK_SIZE):
+            chunk = hashes[i:i + LOOKUP_CHUNK_SIZE]
+            rows = db.query(CategoryCacheEntry.text_hash, CategoryCacheEntry.category).filter(
+                CategoryCacheEntry.version == version,
+                CategoryCacheEntry.text_hash.in_(chunk),
+            )
+            found.update((row.text_hash, row.category) for row in rows)
+    finally:
+        db.close()
+    return found
+
+
+def store(version: str, entries: Sequence[Tuple[str, str, str]]):
+    """Speichert (text_hash, category, scores_json)-Eintraege; vorhandene bleiben"""
+    rows = [
+        {"text_hash": text_hash, "version": version, "category": category, "scores": scores}
+        for text_hash, category, scores in entries
+    ]
+    db = SessionLocal()
+    try:
+        for i in range(0, len(rows), LOOKUP_CHUNK_SIZE):
+            db.execute(
+                insert(CategoryCacheEntry).values(rows[i:i + LOOKUP_CHUNK_SIZE]).on_conflict_do_nothing()
+            )
+        db.commit()
+    finally:
+        db.close()
+
+
+def store_entries(entries: Sequence[Tuple[str, str, str, str]]):
+    """Speichert (version, text_hash, category, scores_json)-Eintraege (categorize_many new_entries)"""
+    by_version: Dict[str, list] = {}
+    for version, *entry in entries:
+        by_version.setdefault(version, []).append(tuple(entry))
+    for version, version_entries in by_version.items():
+        store(version, version_entries)
+
+
+def purge_except(version: str) -> int:
+    """Loescht alle Eintraege ausser denen der Version (nach dem Speichern eines neuen Modells)"""
+    db = SessionLocal()
+    try:
+        deleted = db.query(CategoryCacheEntry).filter(CategoryCacheEntry.version != version).delete(
+            synchronize_session=False
+        )
+        db.commit()
+    finally:
+        db.close()
+    return deleted
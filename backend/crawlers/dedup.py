@@ -0,0 +1,165 @@
+"""
+Erkennung von Beinahe-Duplikaten ueber Portale hinweg (MinHash + LSH).
+
+Dieselbe Ausschreibung erscheint auf mehreren Portalen (oder auf beiden
+Staatsanzeiger-Accounts) unter verschiedenen IDs. Fuer jeden neuen Tender
+wird eine MinHash-Signatur ueber Titel, Auftraggeber und Beschreibung
+berechnet und in Baender zerlegt. Nur Tender mit mindestens einem gleichen
+Band-Bucket (Tabelle tender_lsh_buckets) werden verglichen - der Aufwand
+haengt nicht von der Gesamtzahl der Tenders ab.
+
+Duplikate teilen sich eine cluster_id. Sie ist die ID eines Tenders im
+Cluster (zuerst gesehen bzw. kleinste ID nach dem Zusammenfuehren), der
+damit auch der Repraesentant des Clusters ist.
+
+Aendert sich der Text eines indizierten Tenders, wird minhash auf NULL
+gesetzt (Crawler, backfill.py); index_unclustered berechnet Signatur,
+Buckets und Cluster dann neu.
+"""
+import re
+import zlib
+from typing import List, Optional
+
+import numpy as np
+
+from database import Tender, TenderLshBucket
+
+
+NUM_PERMUTATIONS = 64
+BANDS = 16  # 16 Baender x 4 Zeilen: Kandidat ab ca. 50% Aehnlichkeit
+ROWS_PER_BAND = NUM_PERMUTATIONS // BANDS
+SHINGLE_SIZE = 3  # Wort-Trigramme
+DUPLICATE_THRESHOLD = 0.6  # Geschaetzte Jaccard-Aehnlichkeit
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+# Feste Hash-Familie (multiply-shift), damit Signaturen zwischen Laeufen vergleichbar sind
+_rng = np.random.default_rng(20240601)
+_HASH_A = _rng.integers(1, 2 ** 63, NUM_PERMUTATIONS, dtype=np.uint64) | np.uint64(1)
+_HASH_B = _rng.integers(0, 2 ** 63, NUM_PERMUTATIONS, dtype=np.uint64)
+
+
+def shingles(text: str) -> List[str]:
+    """Wort-Trigramme eines normalisierten Textes (kurze Texte: einzelne Woerter)"""
+    words = _WORD_PATTERN.findall(text)
+    if len(words) < SHINGLE_SIZE:
+        return words
+    return [" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)]
+
+
+def minhash_signature(text: str) -> Optional[np.ndarray]:
+    """MinHash-Signatur (uint32 x NUM_PERMUTATIONS) oder None bei leerem Text"""
+    parts = set(shingles(text))
+    if not parts:
+        return None
+    values = np.fromiter(
+        (zlib.crc32(part.encode("utf-8")) for part in parts), dtype=np.uint64, count=len(parts)
+    )
+    # Alle Permutationen auf einmal: (a * x + b) mod 2^64, obere 32 Bit
+    hashed = (_HASH_A[:, None] * values[None, :] + _HASH_B[:, None]) >> np.uint64(32)
+    return hashed.min(axis=1).astype(np.uint32)
+
+
+def tender_signature(tender: Tender) -> Optional[np.ndarray]:
+    """Signatur ueber die normalisierten Texte (title_norm, authority_norm, description_norm)"""
+    return minhash_signature(
+        f"{tender.title_norm or ''} {tender.authority_norm or ''} {tender.description_norm or ''}"
+    )
+
+
+def band_buckets(signature: np.ndarray) -> List[str]:
+    """Ein Bucket-Schluessel pro Band ("band:hash")"""
+    bands = signature.reshape(BANDS, ROWS_PER_BAND)
+    return [f"{band}:{zlib.crc32(values.tobytes()):08x}" for band, values in enumerate(bands)]
+
+
+def similarity(signature_a: np.ndarray, signature_b: np.ndarray) -> float:
+    """Geschaetzte Jaccard-Aehnlichkeit zweier Signaturen"""
+    return float(np.mean(signature_a == signature_b))
+
+
+def _detach(db, tender: Tender):
+    """
+    Loest einen bereits indizierten Tender aus seinem Cluster: alte Buckets
+    loeschen; war er Repraesentant, uebernimmt die kleinste verbleibende ID.
+    """
+    db.query(TenderLshBucket).filter(TenderLshBucket.tender_id == tender.id).delete(
+        synchronize_session=False
+    )
+    if tender.cluster_id == tender.id:
+        members = [
+            row.id for row in db.query(Tender.id).filter(Tender.cluster_id == tender.id, Tender.id != tender.id)
+        ]
+        if members:
+            db.query(Tender).filter(Tender.id.in_(members)).update(
+                {Tender.cluster_id: min(members)}, synchronize_session=False
+            )
+    tender.cluster_id = None
+
+
+def assign_cluster(db, tender: Tender, replace: bool = False) -> str:
+    """
+    Berechnet Signatur und Buckets eines Tenders und ordnet ihn einem
+    Cluster zu. Verbindet der Tender mehrere bestehende Cluster, werden
+    diese zusammengefuehrt (kleinste cluster_id bleibt).
+    Args:
+        replace: Tender war schon indiziert (Text geaendert) - alte Buckets
+            und Cluster-Zugehoerigkeit werden vorher entfernt. Neue Tenders
+            haben keine Buckets, fuer sie entfaellt das DELETE.
+    Returns:
+        cluster_id des Tenders
+    """
+    if replace:
+        _detach(db, tender)
+    signature = tender_signature(tender)
+    if signature is None:
+        tender.minhash = b""
+        tender.cluster_id = tender.id
+        return tender.cluster_id
+
+    buckets = band_buckets(signature)
+    candidate_ids = {
+        row.tender_id
+        for row in db.query(TenderLshBucket.tender_id).filter(TenderLshBucket.bucket.in_(buckets))
+        if row.tender_id != tender.id
+    }
+
+    clusters = set()
+    if candidate_ids:
+        candidates = db.query(Tender.id, Tender.minhash, Tender.cluster_id).filter(
+            Tender.id.in_(candidate_ids)
+        )
+        for candidate in candidates:
+            other = np.frombuffer(candidate.minhash, dtype=np.uint32)
+            if similarity(signature, other) >= DUPLICATE_THRESHOLD:
+                clusters.add(candidate.cluster_id or candidate.id)
+
+    cluster_id = min(clusters) if clusters else tender.id
+    if len(clusters) > 1:
+        db.query(Tender).filter(Tender.cluster_id.in_(clusters - {cluster_id})).update(
+            {Tender.cluster_id: cluster_id}, synchronize_session=False
+        )
+
+    tender.minhash = signature.tobytes()
+    tender.cluster_id = cluster_id
+    db.add_all(TenderLshBucket(bucket=bucket, tender_id=tender.id) for bucket in buckets)
+    db.flush()
+    return cluster_id
+
+
+def index_unclustered(db) -> int:
+    """
+    Ordnet alle Tenders ohne Signatur (neu, mit geaendertem Text oder vor
+    Einfuehrung der Duplikaterkennung gespeichert) in Crawl-Reihenfolge
+    einem Cluster zu. Nur Tenders mit cluster_id waren schon indiziert
+    und haben Buckets, die ersetzt werden muessen.
+    Returns:
+        Anzahl als Duplikat erkannter Tenders
+    """
+    duplicates = 0
+    tenders = db.query(Tender).filter(Tender.minhash == None).order_by(Tender.crawled_at, Tender.id).all()
+    for tender in tenders:
+        if assign_cluster(db, tender, replace=tender.cluster_id is not None) != tender.id:
+            duplicates += 1
+    return duplicates
+
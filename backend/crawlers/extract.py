@@ -0,0 +1,22 @@
+"""
+Extraktion strukturierter Felder aus dem Text einer Detailseite.
+
+Gemeinsam genutzt von fetch_detail_page (beim Crawlen) und backfill.py
+(nachtraeglich aus dem Snapshot-Speicher), damit beide dieselben Werte liefern.
+"""
+from budget import find_budget
+from crawlers.gazetteer import find_place
+
+
+def extract_page_fields(text: str) -> dict:
+    """Ort (Stadt, Land) und Budget-Angabe aus dem vollstaendigen Seitentext"""
+    fields = {"location": "", "country": "", "budget": ""}
+    
+    place = find_place(text)
+    if place:
+        fields["location"] = place.city
+        fields["country"] = place.country or ""
+    
+    # Budget-Angabe ("Geschaetzter Auftragswert: ca. 250.000 EUR")
+    fields["budget"] = find_budget(text)
+    return fields
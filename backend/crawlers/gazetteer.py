@@ -0,0 +1,112 @@
+"""
+Ortserkennung (Stadt, PLZ, Land) ueber ein vorkompiliertes Gazetteer.
+
+Alle Ortsnamen aus GAZETTEER_FILE werden einmalig zu einem Regex in
+Trie-Form kompiliert. Namen und Text laufen durch fold_text (Umlaute,
+Striche, Whitespace), die Gross-/Kleinschreibung bleibt dabei erhalten. Ein Durchlauf ueber den Text findet alle Orte mit
+Wortgrenzen ("Baden" nicht in "Baden-Württemberg", "Halle" nicht in
+"Turnhalle") - schnell genug fuer komplette Detailseiten.
+
+Mitgeliefert ist data/dach_places.tsv (groessere Orte). Fuer alle Gemeinden
+kann GAZETTEER_FILE auf einen Postleitzahlen-Export von GeoNames zeigen
+(https://download.geonames.org/export/zip/, DE.txt, AT.txt und CH.txt
+aneinandergehaengt); das Format wird an der Kopfzeile erkannt.
+
+Eine PLZ vor dem Ortsnamen macht einen Treffer eindeutiger, wird aber
+nicht gespeichert. Zahlen nach einem Punkt (Jahr eines Datums wie
+"12.03.2025 Wien") gelten nicht als PLZ.
+"""
+import csv
+import os
+import re
+from functools import lru_cache
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from config import GAZETTEER_FILE
+from crawlers.trie_regex import build_trie_pattern
+from normalize import fold_text
+
+
+# Laendercodes der GeoNames-Exporte -> Schreibweise wie in dach_places.tsv
+GEONAMES_COUNTRIES = {"DE": "Deutschland", "AT": "Oesterreich", "CH": "Schweiz", "LI": "Liechtenstein"}
+
+# PLZ + unbekannter Ort (z.B. "79618 Rheinfelden" oder "5020 Salzburg")
+_POSTCODE_CITY = re.compile(r'(?<![\d.])(\d{4,5})\s+([A-Z][a-zäöüß]+(?:\s+[A-Z][a-zäöüß]+)?)')
+
+
+class Place(NamedTuple):
+    city: str
+    country: Optional[str]
+
+
+def _read_places(path: str) -> Iterator[Tuple[Place, List[str]]]:
+    """(Ort, Aliase) aus dach_places.tsv (Kopfzeile name, country, aliases) oder einem GeoNames-Export"""
+    with open(path, encoding="utf-8") as f:
+        lines = (line for line in f if not line.startswith("#"))
+        header = next(lines, "")
+        if header.split("\t", 1)[0] == "name":
+            for row in csv.DictReader(lines, fieldnames=header.rstrip("\n").split("\t"), delimiter="\t"):
+                aliases = [alias for alias in (row.get("aliases") or "").split("|") if alias]
+                yield Place(row["name"], row["country"] or None), aliases
+            return
+        # GeoNames: Land, PLZ, Ortsname, ... (ohne Kopfzeile, eine Zeile pro PLZ)
+        for line in [header, *lines]:
+            columns = line.split("\t")
+            if len(columns) > 2 and columns[2]:
+                yield Place(columns[2], GEONAMES_COUNTRIES.get(columns[0], columns[0])), []
+
+
+class Gazetteer:
+    """Index aller bekannten Orte fuer die Suche in Freitext"""
+
+    def __init__(self, path: str = GAZETTEER_FILE):
+        self.places: Dict[str, Place] = {}  # gefalteter Name/Alias -> Ort
+
+        for place, aliases in _read_places(path):
+            for name in [place.city, *aliases]:
+                self.places.setdefault(fold_text(name), place)
+
+        names = build_trie_pattern(self.places)
+        # Optional vorangestellte PLZ (nicht das Jahr eines Datums);
+        # keine Buchstaben/Bindestriche direkt vor oder nach dem Namen
+        self._pattern = re.compile(
+            rf"(?:(?<![\d.])(\d{{4,5}})\s+)?(?<![\w-])({names})(?![\w-])"
+        )
+
+    def find(self, text: str) -> Optional[Place]:
+        """
+        Findet den ersten Ort im Text.
+
+        Ein Treffer mit vorangestellter PLZ wird bevorzugt; danach bekannte
+        Orte in Textreihenfolge, zuletzt "PLZ + Ort" fuer unbekannte Orte.
+        """
+        if not text:
+            return None
+
+        first = None
+        for match in self._pattern.finditer(fold_text(text)):
+            place = self.places[match.group(2)]
+            if match.group(1):
+                return place
+            if first is None:
+                first = place
+        if first is not None:
+            return first
+
+        plz_match = _POSTCODE_CITY.search(text)
+        if plz_match:
+            country = "Deutschland" if len(plz_match.group(1)) == 5 else None
+            return Place(plz_match.group(2), country)
+
+        return None
+
+
+@lru_cache(maxsize=1)
+def get_gazetteer() -> Gazetteer:
+    """Gazetteer einmal pro Prozess laden"""
+    return Gazetteer()
+
+
+def find_place(text: str) -> Optional[Place]:
+    """Stadt und Land aus einem Text (oder None)"""
+    return get_gazetteer().find(text)
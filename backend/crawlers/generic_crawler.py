@@ -6,9 +6,12 @@ import asyncio
 import re
 import hashlib
 from datetime import datetime, timedelta
-from playwright.async_api import async_playwright
 from typing import Optional
 
+from crawlers.browser import launch_browser, close_browser
+from crawlers.gazetteer import find_place
+import metrics
+
 
 class GenericPortalCrawler:
     """Generischer Crawler der versucht, beliebige Portale zu crawlen"""
@@ -30,9 +33,7 @@ class GenericPortalCrawler:
         print(f"  Crawle {self.name} (generisch)...")
         tenders = []
         
-        pw = await async_playwright().start()
-        browser = await pw.chromium.launch(headless=True)
-        page = await browser.new_page()
+        pw, browser, page = await launch_browser(self.name)
         
         try:
             # 1. Startseite oeffnen
@@ -50,9 +51,9 @@ class GenericPortalCrawler:
             
         except Exception as e:
             print(f"    Fehler bei {self.name}: {e}")
+            metrics.inc("tenderscout_crawl_errors_total", portal=self.name)
         finally:
-            await browser.close()
-            await pw.stop()
+            await close_browser(pw, browser)
         
         return tenders
     
@@ -297,26 +298,8 @@ class GenericPortalCrawler:
     
     def _extract_city(self, text: str) -> str:
         """Extrahiert Stadtname aus Text"""
-        cities = [
-            "Wien", "Graz", "Linz", "Salzburg", "Innsbruck", "Klagenfurt",
-            "Berlin", "Hamburg", "Muenchen", "Koeln", "Frankfurt", "Stuttgart",
-            "Duesseldorf", "Leipzig", "Dortmund", "Essen", "Bremen", "Dresden",
-            "Hannover", "Nuernberg", "Duisburg", "Bochum", "Wuppertal", "Bielefeld",
-            "Bonn", "Muenster", "Karlsruhe", "Mannheim", "Augsburg", "Wiesbaden",
-            "Freiburg", "Mainz", "Kassel", "Heidelberg", "Ulm", "München", "Köln",
-            "Düsseldorf", "Nürnberg", "Zürich", "Basel", "Bern", "Genf"
-        ]
-        
-        for city in cities:
-            if city.lower() in text.lower():
-                return city
-        
-        # PLZ + Ort suchen
-        match = re.search(r'(\d{4,5})\s+([A-Z][a-zäöüß]+)', text)
-        if match:
-            return match.group(2)
-        
-        return ""
+        place = find_place(text)
+        return place.city if place else ""
 
 
 async def crawl_custom_portal(portal_config: dict) -> list:
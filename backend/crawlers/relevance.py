@@ -0,0 +1,155 @@
+"""
+Relevanzfilter fuer die Crawler (Einstellungen globalKeywords, excludeKeywords, minBudget).
+
+Der Filter wird einmal pro Crawl-Durchlauf aus settings.json kompiliert und
+zweimal angewendet:
+1. check_listing: auf den Daten der Ergebnisliste (Titel, Auftraggeber,
+   Kurztext) - verworfene Eintraege kosten keinen Detail-Abruf
+2. check_detail: auf dem vollstaendigen Text nach dem Detail-Abruf
+
+Verworfene Ausschreibungen werden mit Grund in dropped_tenders gespeichert.
+"""
+import re
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy.dialects.sqlite import insert
+
+from budget import parse_amount, parse_budget
+from crawlers.categorizer import match_keywords
+from crawlers.trie_regex import build_trie_pattern
+from database import SessionLocal, DroppedTender
+from normalize import normalize_text
+import metrics
+
+
+INCLUDE_WEIGHT = 2  # Treffer eines globalKeywords zaehlt wie ein Titel-Keyword
+MIN_SCORE = 1
+SAVE_CHUNK_SIZE = 500
+
+STAGE_LISTING = "listing"
+STAGE_DETAIL = "detail"
+
+
+def _split_keywords(value: str) -> List[str]:
+    """ "Reinigung, Catering" -> ["reinigung", "catering"] (normalisiert)"""
+    keywords = (normalize_text(keyword) for keyword in (value or "").split(","))
+    return list(dict.fromkeys(keyword for keyword in keywords if keyword))
+
+
+def _compile(keywords: List[str]) -> Optional[re.Pattern]:
+    if not keywords:
+        return None
+    return re.compile(build_trie_pattern(keywords))
+
+
+class RelevanceFilter:
+    """
+    Kompilierte Relevanzregeln.
+
+    - Enthaelt der Text ein excludeKeyword, wird er verworfen.
+    - Sind globalKeywords gesetzt, braucht der Listeneintrag einen Score >= MIN_SCORE:
+      globalKeyword-Treffer (INCLUDE_WEIGHT) plus Kategorie-Keywords
+      (score_categories-Gewichtung), da das globalKeyword oft erst im Detailtext
+      steht. Nach dem Detail-Abruf muss mindestens ein globalKeyword vorkommen.
+      Ohne globalKeywords wird nicht bewertet.
+    - Ein bekanntes Budget mit Waehrung unter minBudget wird verworfen (bei
+      Bereichen zaehlt die Obergrenze). Zahlen ohne Waehrung sind oft kein Betrag.
+    """
+
+    def __init__(self, include_keywords: str = "", exclude_keywords: str = "", min_budget=None):
+        self.include_keywords = _split_keywords(include_keywords)
+        self.exclude_keywords = _split_keywords(exclude_keywords)
+        self.min_budget = parse_amount(min_budget)
+        self._include_pattern = _compile(self.include_keywords)
+        self._exclude_pattern = _compile(self.exclude_keywords)
+        self.dropped: List[dict] = []
+
+    @classmethod
+    def from_settings(cls, settings: dict) -> "RelevanceFilter":
+        return cls(
+            settings.get("globalKeywords", ""),
+            settings.get("excludeKeywords", ""),
+            settings.get("minBudget"),
+        )
+
+    def score(self, title_norm: str, text_norm: str) -> int:
+        """Relevanz-Score fuer normalisierten Titel + weiteren Text"""
+        score = sum(2 if in_title else 1 for in_title in match_keywords(title_norm, text_norm).values())
+        if self._include_pattern:
+            score += INCLUDE_WEIGHT * len(set(self._include_pattern.findall(f"{title_norm} {text_norm}")))
+        return score
+
+    def reason(self, title: str, text: str = "", budget: Optional[float] = None,
+               require_include: bool = False) -> Optional[str]:
+        """
+        Grund fuer das Verwerfen oder None wenn relevant.
+        require_include: mindestens ein globalKeyword muss vorkommen (Detail-Stufe)
+        """
+        title_norm, text_norm = normalize_text(title), normalize_text(text)
+
+        if self._exclude_pattern:
+            match = self._exclude_pattern.search(f"{title_norm} {text_norm}")
+            if match:
+                return f"exclude:{match.group(0)}"
+
+        if self._include_pattern and require_include:
+            if not self._include_pattern.search(f"{title_norm} {text_norm}"):
+                return "no_keyword"
+        elif self.include_keywords and self.score(title_norm, text_norm) < MIN_SCORE:
+            return "low_score"
+
+        if self.min_budget is not None and budget is not None and budget < self.min_budget:
+            return "min_budget"
+
+        return None
+
+    def _check(self, stage: str, item: dict, text: str, budget: Optional[float] = None) -> bool:
+        reason = self.reason(item.get("title", ""), text, budget, require_include=stage == STAGE_DETAIL)
+        if reason is None:
+            return True
+        self.dropped.append({
+            "id": item["id"],
+            "source_portal": item.get("source_portal", ""),
+            "title": item.get("title", ""),
+            "source_url": item.get("source_url") or item.get("url", ""),
+            "stage": stage,
+            "reason": reason,
+            "dropped_at": datetime.utcnow(),
+        })
+        metrics.inc("tenderscout_crawl_tenders_dropped_total",
+                    portal=item.get("source_portal", ""), stage=stage)
+        return False
+
+    def check_listing(self, item: dict, authority: str = "", snippet: str = "") -> bool:
+        """True wenn der Listeneintrag den Detail-Abruf wert ist"""
+        return self._check(STAGE_LISTING, item, f"{authority} {snippet}")
+
+    def check_detail(self, tender: dict) -> bool:
+        """True wenn die Ausschreibung nach dem Detail-Abruf behalten wird"""
+        budget = parse_budget(tender.get("budget"))
+        text = f"{tender.get('authority', '')} {tender.get('description', '')}"
+        return self._check(STAGE_DETAIL, tender, text, budget.max if budget and budget.currency else None)
+
+    def save_dropped(self):
+        """Speichert die verworfenen Ausschreibungen (neuester Grund gewinnt)"""
+        if not self.dropped:
+            return
+        rows = list({row["id"]: row for row in self.dropped}.values())
+        db = SessionLocal()
+        try:
+            for i in range(0, len(rows), SAVE_CHUNK_SIZE):
+                statement = insert(DroppedTender).values(rows[i:i + SAVE_CHUNK_SIZE])
+                db.execute(statement.on_conflict_do_update(
+                    index_elements=[DroppedTender.id],
+                    set_={
+                        "stage": statement.excluded.stage,
+                        "reason": statement.excluded.reason,
+                        "dropped_at": statement.excluded.dropped_at,
+                    },
+                ))
+            db.commit()
+        finally:
+            db.close()
+        print(f"  {len(self.dropped)} Ausschreibungen durch Relevanzfilter verworfen")
+        self.dropped = []
@@ -12,10 +12,18 @@ if backend_dir not in sys.path:
     sys.path.insert(0, backend_dir)
 
 import json
+from datetime import datetime
 
 from config import PORTALS
 from database import SessionLocal, Tender, TenderStatus, init_db
-from crawlers.working_crawlers import crawl_all_working_portals
+from crawlers.working_crawlers import crawl_all_working_portals, crawl_portal
+from crawlers.browser import pages_fetched
+from crawlers.categorizer import categorize_many
+from crawlers.dedup import index_unclustered
+from crawlers.snapshot_store import prune_snapshots
+from notifier import enqueue_new_tenders
+from cadence import record_run
+import metrics
 
 
 def load_settings() -> dict:
@@ -59,14 +67,17 @@ def get_portal_config(portal_key: str) -> dict:
     return base_config
 
 
-def save_tenders_to_db(tenders: list) -> list:
+def save_tenders_to_db(tenders: list, portals: list = None) -> list:
     """
     Speichert gefundene Tenders in der Datenbank.
     Gibt Liste der NEUEN Tenders zurueck (fuer Benachrichtigung).
+    Bei einem Datenbankfehler wird zurueckgerollt und die Exception weitergereicht.
     
     WICHTIG: Nur Ausschreibungen die in DIESEM Crawl-Durchlauf
     neu hinzugefuegt werden, bekommen Status "NEW".
-    Bisherige "NEW" Ausschreibungen werden zu "INTERESTING" geaendert.
+    Bisherige "NEW" Ausschreibungen werden zu "INTERESTING" geaendert -
+    mit portals nur die der gecrawlten Portale (der Scheduler crawlt
+    Portale einzeln zu unterschiedlichen Zeiten).
     """
     db = SessionLocal()
     new_count = 0
@@ -74,28 +85,29 @@ def save_tenders_to_db(tenders: list) -> list:
     new_tenders = []  # Fuer E-Mail-Benachrichtigung
     
     try:
-        # SCHRITT 1: Alle bisherigen "NEW" Ausschreibungen auf "INTERESTING" setzen
-        # Damit sind nur die Ausschreibungen aus dem aktuellen Scan "NEW"
-        old_new_count = db.query(Tender).filter(Tender.status == TenderStatus.NEW).update(
-            {Tender.status: TenderStatus.INTERESTING}
-        )
-        if old_new_count > 0:
-            print(f"  {old_new_count} bisherige 'NEW' Ausschreibungen -> 'INTERESTING'")
-        
-        # SCHRITT 2: Neue Ausschreibungen speichern
+        # SCHRITT 1: Tenders anlegen bzw. aktualisieren (nur im Speicher, autoflush ist aus).
+        # Die normalisierten Texte berechnet Tender dabei einmal selbst (title_norm, ...)
+        new_objects = []
+        recategorize = []
         for tender_data in tenders:
             # Pruefen ob Tender schon existiert
             existing = db.query(Tender).filter(Tender.id == tender_data["id"]).first()
             
             if existing:
                 # Update existierenden Tender (ausser Status - der bleibt!)
+                if existing.title != tender_data["title"] or existing.description != tender_data["description"]:
+                    existing.minhash = None  # Duplikat-Cluster neu berechnen (index_unclustered)
                 existing.title = tender_data["title"]
                 existing.description = tender_data["description"]
                 existing.deadline = tender_data["deadline"]
                 existing.budget = tender_data.get("budget")
                 existing.published_at = tender_data.get("published_at")
                 existing.location = tender_data.get("location", existing.location)
+                existing.snapshot_hash = tender_data.get("snapshot_hash") or existing.snapshot_hash
+                if not existing.category_corrected:
+                    recategorize.append((existing, tender_data))
                 updated_count += 1
+                metrics.inc("tenderscout_crawl_tenders_updated_total", portal=tender_data["source_portal"])
             else:
                 # Neuen Tender erstellen - NUR DIESE bekommen "NEW"
                 new_tender = Tender(
@@ -106,28 +118,107 @@ def save_tenders_to_db(tenders: list) -> list:
                     deadline=tender_data["deadline"],
                     published_at=tender_data.get("published_at"),
                     budget=tender_data.get("budget"),
-                    category=tender_data["category"],
                     description=tender_data["description"],
                     status=TenderStatus.NEW,
                     source_url=tender_data["source_url"],
                     source_portal=tender_data["source_portal"],
+                    snapshot_hash=tender_data.get("snapshot_hash"),
                 )
-                db.add(new_tender)
+                new_objects.append(new_tender)
+                recategorize.append((new_tender, tender_data))
                 new_count += 1
                 new_tenders.append(tender_data)  # Fuer Benachrichtigung merken
         
+        # SCHRITT 2: In einem Aufruf kategorisieren (unveraenderte Texte aus dem Cache).
+        # Vor dem ersten Schreibzugriff dieser Session, da der Cache eine eigene Session nutzt
+        categories = categorize_many(
+            [(tender.title_norm, tender.description_norm) for tender, _ in recategorize], normalized=True
+        )
+        for (tender, tender_data), category in zip(recategorize, categories):
+            tender.category = category
+            tender_data["category"] = category
+        
+        # SCHRITT 3: Alle bisherigen "NEW" Ausschreibungen auf "INTERESTING" setzen
+        # Damit sind nur die Ausschreibungen aus dem aktuellen Scan "NEW"
+        old_new = db.query(Tender).filter(Tender.status == TenderStatus.NEW)
+        if portals is not None:
+            old_new = old_new.filter(Tender.source_portal.in_(portals))
+        old_new_count = old_new.update({Tender.status: TenderStatus.INTERESTING})
+        if old_new_count > 0:
+            print(f"  {old_new_count} bisherige 'NEW' Ausschreibungen -> 'INTERESTING'")
+        
+        db.add_all(new_objects)
+        
+        # Benachrichtigung in derselben Transaktion in die Outbox
+        enqueue_new_tenders(db, new_tenders)
+        
+        # SCHRITT 4: Neue und geaenderte Tenders Duplikat-Clustern zuordnen (MinHash/LSH)
+        db.flush()
+        duplicate_count = index_unclustered(db)
+        
         db.commit()
+        for tender_data in new_tenders:
+            metrics.inc("tenderscout_crawl_tenders_new_total", portal=tender_data["source_portal"])
         print(f"Datenbank aktualisiert: {new_count} neue, {updated_count} aktualisierte Tenders")
+        if duplicate_count:
+            print(f"  {duplicate_count} davon Duplikate bereits bekannter Ausschreibungen")
         
     except Exception as e:
         print(f"Datenbankfehler: {e}")
         db.rollback()
+        raise
     finally:
         db.close()
+        metrics.flush_to_store()
     
     return new_tenders
 
 
+# Speichern laeuft in einem Thread; gleichzeitige Portal-Laeufe schreiben nacheinander
+_save_lock = asyncio.Lock()
+
+
+async def run_portal_crawler(portal: str) -> list:
+    """
+    Crawlt ein Portal und speichert dessen Tenders (ein Job des Schedulers).
+    Der Event-Loop bleibt waehrend des Speicherns frei fuer andere Portale.
+    Jeder Lauf landet in crawl_runs (Grundlage fuer den adaptiven Takt, cadence.py).
+    """
+    started_at = datetime.now()
+    pages_before = pages_fetched[portal]
+    try:
+        tenders = await crawl_portal(portal)
+        new_tenders = []
+        if tenders:
+            async with _save_lock:
+                new_tenders = await asyncio.to_thread(save_tenders_to_db, tenders, [portal])
+    except asyncio.CancelledError:
+        # maxRuntime ueberschritten: kurz synchron speichern, der Task wird gerade abgebrochen
+        record_run(portal, started_at, "aborted", pages=pages_fetched[portal] - pages_before)
+        raise
+    except Exception:
+        await asyncio.to_thread(
+            record_run, portal, started_at, "error", pages=pages_fetched[portal] - pages_before,
+        )
+        raise
+    await asyncio.to_thread(
+        record_run, portal, started_at, "ok",
+        len(tenders), len(new_tenders), pages_fetched[portal] - pages_before,
+    )
+    
+    try:
+        await asyncio.to_thread(prune_snapshots)
+    except Exception as e:
+        print(f"Snapshot-Bereinigung fehlgeschlagen: {e}")
+    
+    if new_tenders:
+        from notifier import dispatch_notification
+        dispatch_notification()
+    
+    print(f"[{portal}] {len(tenders)} gefunden, {len(new_tenders)} neu")
+    return tenders
+
+
 async def run_single_crawler(portal_key: str):
     """Führt einen einzelnen Crawler aus"""
     if portal_key not in PORTALS:
@@ -172,17 +263,31 @@ async def run_all_crawlers():
     # Nutze die funktionierenden Crawler
     all_tenders = await crawl_all_working_portals()
     
-    # Alle Tenders speichern und neue zurueckbekommen
+    # Alle Tenders speichern und neue zurueckbekommen; ein Datenbankfehler bricht
+    # den Lauf nicht ab (Snapshot-Bereinigung, Outbox-Abarbeitung und Zusammenfassung folgen)
     new_tenders = []
     if all_tenders:
-        new_tenders = save_tenders_to_db(all_tenders)
+        try:
+            new_tenders = save_tenders_to_db(all_tenders)
+        except Exception as e:
+            # Wie run_portal_crawler: als Fehler der betroffenen Portale zaehlen
+            print(f"Speichern fehlgeschlagen: {e}")
+            for portal in sorted({tender["source_portal"] for tender in all_tenders}):
+                metrics.inc("tenderscout_crawl_errors_total", portal=portal)
+            metrics.flush_to_store()
+    
+    # Aufbewahrungsgrenzen des Snapshot-Speichers durchsetzen
+    try:
+        prune_snapshots()
+    except Exception as e:
+        print(f"Snapshot-Bereinigung fehlgeschlagen: {e}")
     
-    # E-Mail-Benachrichtigung senden wenn neue Tenders gefunden
+    # E-Mail-Benachrichtigung im Hintergrund - der Crawl wartet nicht auf den Mailserver
     if new_tenders:
         try:
-            from notifier import send_notification
-            print(f"\nSende E-Mail-Benachrichtigung fuer {len(new_tenders)} neue Ausschreibungen...")
-            send_notification(new_tenders)
+            from notifier import dispatch_notification
+            print(f"\nE-Mail-Benachrichtigung fuer {len(new_tenders)} neue Ausschreibungen eingereiht")
+            dispatch_notification()
         except Exception as e:
             print(f"E-Mail-Versand fehlgeschlagen: {e}")
     
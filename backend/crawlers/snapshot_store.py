@@ -0,0 +1,136 @@
+"""
+Content-adressierter Speicher fuer Rohseiten (HTML + Text) der Detailseiten.
+
+fetch_detail_page behaelt nur einen kurzen Textauszug. Damit verbesserte
+Extraktoren (Ort, Budget, Fristen) ohne erneutes Crawlen laufen koennen,
+wird jede Detailseite zstd-komprimiert unter dem sha256 ihres Inhalts
+abgelegt (SNAPSHOT_DIR/ab/abcdef....json.zst). Unveraenderte Seiten werden
+nur einmal gespeichert; Tender.snapshot_hash verweist auf den Inhalt.
+
+Metadaten (Groesse, zuletzt gesehen) liegen in page_snapshots und steuern
+die Aufbewahrung: prune_snapshots() loescht Snapshots, die laenger als
+SNAPSHOT_RETENTION_DAYS nicht mehr gesehen wurden, und danach die aeltesten,
+bis der Speicher unter SNAPSHOT_MAX_MB liegt.
+"""
+import hashlib
+import json
+import os
+from datetime import datetime, timedelta
+from typing import Optional
+
+import zstandard
+from sqlalchemy import func
+from sqlalchemy.dialects.sqlite import insert
+
+from config import SNAPSHOT_DIR, SNAPSHOT_ZSTD_LEVEL, SNAPSHOT_RETENTION_DAYS, SNAPSHOT_MAX_MB
+from database import SessionLocal, PageSnapshot, Tender
+
+
+PRUNE_CHUNK_SIZE = 500
+
+
+def snapshot_path(snapshot_hash: str) -> str:
+    return os.path.join(SNAPSHOT_DIR, snapshot_hash[:2], f"{snapshot_hash}.json.zst")
+
+
+def store_snapshot(url: str, html: str, text: str) -> str:
+    """
+    Speichert eine Rohseite (falls noch nicht vorhanden) und aktualisiert
+    ihren Zeitstempel.
+    Returns:
+        snapshot_hash fuer Tender.snapshot_hash
+    """
+    payload = json.dumps({"url": url, "html": html or "", "text": text or ""}, ensure_ascii=False).encode("utf-8")
+    snapshot_hash = hashlib.sha256(payload).hexdigest()
+    path = snapshot_path(snapshot_hash)
+
+    compressed_size = None
+    if not os.path.exists(path):
+        # Kompressoren sind nicht threadsicher - pro Aufruf einen anlegen
+        compressed = zstandard.ZstdCompressor(level=SNAPSHOT_ZSTD_LEVEL).compress(payload)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(compressed)
+        os.replace(tmp_path, path)
+        compressed_size = len(compressed)
+
+    now = datetime.utcnow()
+    db = SessionLocal()
+    try:
+        statement = insert(PageSnapshot).values(
+            hash=snapshot_hash, url=url, size=len(payload),
+            compressed_size=compressed_size or os.path.getsize(path),
+            created_at=now, last_seen_at=now,
+        )
+        db.execute(statement.on_conflict_do_update(
+            index_elements=[PageSnapshot.hash], set_={"last_seen_at": now},
+        ))
+        db.commit()
+    finally:
+        db.close()
+    return snapshot_hash
+
+
+def load_snapshot(snapshot_hash: str) -> Optional[dict]:
+    """Rohseite als {"url", "html", "text"} oder None wenn nicht (mehr) vorhanden"""
+    if not snapshot_hash:
+        return None
+    try:
+        with open(snapshot_path(snapshot_hash), "rb") as f:
+            payload = zstandard.ZstdDecompressor().decompress(f.read())
+    except FileNotFoundError:
+        return None
+    return json.loads(payload)
+
+
+def _delete(db, hashes: list):
+    """Loescht Snapshots (Dateien, Metadaten) und Verweise der Tenders"""
+    for i in range(0, len(hashes), PRUNE_CHUNK_SIZE):
+        chunk = hashes[i:i + PRUNE_CHUNK_SIZE]
+        db.query(Tender).filter(Tender.snapshot_hash.in_(chunk)).update(
+            {Tender.snapshot_hash: None}, synchronize_session=False
+        )
+        db.query(PageSnapshot).filter(PageSnapshot.hash.in_(chunk)).delete(synchronize_session=False)
+    db.commit()
+    for snapshot_hash in hashes:
+        try:
+            os.remove(snapshot_path(snapshot_hash))
+        except FileNotFoundError:
+            pass
+
+
+def prune_snapshots(retention_days: int = SNAPSHOT_RETENTION_DAYS, max_mb: int = SNAPSHOT_MAX_MB) -> int:
+    """
+    Setzt die Aufbewahrungsgrenzen durch (Alter, dann Gesamtgroesse).
+    Returns:
+        Anzahl geloeschter Snapshots
+    """
+    db = SessionLocal()
+    try:
+        cutoff = datetime.utcnow() - timedelta(days=retention_days)
+        expired = [
+            row.hash for row in db.query(PageSnapshot.hash).filter(PageSnapshot.last_seen_at < cutoff)
+        ]
+        _delete(db, expired)
+
+        # Aelteste zuerst, bis die Gesamtgroesse wieder passt
+        over_budget = []
+        excess = (db.query(func.sum(PageSnapshot.compressed_size)).scalar() or 0) - max_mb * 1024 * 1024
+        if excess > 0:
+            rows = db.query(PageSnapshot.hash, PageSnapshot.compressed_size).order_by(
+                PageSnapshot.last_seen_at, PageSnapshot.hash
+            )
+            for row in rows:
+                if excess <= 0:
+                    break
+                over_budget.append(row.hash)
+                excess -= row.compressed_size
+            _delete(db, over_budget)
+    finally:
+        db.close()
+
+    removed = len(expired) + len(over_budget)
+    if removed:
+        print(f"  {removed} Snapshots geloescht (Aufbewahrung)")
+    return removed
@@ -0,0 +1,256 @@
+"""
+Vektorisierter Kategorie-Klassifikator fuer viele Ausschreibungen pro Aufruf.
+
+Merkmale je Text:
+- Keyword-Treffer aus CATEGORIES (2 = im Titel, 1 = nur Beschreibung)
+- Woerter als gehashter Bag-of-Words (feste Anzahl Spalten)
+
+Ein lineares Modell (Gewichte Merkmal x Kategorie) bewertet alle Texte mit
+einer einzigen Sparse-Multiplikation. Die Startgewichte entsprechen genau
+categorize_tender; korrigierte Kategorien trainieren das Modell nach
+(Perzeptron-Updates, ebenfalls vektorisiert).
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+import zlib
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from config import CATEGORY_MODEL_PATH
+from crawlers import category_cache
+from crawlers.categorizer import CATEGORIES, _KEYWORD_CATEGORIES, get_all_categories, match_keywords
+
+
+HASH_FEATURES = 2 ** 16
+FALLBACK_BIAS = 0.5  # "Sonstige Bauleistungen" gewinnt nur ohne Keyword-Treffer
+
+_WORD_PATTERN = re.compile(r"[^\W\d_]{3,}")
+
+
+class TextClassifier:
+    """Lineares Modell ueber Keyword- und Hash-Merkmalen"""
+
+    def __init__(self, weights: Optional[np.ndarray] = None, bias: Optional[np.ndarray] = None):
+        self.classes = get_all_categories()
+        self.keywords = list(_KEYWORD_CATEGORIES)
+        self._keyword_index = {keyword: i for i, keyword in enumerate(self.keywords)}
+        self._class_index = {category: i for i, category in enumerate(self.classes)}
+        self.n_features = len(self.keywords) + HASH_FEATURES
+
+        if weights is None:
+            weights, bias = self._initial_weights()
+        self.weights = weights
+        self.bias = bias
+        self._version = None
+
+    @property
+    def version(self) -> str:
+        """Kennung aus CATEGORIES und Gewichten - aendert sich mit jedem Regelwerk/Training"""
+        if self._version is None:
+            digest = hashlib.sha1(json.dumps(CATEGORIES, sort_keys=True, ensure_ascii=False).encode("utf-8"))
+            digest.update(self.weights.tobytes())
+            digest.update(self.bias.tobytes())
+            self._version = digest.hexdigest()[:16]
+        return self._version
+
+    def _initial_weights(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Gewichte aus CATEGORIES: Keyword -> 1 fuer jede seiner Kategorien"""
+        weights = np.zeros((self.n_features, len(self.classes)), dtype=np.float32)
+        for i, keyword in enumerate(self.keywords):
+            for category in _KEYWORD_CATEGORIES[keyword]:
+                weights[i, self._class_index[category]] = 1.0
+
+        bias = np.zeros(len(self.classes), dtype=np.float32)
+        bias[self._class_index["Sonstige Bauleistungen"]] = FALLBACK_BIAS
+        return weights, bias
+
+    def _token_features(self, token: str) -> List[int]:
+        """Merkmals-Spalten eines einzelnen Tokens (Keywords + gehashte Woerter)"""
+        columns = [self._keyword_index[keyword] for keyword in match_keywords(token)]
+        columns.extend(
+            len(self.keywords) + zlib.crc32(word.encode("utf-8")) % HASH_FEATURES
+            for word in _WORD_PATTERN.findall(token)
+        )
+        return columns
+
+    def features(self, items: Sequence[Tuple[str, str]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Sparse-Merkmalsmatrix im COO-Format fuer normalisierte
+        (Titel, Beschreibung)-Paare (normalize_text).
+
+        Keywords enthalten keine Leerzeichen, daher werden Keywords und
+        Woerter nur einmal pro unterschiedlichem Token ermittelt und per
+        NumPy auf alle Vorkommen verteilt.
+        Returns:
+            (rows, cols, values) - je ein Eintrag pro Merkmal eines Textes
+        """
+        tokens, token_rows, token_in_title = [], [], []
+        for row, (title, description) in enumerate(items):
+            title_tokens = (title or "").split()
+            description_tokens = (description or "").split()
+            tokens.extend(title_tokens)
+            tokens.extend(description_tokens)
+            token_rows.extend([row] * (len(title_tokens) + len(description_tokens)))
+            token_in_title.extend([True] * len(title_tokens) + [False] * len(description_tokens))
+
+        empty = np.empty(0, dtype=np.int64)
+        if not tokens:
+            return empty, empty, np.empty(0, dtype=np.float32)
+
+        vocabulary = {token: i for i, token in enumerate(dict.fromkeys(tokens))}
+        token_ids = np.fromiter(map(vocabulary.__getitem__, tokens), dtype=np.int64, count=len(tokens))
+
+        # Merkmale je Vokabel als CSR (ptr, columns)
+        per_token = [self._token_features(token) for token in vocabulary]
+        ptr = np.zeros(len(per_token) + 1, dtype=np.int64)
+        np.cumsum([len(columns) for columns in per_token], out=ptr[1:])
+        columns = np.fromiter(
+            (column for token_columns in per_token for column in token_columns),
+            dtype=np.int64, count=ptr[-1],
+        )
+
+        # Auf alle Vorkommen verteilen
+        counts = ptr[token_ids + 1] - ptr[token_ids]
+        occurrence = np.repeat(np.arange(len(token_ids)), counts)
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        cols = columns[np.repeat(ptr[token_ids], counts) + offsets]
+        rows = np.asarray(token_rows, dtype=np.int64)[occurrence]
+
+        # Pro Text und Merkmal ein Eintrag: Keyword im Titel = 2, sonst 1
+        keys = rows * self.n_features + cols
+        in_title = np.asarray(token_in_title)[occurrence] & (cols < len(self.keywords))
+        unique_keys = np.sort(keys)
+        unique_keys = unique_keys[np.r_[True, unique_keys[1:] != unique_keys[:-1]]]
+        values = np.where(np.isin(unique_keys, keys[in_title]), 2.0, 1.0).astype(np.float32)
+        rows, cols = np.divmod(unique_keys, self.n_features)
+        return rows, cols, values
+
+    def _scores(self, n_items: int, rows: np.ndarray, cols: np.ndarray, values: np.ndarray) -> np.ndarray:
+        """Bias + Summe der Gewichte je Text (rows ist aufsteigend sortiert)"""
+        scores = np.tile(self.bias, (n_items, 1))
+        if len(rows):
+            starts = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]])
+            present = rows[starts]
+            scores[present] += np.add.reduceat(self.weights[cols] * values[:, None], starts)
+        return scores
+
+    def scores(self, items: Sequence[Tuple[str, str]]) -> np.ndarray:
+        """Score-Matrix (Texte x Kategorien in der Reihenfolge von self.classes)"""
+        return self._scores(len(items), *self.features(items))
+
+    def predict(self, items: Sequence[Tuple[str, str]]) -> List[str]:
+        """Kategorie pro (Titel, Beschreibung); bei Gleichstand gewinnt die erste in CATEGORIES"""
+        if not items:
+            return []
+        return [self.classes[i] for i in self.scores(items).argmax(axis=1)]
+
+    def fit(self, items: Sequence[Tuple[str, str]], labels: Sequence[str],
+            epochs: int = 10, learning_rate: float = 0.1) -> int:
+        """
+        Trainiert mit korrigierten Kategorien nach (Perzeptron).
+
+        Pro Epoche werden alle falsch kategorisierten Texte gleichzeitig
+        zur richtigen Kategorie hin und von der falschen weg verschoben.
+        Der Bias bleibt fest, damit wenige Korrekturen nicht alle Texte kippen.
+        Returns:
+            Anzahl weiterhin falsch kategorisierter Texte
+        """
+        known = [i for i, label in enumerate(labels) if label in self._class_index]
+        items = [items[i] for i in known]
+        if not items:
+            return 0
+        targets = np.array([self._class_index[labels[i]] for i in known])
+        rows, cols, values = self.features(items)
+
+        self._version = None
+        errors = 0
+        for _ in range(epochs):
+            predicted = self._scores(len(items), rows, cols, values).argmax(axis=1)
+            wrong = predicted != targets
+            errors = int(wrong.sum())
+            if not errors:
+                break
+
+            mask = wrong[rows]
+            wrong_rows, wrong_cols, step = rows[mask], cols[mask], values[mask] * learning_rate
+            np.add.at(self.weights, (wrong_cols, targets[wrong_rows]), step)
+            np.add.at(self.weights, (wrong_cols, predicted[wrong_rows]), -step)
+        return errors
+
+    def save(self, path: str = CATEGORY_MODEL_PATH):
+        """Schreibt atomar (andere Prozesse laden das Modell bei geaenderter Datei neu)"""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez_compressed(
+                f,
+                weights=self.weights,
+                bias=self.bias,
+                classes=np.array(self.classes),
+                keywords=np.array(self.keywords),
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str = CATEGORY_MODEL_PATH) -> "TextClassifier":
+        """
+        Laedt ein trainiertes Modell. Passt es nicht mehr zu CATEGORIES
+        (Kategorien oder Keywords geaendert), wird neu initialisiert.
+        """
+        if os.path.exists(path):
+            with np.load(path) as data:
+                if (data["classes"].tolist() == get_all_categories()
+                        and data["keywords"].tolist() == list(_KEYWORD_CATEGORIES)
+                        and data["weights"].shape[0] == len(_KEYWORD_CATEGORIES) + HASH_FEATURES):
+                    return cls(data["weights"], data["bias"])
+            print("Kategorie-Modell passt nicht zu CATEGORIES - starte mit Keyword-Gewichten")
+        return cls()
+
+
+_classifier: Optional[TextClassifier] = None
+_classifier_mtime: Optional[int] = None  # Aenderungszeit der geladenen Modelldatei
+_classifier_lock = threading.Lock()
+
+
+def _model_mtime() -> Optional[int]:
+    try:
+        return os.stat(CATEGORY_MODEL_PATH).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def get_classifier() -> TextClassifier:
+    """
+    Modell laden und im Prozess halten. Hat ein anderer Prozess die Datei
+    neu gespeichert (z.B. /api/categories/retrain in der API, waehrend der
+    Scheduler crawlt), wird beim naechsten Aufruf neu geladen.
+    """
+    global _classifier, _classifier_mtime
+    mtime = _model_mtime()
+    with _classifier_lock:
+        if _classifier is None or mtime != _classifier_mtime:
+            _classifier = TextClassifier.load()
+            _classifier_mtime = mtime
+        return _classifier
+
+
+def train_classifier(items: Sequence[Tuple[str, str]], labels: Sequence[str]) -> int:
+    """
+    Trainiert ein frisches Modell (Keyword-Startgewichte) mit den
+    Korrekturen, speichert es und nutzt es ab sofort in diesem Prozess.
+    Gecachte Kategorien anderer Modellstaende werden danach verworfen.
+    Returns:
+        Anzahl weiterhin falsch kategorisierter Trainingstexte
+    """
+    global _classifier, _classifier_mtime
+    classifier = TextClassifier()
+    errors = classifier.fit(items, labels)
+    classifier.save()
+    with _classifier_lock:
+        _classifier = classifier
+        _classifier_mtime = _model_mtime()
+    category_cache.purge_except(classifier.version)
+    return errors
@@ -0,0 +1,47 @@
+"""
+Baut aus einer Wortliste ein Regex-Muster in Trie-Form.
+
+Gemeinsame Praefixe stehen nur einmal im Muster ("tür(?:en)?" statt
+"tür|türen"), daher prueft die Regex-Engine pro Textposition hoechstens
+einen Pfad der Laenge des laengsten Wortes - unabhaengig von der Anzahl
+der Woerter. An jeder Position wird das laengste passende Wort gefunden.
+"""
+import re
+from typing import Iterable
+
+_END = ""
+
+
+def _build_trie(words: Iterable[str]) -> dict:
+    trie: dict = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[_END] = {}
+    return trie
+
+
+def _node_pattern(node: dict) -> str:
+    optional = _END in node
+    branches = [re.escape(char) + _node_pattern(child)
+                for char, child in sorted(node.items()) if char != _END]
+    if not branches:
+        return ""
+
+    if len(branches) == 1:
+        pattern = branches[0]
+        if optional:
+            pattern = f"(?:{pattern})?" if len(pattern) > 1 else f"{pattern}?"
+        return pattern
+
+    pattern = "(?:" + "|".join(branches) + ")"
+    return pattern + "?" if optional else pattern
+
+
+def build_trie_pattern(words: Iterable[str]) -> str:
+    """Regex-Muster (ohne Gruppe/Anker), das jedes der Woerter erkennt"""
+    words = [word for word in words if word]
+    if not words:
+        return "(?!)"  # passt nie
+    return _node_pattern(_build_trie(words))
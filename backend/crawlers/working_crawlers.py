@@ -1,57 +1,43 @@
 """
 Erweiterte Crawler - holen Erstellungsdatum und vollstaendige Beschreibungen
+
+Die Kategorie wird nicht hier, sondern gesammelt beim Speichern vergeben
+(run_all.save_tenders_to_db -> categorize_many mit Cache).
+
+Jeder Crawler bekommt den RelevanceFilter des Durchlaufs: Listeneintraege
+werden vor dem Detail-Abruf geprueft, fertige Ausschreibungen danach.
 """
 import asyncio
 import re
 import hashlib
+import time
 from datetime import datetime, timedelta
-from playwright.async_api import async_playwright
-from crawlers.categorizer import categorize_tender
+from budget import find_budget
+from crawlers.browser import launch_browser, close_browser
+from crawlers.extract import extract_page_fields
+from crawlers.gazetteer import find_place
+from crawlers.relevance import RelevanceFilter
+from crawlers.snapshot_store import store_snapshot
+import metrics
+
+
+# Portal-Bezeichnungen (source_portal und Metrik-Label)
+PORTAL_AUSSCHREIBUNG_AT = "ausschreibung.at"
+PORTAL_TENDER24 = "tender24.de"
+PORTAL_STAATSANZEIGER = "staatsanzeiger-eservices.de"
+PORTAL_DEUTSCHE_EVERGABE = "deutsche-evergabe.de"
+PORTAL_RIB = "meinauftrag.rib.de"
 
 
 def extract_city_from_text(text: str) -> str:
     """Extrahiert Stadtname aus Text"""
-    # Bekannte Staedte in DACH-Region
-    cities = [
-        # Oesterreich
-        "Wien", "Graz", "Linz", "Salzburg", "Innsbruck", "Klagenfurt", "Villach", 
-        "Wels", "St. Poelten", "Dornbirn", "Wiener Neustadt", "Steyr", "Feldkirch",
-        "Bregenz", "Leonding", "Klosterneuburg", "Baden", "Wolfsberg", "Leoben",
-        # Deutschland
-        "Berlin", "Hamburg", "Muenchen", "Koeln", "Frankfurt", "Stuttgart", "Duesseldorf",
-        "Leipzig", "Dortmund", "Essen", "Bremen", "Dresden", "Hannover", "Nuernberg",
-        "Duisburg", "Bochum", "Wuppertal", "Bielefeld", "Bonn", "Muenster", "Karlsruhe",
-        "Mannheim", "Augsburg", "Wiesbaden", "Moenchengladbach", "Gelsenkirchen", "Aachen",
-        "Braunschweig", "Chemnitz", "Kiel", "Krefeld", "Halle", "Magdeburg", "Freiburg",
-        "Oberhausen", "Luebeck", "Erfurt", "Mainz", "Rostock", "Kassel", "Hagen",
-        "Saarbruecken", "Hamm", "Potsdam", "Ludwigshafen", "Oldenburg", "Leverkusen",
-        "Osnabrueck", "Solingen", "Heidelberg", "Herne", "Neuss", "Darmstadt", "Paderborn",
-        "Regensburg", "Ingolstadt", "Wuerzburg", "Wolfsburg", "Fuerth", "Ulm", "Heilbronn",
-        "Offenbach", "Goettingen", "Bottrop", "Pforzheim", "Recklinghausen", "Reutlingen",
-        "Koblenz", "Remscheid", "Bergisch Gladbach", "Bremerhaven", "Jena", "Trier",
-        "Erlangen", "Moers", "Siegen", "Hildesheim", "Salzgitter", "Cottbus", "Kaiserslautern",
-        # Schweiz
-        "Zuerich", "Genf", "Basel", "Bern", "Lausanne", "Winterthur", "Luzern", "St. Gallen",
-        # Mit Umlauten
-        "München", "Köln", "Düsseldorf", "Nürnberg", "Würzburg", "Zürich", "Pölten"
-    ]
-    
-    text_lower = text.lower()
-    for city in cities:
-        if city.lower() in text_lower:
-            return city
-    
-    # Versuche PLZ + Ort zu finden (z.B. "79618 Rheinfelden" oder "5020 Salzburg")
-    plz_match = re.search(r'(\d{4,5})\s+([A-Z][a-zäöüß]+(?:\s+[A-Z][a-zäöüß]+)?)', text)
-    if plz_match:
-        return plz_match.group(2)
-    
-    return ""
+    place = find_place(text)
+    return place.city if place else ""
 
 
 async def fetch_detail_page(page, url: str) -> dict:
     """Holt Details von einer Ausschreibungs-Detailseite"""
-    details = {"description": "", "authority": "", "location": "", "deadline": "", "published_at": "", "budget": ""}
+    details = {"description": "", "authority": "", "location": "", "country": "", "deadline": "", "published_at": "", "budget": "", "snapshot_hash": ""}
     
     try:
         await page.goto(url, timeout=20000)
@@ -63,10 +49,16 @@ async def fetch_detail_page(page, url: str) -> dict:
         if body:
             full_text = await body.text_content() or ""
         
-        # Extrahiere Stadt aus dem Text
-        city = extract_city_from_text(full_text)
-        if city:
-            details["location"] = city
+        # Rohseite fuer spaetere Neu-Extraktion ablegen (Komprimieren und Schreiben im Thread,
+        # der Event-Loop bleibt frei fuer die anderen Portale)
+        try:
+            html = await page.content()
+            details["snapshot_hash"] = await asyncio.to_thread(store_snapshot, url, html, full_text)
+        except Exception as e:
+            print(f"    Snapshot fehlgeschlagen: {e}")
+        
+        # Ort (Stadt, Land) und Budget aus dem Text (wie backfill.py)
+        details.update(extract_page_fields(full_text))
         
         # Versuche verschiedene Selektoren fuer Beschreibung
         description_selectors = [
@@ -97,14 +89,13 @@ async def fetch_detail_page(page, url: str) -> dict:
     return details
 
 
-async def crawl_ausschreibung_at() -> list:
+async def crawl_ausschreibung_at(relevance: RelevanceFilter = None) -> list:
     """Crawlt ausschreibung.at mit erweiterten Details"""
     print("  Crawle ausschreibung.at (mit Details)...")
+    relevance = relevance or RelevanceFilter()
     tenders = []
     
-    pw = await async_playwright().start()
-    browser = await pw.chromium.launch(headless=True)
-    page = await browser.new_page()
+    pw, browser, page = await launch_browser(PORTAL_AUSSCHREIBUNG_AT)
     
     try:
         await page.goto("https://www.ausschreibung.at", timeout=30000)
@@ -143,13 +134,16 @@ async def crawl_ausschreibung_at() -> list:
                     
                     title = re.sub(r'\s*vom \d{2}\.\d{2}\.\d{4}', '', text).strip()
                     
-                    found_urls.append({
+                    item = {
                         "id": f"at_{tender_id}",
                         "title": title[:200],
                         "url": full_url,
                         "published_at": published_at,
-                        "deadline": deadline
-                    })
+                        "deadline": deadline,
+                        "source_portal": PORTAL_AUSSCHREIBUNG_AT
+                    }
+                    if relevance.check_listing(item):
+                        found_urls.append(item)
             except:
                 continue
         
@@ -160,29 +154,32 @@ async def crawl_ausschreibung_at() -> list:
                 
                 # Extrahiere Stadt aus Titel oder Details
                 city = details.get("location") or extract_city_from_text(item["title"])
-                location = f"{city}, Oesterreich" if city else "Oesterreich"
+                country = details.get("country") or "Oesterreich"
+                location = f"{city}, {country}" if city else country
                 
                 description = details.get("description") or f"Ausschreibung: {item['title']}"
-                tenders.append({
+                tender = {
                     "id": item["id"],
                     "title": item["title"],
                     "authority": details.get("authority") or "Vergabestelle Oesterreich",
                     "location": location,
                     "deadline": item["deadline"],
                     "published_at": item["published_at"],
-                    "budget": details.get("budget"),
-                    "category": categorize_tender(item["title"], description),
+                    "budget": details.get("budget") or None,
                     "description": description,
                     "source_url": item["url"],
-                    "source_portal": "ausschreibung.at"
-                })
+                    "source_portal": PORTAL_AUSSCHREIBUNG_AT,
+                    "snapshot_hash": details.get("snapshot_hash") or None
+                }
+                if relevance.check_detail(tender):
+                    tenders.append(tender)
             except:
                 # Fallback - versuche Stadt aus Titel
                 city = extract_city_from_text(item["title"])
                 location = f"{city}, Oesterreich" if city else "Oesterreich"
                 
                 fallback_desc = f"Ausschreibung von ausschreibung.at: {item['title']}"
-                tenders.append({
+                tender = {
                     "id": item["id"],
                     "title": item["title"],
                     "authority": "Vergabestelle Oesterreich",
@@ -190,31 +187,32 @@ async def crawl_ausschreibung_at() -> list:
                     "deadline": item["deadline"],
                     "published_at": item["published_at"],
                     "budget": None,
-                    "category": categorize_tender(item["title"], fallback_desc),
                     "description": fallback_desc,
                     "source_url": item["url"],
-                    "source_portal": "ausschreibung.at"
-                })
+                    "source_portal": PORTAL_AUSSCHREIBUNG_AT
+                }
+                # Gleiche Pruefung wie mit Detailseite; Verworfene landen in dropped_tenders
+                if relevance.check_detail(tender):
+                    tenders.append(tender)
         
         print(f"    -> {len(tenders)} Ausschreibungen mit Details")
         
     except Exception as e:
         print(f"    Fehler: {e}")
+        metrics.inc("tenderscout_crawl_errors_total", portal=PORTAL_AUSSCHREIBUNG_AT)
     finally:
-        await browser.close()
-        await pw.stop()
+        await close_browser(pw, browser)
     
     return tenders
 
 
-async def crawl_tender24() -> list:
+async def crawl_tender24(relevance: RelevanceFilter = None) -> list:
     """Crawlt tender24.de mit erweiterten Details"""
     print("  Crawle tender24.de (mit Details)...")
+    relevance = relevance or RelevanceFilter()
     tenders = []
     
-    pw = await async_playwright().start()
-    browser = await pw.chromium.launch(headless=True)
-    page = await browser.new_page()
+    pw, browser, page = await launch_browser(PORTAL_TENDER24)
     
     try:
         await page.goto("https://www.tender24.de", timeout=30000)
@@ -268,15 +266,18 @@ async def crawl_tender24() -> list:
                         except:
                             deadline = (datetime.now() + timedelta(days=14)).strftime("%Y-%m-%d")
                         
-                        found_items.append({
+                        item = {
                             "id": f"t24_{tender_id}",
                             "title": title_text[:200],
                             "authority": authority_text[:150] if authority_text else "Diverse Vergabestellen",
                             "url": url,
                             "published_at": published_at,
                             "deadline": deadline,
-                            "procedure": procedure
-                        })
+                            "procedure": procedure,
+                            "source_portal": PORTAL_TENDER24
+                        }
+                        if relevance.check_listing(item, item["authority"], procedure):
+                            found_items.append(item)
             except:
                 continue
         
@@ -290,6 +291,8 @@ async def crawl_tender24() -> list:
                 # Extrahiere Stadt aus Titel und Authority
                 city = extract_city_from_text(item["title"]) or extract_city_from_text(item["authority"])
                 location = f"{city}, Deutschland" if city else "Deutschland"
+                budget = None
+                snapshot_hash = None
                 
                 # Versuche Detail-Seite zu laden
                 if item["url"] != "https://www.tender24.de":
@@ -299,23 +302,27 @@ async def crawl_tender24() -> list:
                             description = details["description"]
                         if details.get("location") and not city:
                             city = details["location"]
-                            location = f"{city}, Deutschland"
+                            location = f"{city}, {details.get('country') or 'Deutschland'}"
+                        budget = details.get("budget") or None
+                        snapshot_hash = details.get("snapshot_hash") or None
                     except:
                         pass
                 
-                tenders.append({
+                tender = {
                     "id": item["id"],
                     "title": item["title"],
                     "authority": item["authority"],
                     "location": location,
                     "deadline": item["deadline"],
                     "published_at": item["published_at"],
-                    "budget": None,
-                    "category": categorize_tender(item["title"], description),
+                    "budget": budget,
                     "description": description,
                     "source_url": item["url"],
-                    "source_portal": "tender24.de"
-                })
+                    "source_portal": PORTAL_TENDER24,
+                    "snapshot_hash": snapshot_hash
+                }
+                if relevance.check_detail(tender):
+                    tenders.append(tender)
             except:
                 continue
         
@@ -323,21 +330,20 @@ async def crawl_tender24() -> list:
         
     except Exception as e:
         print(f"    Fehler: {e}")
+        metrics.inc("tenderscout_crawl_errors_total", portal=PORTAL_TENDER24)
     finally:
-        await browser.close()
-        await pw.stop()
+        await close_browser(pw, browser)
     
     return tenders
 
 
-async def crawl_staatsanzeiger() -> list:
+async def crawl_staatsanzeiger(relevance: RelevanceFilter = None) -> list:
     """Crawlt staatsanzeiger-eservices.de mit erweiterten Details"""
     print("  Crawle staatsanzeiger-eservices.de (mit Details)...")
+    relevance = relevance or RelevanceFilter()
     tenders = []
     
-    pw = await async_playwright().start()
-    browser = await pw.chromium.launch(headless=True)
-    page = await browser.new_page()
+    pw, browser, page = await launch_browser(PORTAL_STAATSANZEIGER)
     
     try:
         await page.goto("https://www.staatsanzeiger-eservices.de/sol-b.html", timeout=30000)
@@ -371,7 +377,7 @@ async def crawl_staatsanzeiger() -> list:
             location = f"{city}, Baden-Wuerttemberg" if city else "Baden-Wuerttemberg, Deutschland"
             
             staatsanzeiger_desc = f"Ausschreibung vom Staatsanzeiger Baden-Wuerttemberg: {item['title']}"
-            tenders.append({
+            tender = {
                 "id": item["id"],
                 "title": item["title"],
                 "authority": "Staatsanzeiger Baden-Wuerttemberg",
@@ -379,31 +385,32 @@ async def crawl_staatsanzeiger() -> list:
                 "deadline": (datetime.now() + timedelta(days=21)).strftime("%Y-%m-%d"),
                 "published_at": item["published_at"],
                 "budget": None,
-                "category": categorize_tender(item["title"], staatsanzeiger_desc),
                 "description": staatsanzeiger_desc,
                 "source_url": item["url"],
-                "source_portal": "staatsanzeiger-eservices.de"
-            })
+                "source_portal": PORTAL_STAATSANZEIGER
+            }
+            if relevance.check_detail(tender):
+                tenders.append(tender)
         
         print(f"    -> {len(tenders)} Ausschreibungen gefunden")
         
     except Exception as e:
         print(f"    Fehler: {e}")
+        metrics.inc("tenderscout_crawl_errors_total", portal=PORTAL_STAATSANZEIGER)
     finally:
-        await browser.close()
-        await pw.stop()
+        await close_browser(pw, browser)
     
     return tenders
 
 
-async def crawl_deutsche_evergabe() -> list:
+async def crawl_deutsche_evergabe(relevance: RelevanceFilter = None) -> list:
     """Crawlt deutsche-evergabe.de"""
     print("  Crawle deutsche-evergabe.de...")
+    relevance = relevance or RelevanceFilter()
     tenders = []
+    seen_titles = set()
     
-    pw = await async_playwright().start()
-    browser = await pw.chromium.launch(headless=True)
-    page = await browser.new_page()
+    pw, browser, page = await launch_browser(PORTAL_DEUTSCHE_EVERGABE)
     
     try:
         await page.goto("https://www.deutsche-evergabe.de", timeout=30000)
@@ -424,9 +431,10 @@ async def crawl_deutsche_evergabe() -> list:
                     city = extract_city_from_text(text)
                     location = f"{city}, Deutschland" if city else "Deutschland"
                     
-                    if text not in [t["title"] for t in tenders]:
+                    if text not in seen_titles:
+                        seen_titles.add(text)
                         devergabe_desc = f"Ausschreibung von Deutsche eVergabe: {text}"
-                        tenders.append({
+                        tender = {
                             "id": f"dev_{tender_id}",
                             "title": text[:200],
                             "authority": "Deutsche eVergabe",
@@ -434,11 +442,12 @@ async def crawl_deutsche_evergabe() -> list:
                             "deadline": (datetime.now() + timedelta(days=21)).strftime("%Y-%m-%d"),
                             "published_at": datetime.now().strftime("%Y-%m-%d"),
                             "budget": None,
-                            "category": categorize_tender(text[:200], devergabe_desc),
                             "description": devergabe_desc,
                             "source_url": full_url if full_url.startswith("http") else "https://www.deutsche-evergabe.de",
-                            "source_portal": "deutsche-evergabe.de"
-                        })
+                            "source_portal": PORTAL_DEUTSCHE_EVERGABE
+                        }
+                        if relevance.check_detail(tender):
+                            tenders.append(tender)
             except:
                 continue
         
@@ -446,21 +455,20 @@ async def crawl_deutsche_evergabe() -> list:
         
     except Exception as e:
         print(f"    Fehler: {e}")
+        metrics.inc("tenderscout_crawl_errors_total", portal=PORTAL_DEUTSCHE_EVERGABE)
     finally:
-        await browser.close()
-        await pw.stop()
+        await close_browser(pw, browser)
     
     return tenders
 
 
-async def crawl_rib_meinauftrag() -> list:
+async def crawl_rib_meinauftrag(relevance: RelevanceFilter = None) -> list:
     """Crawlt meinauftrag.rib.de"""
     print("  Crawle meinauftrag.rib.de...")
+    relevance = relevance or RelevanceFilter()
     tenders = []
     
-    pw = await async_playwright().start()
-    browser = await pw.chromium.launch(headless=True)
-    page = await browser.new_page()
+    pw, browser, page = await launch_browser(PORTAL_RIB)
     
     try:
         await page.goto("https://meinauftrag.rib.de/public/publications", timeout=30000)
@@ -491,19 +499,20 @@ async def crawl_rib_meinauftrag() -> list:
                     location = f"{city}, Deutschland" if city else "Deutschland"
                     
                     rib_desc = clean_text[:1000]
-                    tenders.append({
+                    tender = {
                         "id": f"rib_{tender_id}",
                         "title": title,
                         "authority": "RIB Vergabeplattform",
                         "location": location,
                         "deadline": (datetime.now() + timedelta(days=14)).strftime("%Y-%m-%d"),
                         "published_at": datetime.now().strftime("%Y-%m-%d"),
-                        "budget": None,
-                        "category": categorize_tender(title, rib_desc),
+                        "budget": find_budget(clean_text) or None,
                         "description": rib_desc,
                         "source_url": url,
-                        "source_portal": "meinauftrag.rib.de"
-                    })
+                        "source_portal": PORTAL_RIB
+                    }
+                    if relevance.check_detail(tender):
+                        tenders.append(tender)
             except:
                 continue
         
@@ -511,15 +520,15 @@ async def crawl_rib_meinauftrag() -> list:
         
     except Exception as e:
         print(f"    Fehler: {e}")
+        metrics.inc("tenderscout_crawl_errors_total", portal=PORTAL_RIB)
     finally:
-        await browser.close()
-        await pw.stop()
+        await close_browser(pw, browser)
     
     return tenders
 
 
-def load_custom_portals() -> list:
-    """Laedt benutzerdefinierte Portale aus settings.json"""
+def load_crawl_settings() -> dict:
+    """Laedt settings.json (leer wenn nicht vorhanden oder ungueltig)"""
     import os
     import json
     
@@ -528,69 +537,120 @@ def load_custom_portals() -> list:
     try:
         if os.path.exists(settings_file):
             with open(settings_file, "r", encoding="utf-8") as f:
-                settings = json.load(f)
-                return settings.get("customPortals", [])
+                return json.load(f)
     except:
         pass
     
-    return []
+    return {}
 
 
-async def crawl_all_working_portals() -> list:
-    """Crawlt ALLE konfigurierten Portale inkl. benutzerdefinierter Portale"""
+def load_custom_portals(settings: dict = None) -> list:
+    """Laedt benutzerdefinierte Portale aus settings.json"""
+    if settings is None:
+        settings = load_crawl_settings()
+    return settings.get("customPortals", [])
+
+
+async def crawl_with_metrics(portal: str, crawl_func, *args) -> list:
+    """Fuehrt einen Portal-Crawler aus und erfasst Dauer und Trefferzahl"""
+    start = time.perf_counter()
+    try:
+        tenders = await crawl_func(*args)
+    finally:
+        metrics.observe("tenderscout_crawl_duration_seconds", time.perf_counter() - start, portal=portal)
+    metrics.inc("tenderscout_crawl_tenders_found_total", len(tenders), portal=portal)
+    metrics.flush_to_store()
+    return tenders
+
+
+# Standard-Portale: (Anzeigename, Portal, Crawler)
+STANDARD_PORTALS = [
+    ("Ausschreibung.at", PORTAL_AUSSCHREIBUNG_AT, crawl_ausschreibung_at),
+    ("Staatsanzeiger", PORTAL_STAATSANZEIGER, crawl_staatsanzeiger),
+    ("Deutsche eVergabe", PORTAL_DEUTSCHE_EVERGABE, crawl_deutsche_evergabe),
+    ("RIB Meinauftrag", PORTAL_RIB, crawl_rib_meinauftrag),
+    ("Tender24", PORTAL_TENDER24, crawl_tender24),
+]
+
+
+def portal_names(settings: dict = None) -> list:
+    """Alle zu crawlenden Portale (wie source_portal): Standard- und aktive benutzerdefinierte"""
+    custom_portals = load_custom_portals(settings)
+    return [portal for _, portal, _ in STANDARD_PORTALS] + [
+        cp.get("name", "Unbekannt") for cp in custom_portals if cp.get("enabled", True)
+    ]
+
+
+async def _crawl_custom(cp: dict, relevance: RelevanceFilter) -> list:
     from crawlers.generic_crawler import crawl_custom_portal
     
+    try:
+        tenders = await crawl_with_metrics(cp.get("name", "Unbekannt"), crawl_custom_portal, cp)
+    except Exception as e:
+        print(f"    Fehler: {e}")
+        metrics.inc("tenderscout_crawl_errors_total", portal=cp.get("name", "Unbekannt"))
+        return []
+    return [tender for tender in tenders if relevance.check_detail(tender)]
+
+
+async def crawl_portal(portal: str) -> list:
+    """Crawlt ein einzelnes Portal (Standard-Portal oder Name eines benutzerdefinierten)"""
+    settings = load_crawl_settings()
+    relevance = RelevanceFilter.from_settings(settings)
+    
+    tenders = None
+    for label, name, crawl_func in STANDARD_PORTALS:
+        if name == portal:
+            print(f"\n{label}")
+            tenders = await crawl_with_metrics(portal, crawl_func, relevance)
+            break
+    else:
+        for cp in load_custom_portals(settings):
+            if cp.get("name") == portal and cp.get("enabled", True):
+                print(f"\n{portal} (benutzerdefiniert)")
+                tenders = await _crawl_custom(cp, relevance)
+                break
+    if tenders is None:
+        raise ValueError(f"Unbekanntes oder deaktiviertes Portal: {portal}")
+    
+    relevance.save_dropped()
+    return tenders
+
+
+async def crawl_all_working_portals() -> list:
+    """Crawlt ALLE konfigurierten Portale inkl. benutzerdefinierter Portale"""
     all_tenders = []
     
-    # Lade benutzerdefinierte Portale
-    custom_portals = load_custom_portals()
-    total_portals = 5 + len(custom_portals)
+    # Lade Einstellungen: benutzerdefinierte Portale und Relevanzfilter
+    settings = load_crawl_settings()
+    custom_portals = load_custom_portals(settings)
+    relevance = RelevanceFilter.from_settings(settings)
+    total_portals = len(STANDARD_PORTALS) + len(custom_portals)
     
     print("\n" + "="*60)
     print(f"Starte Crawling von {total_portals} Portalen...")
-    print(f"  - 5 Standard-Portale")
+    print(f"  - {len(STANDARD_PORTALS)} Standard-Portale")
     print(f"  - {len(custom_portals)} benutzerdefinierte Portale")
     print("="*60)
     
     portal_num = 1
     
     # Standard-Portale
-    print(f"\n[{portal_num}/{total_portals}] Ausschreibung.at")
-    tenders = await crawl_ausschreibung_at()
-    all_tenders.extend(tenders)
-    portal_num += 1
-    
-    print(f"\n[{portal_num}/{total_portals}] Staatsanzeiger")
-    tenders = await crawl_staatsanzeiger()
-    all_tenders.extend(tenders)
-    portal_num += 1
-    
-    print(f"\n[{portal_num}/{total_portals}] Deutsche eVergabe")
-    tenders = await crawl_deutsche_evergabe()
-    all_tenders.extend(tenders)
-    portal_num += 1
-    
-    print(f"\n[{portal_num}/{total_portals}] RIB Meinauftrag")
-    tenders = await crawl_rib_meinauftrag()
-    all_tenders.extend(tenders)
-    portal_num += 1
-    
-    print(f"\n[{portal_num}/{total_portals}] Tender24")
-    tenders = await crawl_tender24()
-    all_tenders.extend(tenders)
-    portal_num += 1
+    for label, portal, crawl_func in STANDARD_PORTALS:
+        print(f"\n[{portal_num}/{total_portals}] {label}")
+        tenders = await crawl_with_metrics(portal, crawl_func, relevance)
+        all_tenders.extend(tenders)
+        portal_num += 1
     
     # Benutzerdefinierte Portale
     for cp in custom_portals:
         if cp.get("enabled", True):
             print(f"\n[{portal_num}/{total_portals}] {cp.get('name', 'Benutzerdefiniert')} (benutzerdefiniert)")
-            try:
-                tenders = await crawl_custom_portal(cp)
-                all_tenders.extend(tenders)
-            except Exception as e:
-                print(f"    Fehler: {e}")
+            all_tenders.extend(await _crawl_custom(cp, relevance))
             portal_num += 1
     
+    relevance.save_dropped()
+    
     print("\n" + "="*60)
     print(f"CRAWLING ABGESCHLOSSEN: {len(all_tenders)} Ausschreibungen")
     print("="*60)
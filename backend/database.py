@@ -1,16 +1,47 @@
-from sqlalchemy import create_engine, Column, String, Text, DateTime, Integer, Enum as SQLEnum
+from sqlalchemy import create_engine, event, inspect, text, Column, Boolean, Float, Index, LargeBinary, String, Text, DateTime, Integer, Enum as SQLEnum
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import sessionmaker, validates
 from datetime import datetime
 import enum
+import time
 
 from config import DATABASE_URL
+from budget import parse_budget
+from normalize import normalize_text
 
 engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 
+# Callbacks (statement, dauer_in_sekunden) fuer jedes ausgefuehrte SQL-Statement
+_query_listeners = []
+
+
+def add_query_listener(listener):
+    """Registriert einen Callback, der nach jedem SQL-Statement aufgerufen wird"""
+    _query_listeners.append(listener)
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+@event.listens_for(engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    duration = time.perf_counter() - conn.info["query_start_time"].pop()
+    for listener in _query_listeners:
+        listener(statement, duration)
+
+
+@event.listens_for(engine, "handle_error")
+def _handle_error(context):
+    # Startzeit fehlgeschlagener Statements verwerfen
+    if context.connection is not None and context.connection.info.get("query_start_time"):
+        context.connection.info["query_start_time"].pop()
+
+
 class TenderStatus(enum.Enum):
     NEW = "NEW"
     INTERESTING = "INTERESTING"
@@ -18,6 +49,60 @@ class TenderStatus(enum.Enum):
     REJECTED = "REJECTED"
 
 
+# Laenderangaben im Feld "location" (z.B. "Innsbruck, Oesterreich")
+COUNTRY_NAMES = {"Deutschland", "Oesterreich", "Österreich", "Schweiz"}
+
+# Bundeslaender und Kantone (z.B. "Stuttgart, Baden-Wuerttemberg") -> Land
+_REGIONS = {
+    "Deutschland": [
+        "Baden-Württemberg", "Bayern", "Berlin", "Brandenburg", "Bremen", "Hamburg", "Hessen",
+        "Mecklenburg-Vorpommern", "Niedersachsen", "Nordrhein-Westfalen", "Rheinland-Pfalz",
+        "Saarland", "Sachsen", "Sachsen-Anhalt", "Schleswig-Holstein", "Thüringen",
+    ],
+    "Oesterreich": [
+        "Burgenland", "Kärnten", "Niederösterreich", "Oberösterreich", "Salzburg", "Steiermark",
+        "Tirol", "Vorarlberg", "Wien",
+    ],
+    # Ohne Freiburg (auch Freiburg im Breisgau)
+    "Schweiz": [
+        "Aargau", "Appenzell Ausserrhoden", "Appenzell Innerrhoden", "Basel-Landschaft", "Basel-Stadt",
+        "Bern", "Genf", "Glarus", "Graubünden", "Jura", "Luzern", "Neuenburg", "Nidwalden", "Obwalden",
+        "Schaffhausen", "Schwyz", "Solothurn", "St. Gallen", "Tessin", "Thurgau", "Uri", "Waadt",
+        "Wallis", "Zug", "Zürich",
+    ],
+}
+# Schluessel normalize_text, damit "Baden-Wuerttemberg" und "Baden-Württemberg" passen
+REGION_COUNTRIES = {
+    normalize_text(region): country for country, regions in _REGIONS.items() for region in regions
+}
+# Regionen, die zugleich Stadt sind ("Wien" bleibt Stadt, "Tirol" nicht)
+CITY_REGIONS = {normalize_text(name) for name in [
+    "Berlin", "Bremen", "Hamburg", "Salzburg", "Wien", "Bern", "Genf", "Glarus", "Luzern",
+    "Schaffhausen", "Schwyz", "Solothurn", "St. Gallen", "Zug", "Zürich",
+]}
+
+
+def split_location(location: str) -> tuple:
+    """
+    Zerlegt "Stadt, Land" bzw. "Stadt, Bundesland" in (Stadt, Land); fehlende
+    Teile sind None. Ein Bundesland/Kanton bestimmt das Land, ist aber keine
+    Stadt: "Baden-Wuerttemberg, Deutschland" -> (None, "Deutschland"),
+    "Stuttgart, Baden-Wuerttemberg" -> ("Stuttgart", "Deutschland").
+    """
+    parts = [part.strip() for part in (location or "").split(",") if part.strip()]
+    if not parts:
+        return None, None
+    regions = [REGION_COUNTRIES.get(normalize_text(part)) for part in parts]
+    if parts[-1] in COUNTRY_NAMES:
+        country = parts[-1]
+    else:
+        country = next((region for region in reversed(regions) if region), None)
+    city = parts[0]
+    if city in COUNTRY_NAMES or (regions[0] and normalize_text(city) not in CITY_REGIONS):
+        city = None
+    return city, country
+
+
 class Tender(Base):
     __tablename__ = "tenders"
 
@@ -25,15 +110,31 @@ class Tender(Base):
     title = Column(String, nullable=False)
     authority = Column(String, nullable=False)  # Auftraggeber
     location = Column(String, nullable=False)
+    location_city = Column(String, nullable=True)  # Aus location abgeleitet
+    location_country = Column(String, nullable=True)
     deadline = Column(String, nullable=False)  # ISO Date - Abgabefrist
     published_at = Column(String, nullable=True)  # Veroeffentlichungsdatum
-    budget = Column(String, nullable=True)
+    budget = Column(String, nullable=True)  # Freitext, z.B. "ca. 250.000 EUR"
+    budget_min = Column(Float, nullable=True)  # Aus budget abgeleitet (siehe budget.py)
+    budget_max = Column(Float, nullable=True)
+    budget_currency = Column(String, nullable=True)
     category = Column(String, nullable=False)
+    category_corrected = Column(Boolean, default=False)  # Manuell korrigiert (Trainingsdaten)
     description = Column(Text, nullable=False)
+    
+    # Normalisierte Texte (normalize_text) fuer Suche, Kategorisierung und Duplikaterkennung
+    title_norm = Column(String, nullable=True)
+    authority_norm = Column(String, nullable=True)
+    description_norm = Column(Text, nullable=True)
     status = Column(SQLEnum(TenderStatus), default=TenderStatus.NEW)
     source_url = Column(String, nullable=False)
     source_portal = Column(String, nullable=False)  # Welches Portal
     crawled_at = Column(DateTime, default=datetime.utcnow)
+    snapshot_hash = Column(String, nullable=True)  # Rohseite im Snapshot-Speicher (siehe crawlers/snapshot_store.py)
+    
+    # Duplikaterkennung (siehe crawlers/dedup.py)
+    minhash = Column(LargeBinary, nullable=True)  # MinHash-Signatur
+    cluster_id = Column(String, nullable=True)  # ID des Cluster-Repraesentanten
     
     # AI Analysis (optional, wird spaeter gefuellt)
     ai_summary = Column(Text, nullable=True)
@@ -41,10 +142,305 @@ class Tender(Base):
     ai_key_risks = Column(Text, nullable=True)  # JSON string
     ai_recommendation = Column(String, nullable=True)
 
+    # Zusammengesetzte Indizes: Filter-Spalte + Sortierung (Standard: crawled_at)
+    __table_args__ = (
+        Index("ix_tenders_crawled_at", "crawled_at"),
+        Index("ix_tenders_deadline", "deadline"),
+        Index("ix_tenders_published_at", "published_at"),
+        Index("ix_tenders_title", "title"),
+        Index("ix_tenders_status_crawled_at", "status", "crawled_at"),
+        Index("ix_tenders_status_deadline", "status", "deadline"),
+        Index("ix_tenders_category_crawled_at", "category", "crawled_at"),
+        Index("ix_tenders_portal_crawled_at", "source_portal", "crawled_at"),
+        Index("ix_tenders_country_city_crawled_at", "location_country", "location_city", "crawled_at"),
+        Index("ix_tenders_cluster_id", "cluster_id"),
+        Index("ix_tenders_budget_min", "budget_min"),
+        Index("ix_tenders_budget_max", "budget_max"),
+        Index("ix_tenders_snapshot_hash", "snapshot_hash"),
+    )
+
+    @validates("location")
+    def _validate_location(self, key, value):
+        self.location_city, self.location_country = split_location(value)
+        return value
+
+    @validates("budget")
+    def _validate_budget(self, key, value):
+        parsed = parse_budget(value)
+        self.budget_min, self.budget_max, self.budget_currency = parsed or (None, None, None)
+        return value
+
+    @validates("title", "authority", "description")
+    def _validate_text(self, key, value):
+        setattr(self, f"{key}_norm", normalize_text(value))
+        return value
+
+
+class DroppedTender(Base):
+    """Vom Relevanzfilter der Crawler verworfene Ausschreibungen (siehe crawlers/relevance.py)"""
+    __tablename__ = "dropped_tenders"
+
+    id = Column(String, primary_key=True)
+    source_portal = Column(String, nullable=False)
+    title = Column(String, nullable=False)
+    source_url = Column(String, nullable=True)
+    stage = Column(String, nullable=False)  # listing = vor, detail = nach dem Detail-Abruf
+    reason = Column(String, nullable=False)  # exclude:<keyword>, low_score, no_keyword, min_budget
+    dropped_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+
+class PageSnapshot(Base):
+    """Metadaten einer gespeicherten Rohseite; der Inhalt liegt komprimiert in SNAPSHOT_DIR"""
+    __tablename__ = "page_snapshots"
+
+    hash = Column(String, primary_key=True)  # sha256 des unkomprimierten Inhalts
+    url = Column(String, nullable=True)
+    size = Column(Integer, nullable=False)  # Bytes unkomprimiert
+    compressed_size = Column(Integer, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    last_seen_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+
+class TenderLshBucket(Base):
+    """LSH-Index: Band-Bucket der MinHash-Signatur -> Tender"""
+    __tablename__ = "tender_lsh_buckets"
+
+    bucket = Column(String, primary_key=True)  # "band:hash"
+    tender_id = Column(String, primary_key=True)
+
+    __table_args__ = (
+        # Buckets eines Tenders ersetzen, wenn sich sein Text aendert (dedup.assign_cluster)
+        Index("ix_tender_lsh_buckets_tender_id", "tender_id"),
+    )
+
+
+class TenderFacetCount(Base):
+    """Vorberechnete Facetten-Zaehler, per Trigger bei jeder Aenderung gepflegt"""
+    __tablename__ = "tender_facet_counts"
+
+    facet = Column(String, primary_key=True)  # category, source_portal, ...
+    value = Column(String, primary_key=True)  # "" = ohne Angabe
+    status = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+
+class CategoryCacheEntry(Base):
+    """Kategorisierungs-Ergebnis je normalisiertem Text und Kategorisierer-Version"""
+    __tablename__ = "category_cache"
+
+    text_hash = Column(String, primary_key=True)
+    version = Column(String, primary_key=True)
+    category = Column(String, nullable=False)
+    scores = Column(Text, nullable=True)  # JSON: Kategorie -> Score
+
+
+class NotificationOutboxEntry(Base):
+    """Ausstehende bzw. verschickte Benachrichtigung (siehe outbox.py)"""
+    __tablename__ = "notification_outbox"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    idempotency_key = Column(String, nullable=False, unique=True)
+    channel = Column(String, nullable=False)  # email, webhook
+    recipient = Column(String, nullable=True)  # E-Mail-Adresse bzw. Webhook-URL; None = RECIPIENT_EMAIL
+    payload = Column(Text, nullable=False)  # JSON
+    status = Column(String, nullable=False, default="pending")  # pending, sending, sent, failed
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    next_attempt_at = Column(DateTime, default=datetime.utcnow)
+    claimed_at = Column(DateTime, nullable=True)  # Beginn des laufenden Versands
+    sent_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("ix_notification_outbox_status_next_attempt", "status", "next_attempt_at"),
+    )
+
+
+class DeadlineReminder(Base):
+    """Bereits verschickte Fristerinnerung je Tender und Fenster (siehe reminders.py)"""
+    __tablename__ = "deadline_reminders"
+
+    tender_id = Column(String, primary_key=True)
+    days = Column(Integer, primary_key=True)  # Fenster, z.B. 7, 3 oder 1 Tage vor der Frist
+    sent_at = Column(DateTime, default=datetime.utcnow)
+
+
+class CrawlRun(Base):
+    """Ein Crawl-Lauf eines Portals (Historie fuer den adaptiven Takt, siehe cadence.py)"""
+    __tablename__ = "crawl_runs"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    source_portal = Column(String, nullable=False)
+    started_at = Column(DateTime, nullable=False)  # Lokale Zeit wie die Zeitplaene des Schedulers
+    finished_at = Column(DateTime, nullable=False)
+    result = Column(String, nullable=False)  # ok, error, aborted
+    tenders_found = Column(Integer, nullable=False, default=0)
+    tenders_new = Column(Integer, nullable=False, default=0)
+    pages_fetched = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        Index("ix_crawl_runs_portal_started_at", "source_portal", "started_at"),
+    )
+
+
+class Subscription(Base):
+    """Benachrichtigungs-Abo eines Empfaengers (siehe subscriptions.py)"""
+    __tablename__ = "subscriptions"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    recipient = Column(String, nullable=False, index=True)  # E-Mail-Adresse
+    keywords = Column(Text, nullable=True)  # JSON-Liste; leer = alle
+    categories = Column(Text, nullable=True)  # JSON-Liste; leer = alle
+    regions = Column(Text, nullable=True)  # JSON-Liste (Stadt, Region oder Land); leer = alle
+    min_budget = Column(Float, nullable=True)  # Bekanntes Budget (Obergrenze) mindestens
+    active = Column(Boolean, default=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+# Spalten der Tabelle tenders, fuer die Facetten gezaehlt werden
+FACET_COLUMNS = ["category", "source_portal", "location_country", "location_city", "status"]
+
+
+def _facet_rows(prefix: str, delta: int) -> str:
+    return ",\n".join(
+        f"('{column}', COALESCE({prefix}.{column}, ''), {prefix}.status, {delta})"
+        for column in FACET_COLUMNS
+    )
+
+
+FACET_TRIGGERS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS tenders_facets_insert AFTER INSERT ON tenders BEGIN
+        INSERT INTO tender_facet_counts (facet, value, status, count) VALUES
+        {_facet_rows("NEW", 1)}
+        ON CONFLICT (facet, value, status) DO UPDATE SET count = count + excluded.count;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS tenders_facets_delete AFTER DELETE ON tenders BEGIN
+        INSERT INTO tender_facet_counts (facet, value, status, count) VALUES
+        {_facet_rows("OLD", -1)}
+        ON CONFLICT (facet, value, status) DO UPDATE SET count = count + excluded.count;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS tenders_facets_update
+    AFTER UPDATE OF {", ".join(FACET_COLUMNS)} ON tenders BEGIN
+        INSERT INTO tender_facet_counts (facet, value, status, count) VALUES
+        {_facet_rows("OLD", -1)}
+        ON CONFLICT (facet, value, status) DO UPDATE SET count = count + excluded.count;
+        INSERT INTO tender_facet_counts (facet, value, status, count) VALUES
+        {_facet_rows("NEW", 1)}
+        ON CONFLICT (facet, value, status) DO UPDATE SET count = count + excluded.count;
+    END
+    """,
+]
+
+
+def rebuild_facet_counts(conn):
+    """Berechnet die Facetten-Zaehler komplett neu aus der Tabelle tenders"""
+    conn.execute(text("DELETE FROM tender_facet_counts"))
+    for column in FACET_COLUMNS:
+        conn.execute(text(
+            f"INSERT INTO tender_facet_counts (facet, value, status, count) "
+            f"SELECT '{column}', COALESCE({column}, ''), status, COUNT(*) "
+            f"FROM tenders GROUP BY COALESCE({column}, ''), status"
+        ))
+
+
+def _migrate_columns(conn) -> list:
+    """
+    Ergaenzt fehlende Spalten und Indizes bestehender Tabellen
+    (create_all legt nur neue Tabellen an). Gibt die neuen Spalten zurueck.
+    """
+    inspector = inspect(conn)
+    added = []
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing:
+                column_type = column.type.compile(dialect=conn.dialect)
+                conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN "{column.name}" {column_type}'))
+                added.append(f"{table.name}.{column.name}")
+        for index in table.indexes:
+            index.create(bind=conn, checkfirst=True)
+    return added
+
 
 def init_db():
     """Erstellt alle Tabellen in der Datenbank"""
-    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        added = _migrate_columns(conn)
+        Base.metadata.create_all(bind=conn)
+        
+        # Abgeleitete Ortsangaben fuer bestehende Tenders nachtragen
+        if "tenders.location_city" in added:
+            rows = conn.execute(text("SELECT id, location FROM tenders")).fetchall()
+            params = []
+            for tender_id, location in rows:
+                city, country = split_location(location)
+                params.append({"id": tender_id, "city": city, "country": country})
+            if params:
+                conn.execute(
+                    text("UPDATE tenders SET location_city = :city, location_country = :country WHERE id = :id"),
+                    params,
+                )
+        
+        # Budget-Betraege aus dem Freitext nachtragen
+        if "tenders.budget_min" in added:
+            rows = conn.execute(text("SELECT id, budget FROM tenders WHERE budget IS NOT NULL")).fetchall()
+            params = []
+            for tender_id, budget in rows:
+                parsed = parse_budget(budget)
+                if parsed:
+                    params.append({"id": tender_id, "min": parsed.min, "max": parsed.max, "currency": parsed.currency})
+            if params:
+                conn.execute(
+                    text("UPDATE tenders SET budget_min = :min, budget_max = :max, budget_currency = :currency WHERE id = :id"),
+                    params,
+                )
+        
+        # Normalisierte Texte nachtragen; Duplikat-Index danach neu aufbauen,
+        # da die Signaturen nun auf normalisiertem Text beruhen
+        if "tenders.title_norm" in added:
+            rows = conn.execute(text("SELECT id, title, authority, description FROM tenders")).fetchall()
+            params = [
+                {
+                    "id": tender_id,
+                    "title": normalize_text(title),
+                    "authority": normalize_text(authority),
+                    "description": normalize_text(description),
+                }
+                for tender_id, title, authority, description in rows
+            ]
+            if params:
+                conn.execute(
+                    text(
+                        "UPDATE tenders SET title_norm = :title, authority_norm = :authority, "
+                        "description_norm = :description WHERE id = :id"
+                    ),
+                    params,
+                )
+            conn.execute(text("UPDATE tenders SET minhash = NULL, cluster_id = NULL"))
+            conn.execute(text("DELETE FROM tender_lsh_buckets"))
+        
+        for trigger in FACET_TRIGGERS:
+            conn.execute(text(trigger))
+        
+        facets_empty = conn.execute(text("SELECT 1 FROM tender_facet_counts LIMIT 1")).first() is None
+        tenders_exist = conn.execute(text("SELECT 1 FROM tenders LIMIT 1")).first() is not None
+        if facets_empty and tenders_exist:
+            rebuild_facet_counts(conn)
+
+
+def explain_query_plan(query) -> list:
+    """Liefert den SQLite-Ausfuehrungsplan einer ORM-Query (EXPLAIN QUERY PLAN)"""
+    compiled = query.statement.compile(engine, compile_kwargs={"literal_binds": True})
+    with engine.connect() as conn:
+        rows = conn.execute(text(f"EXPLAIN QUERY PLAN {compiled}")).fetchall()
+    return [row[-1] for row in rows]
 
 
 def get_db():
@@ -0,0 +1,311 @@
+"""
+Prometheus-kompatible Metriken fuer API und Crawler.
+
+Jeder Prozess sammelt seine Werte im Speicher (REGISTRY). Die Crawler laufen
+in eigenen Prozessen und schreiben ihre Werte mit flush_to_store() in einen
+gemeinsamen lokalen Speicher (SQLite-Datei). Der /metrics-Endpoint der API
+gibt die eigenen Werte zusammen mit dem gemeinsamen Speicher aus.
+
+Counter und Histogramme werden dort addiert. Gauges sind ein Stand, keine
+Summe von Aenderungen: jeder Prozess ueberschreibt seine eigene Zeile
+(pro Prozess-ID), ausgegeben wird die Summe ueber alle Prozesse. Beim
+Prozessende wird die eigene Zeile entfernt.
+"""
+import atexit
+import json
+import os
+import sqlite3
+import threading
+from typing import Dict, List, Tuple
+
+from config import METRICS_STORE_PATH
+from database import add_query_listener
+
+
+# Bucket-Grenzen in Sekunden
+HTTP_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1)
+CRAWL_BUCKETS = (10, 30, 60, 120, 300, 600, 1200, 1800, 3600)
+
+# Name -> (Typ, Beschreibung, Buckets)
+METRICS = {
+    "tenderscout_http_request_duration_seconds": (
+        "histogram", "Dauer der API-Requests pro Route", HTTP_BUCKETS),
+    "tenderscout_db_queries_total": (
+        "counter", "Anzahl ausgefuehrter SQL-Statements", None),
+    "tenderscout_db_query_duration_seconds": (
+        "histogram", "Dauer der SQL-Statements", DB_BUCKETS),
+    "tenderscout_crawl_duration_seconds": (
+        "histogram", "Dauer eines Crawl-Durchlaufs pro Portal", CRAWL_BUCKETS),
+    "tenderscout_crawl_pages_fetched_total": (
+        "counter", "Geladene Seiten pro Portal", None),
+    "tenderscout_crawl_tenders_found_total": (
+        "counter", "Gefundene Ausschreibungen pro Portal", None),
+    "tenderscout_crawl_tenders_new_total": (
+        "counter", "Neu gespeicherte Ausschreibungen pro Portal", None),
+    "tenderscout_crawl_tenders_updated_total": (
+        "counter", "Aktualisierte Ausschreibungen pro Portal", None),
+    "tenderscout_crawl_tenders_dropped_total": (
+        "counter", "Vom Relevanzfilter verworfene Ausschreibungen pro Portal und Stufe", None),
+    "tenderscout_crawl_errors_total": (
+        "counter", "Crawler-Fehler pro Portal", None),
+    "tenderscout_notifications_total": (
+        "counter", "Verschickte bzw. fehlgeschlagene Benachrichtigungen pro Kanal", None),
+    "tenderscout_scheduler_runs_total": (
+        "counter", "Laeufe der Scheduler-Jobs pro Job und Ergebnis (ok, error, timeout)", None),
+    "tenderscout_browsers_open": (
+        "gauge", "Aktuell geoeffnete Browser-Instanzen", None),
+}
+
+GAUGES = {name for name, (kind, _, _) in METRICS.items() if kind == "gauge"}
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, str]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+class MetricsRegistry:
+    """Thread-sichere Sammlung von Countern, Gauges und Histogrammen im Speicher"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (name, labels) -> Wert bzw. [bucket_counts..., sum, count]
+        self._values: Dict[Tuple[str, LabelKey], object] = {}
+
+    def inc(self, name: str, value: float = 1, **labels):
+        """Erhoeht einen Counter oder Gauge"""
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels):
+        """Traegt einen Messwert in ein Histogramm ein"""
+        buckets = METRICS[name][2]
+        key = (name, _label_key(labels))
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0] * (len(buckets) + 2)
+            for i, bound in enumerate(buckets):
+                if value <= bound:
+                    state[i] += 1
+                    break
+            state[-2] += value
+            state[-1] += 1
+
+    def snapshot(self, reset: bool = False) -> Dict[Tuple[str, LabelKey], object]:
+        """Kopie aller Werte (optional danach zuruecksetzen - Gauges behalten ihren Stand)"""
+        with self._lock:
+            values = {
+                key: list(value) if isinstance(value, list) else value
+                for key, value in self._values.items()
+            }
+            if reset:
+                self._values = {key: value for key, value in self._values.items() if key[0] in GAUGES}
+        return values
+
+
+REGISTRY = MetricsRegistry()
+
+
+def inc(name: str, value: float = 1, **labels):
+    REGISTRY.inc(name, value, **labels)
+
+
+def observe(name: str, value: float, **labels):
+    REGISTRY.observe(name, value, **labels)
+
+
+# ============================================
+# Gemeinsamer Speicher fuer mehrere Prozesse
+# ============================================
+
+def _connect() -> sqlite3.Connection:
+    conn = sqlite3.connect(METRICS_STORE_PATH, timeout=10)
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS samples (
+            name TEXT NOT NULL,
+            labels TEXT NOT NULL,
+            slot INTEGER NOT NULL,
+            value REAL NOT NULL,
+            PRIMARY KEY (name, labels, slot)
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS gauges (
+            name TEXT NOT NULL,
+            labels TEXT NOT NULL,
+            pid INTEGER NOT NULL,
+            value REAL NOT NULL,
+            PRIMARY KEY (name, labels, pid)
+        )
+        """
+    )
+    return conn
+
+
+_gauge_cleanup_registered = False
+
+
+def _remove_own_gauges():
+    """Entfernt die Gauges dieses Prozesses aus dem gemeinsamen Speicher (beim Prozessende)"""
+    try:
+        conn = _connect()
+        try:
+            with conn:
+                conn.execute("DELETE FROM gauges WHERE pid = ?", (os.getpid(),))
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        pass
+
+
+def flush_to_store():
+    """
+    Addiert die Counter und Histogramme dieses Prozesses in den gemeinsamen
+    Speicher und setzt sie lokal zurueck; Gauges ersetzen den zuletzt
+    geschriebenen Stand dieses Prozesses. Wird von den Crawler-Prozessen aufgerufen.
+    """
+    global _gauge_cleanup_registered
+    values = REGISTRY.snapshot(reset=True)
+    if not values:
+        return
+
+    rows = []
+    gauge_rows = []
+    pid = os.getpid()
+    for (name, labels), value in values.items():
+        label_json = json.dumps(labels)
+        if name in GAUGES:
+            gauge_rows.append((name, label_json, pid, value))
+        elif isinstance(value, list):
+            rows.extend((name, label_json, slot, v) for slot, v in enumerate(value))
+        else:
+            rows.append((name, label_json, 0, value))
+
+    conn = _connect()
+    try:
+        with conn:
+            conn.executemany(
+                """
+                INSERT INTO samples (name, labels, slot, value) VALUES (?, ?, ?, ?)
+                ON CONFLICT (name, labels, slot) DO UPDATE SET value = value + excluded.value
+                """,
+                rows,
+            )
+            conn.executemany(
+                """
+                INSERT INTO gauges (name, labels, pid, value) VALUES (?, ?, ?, ?)
+                ON CONFLICT (name, labels, pid) DO UPDATE SET value = excluded.value
+                """,
+                gauge_rows,
+            )
+    finally:
+        conn.close()
+    if gauge_rows and not _gauge_cleanup_registered:
+        atexit.register(_remove_own_gauges)
+        _gauge_cleanup_registered = True
+
+
+def _load_store() -> Dict[Tuple[str, LabelKey], object]:
+    """Liest alle Werte aus dem gemeinsamen Speicher"""
+    values: Dict[Tuple[str, LabelKey], object] = {}
+    try:
+        conn = _connect()
+    except sqlite3.Error:
+        return values
+    try:
+        for name, label_json, slot, value in conn.execute(
+            "SELECT name, labels, slot, value FROM samples ORDER BY name, labels, slot"
+        ):
+            # Gauges stehen in der Tabelle gauges (fruehere Versionen haben sie hier addiert)
+            if name not in METRICS or name in GAUGES:
+                continue
+            key = (name, tuple(tuple(pair) for pair in json.loads(label_json)))
+            buckets = METRICS[name][2]
+            if buckets is None:
+                values[key] = value
+            else:
+                state = values.setdefault(key, [0] * (len(buckets) + 2))
+                state[slot] = value
+        # Die eigenen Gauges stehen aktuell in REGISTRY (render_latest)
+        for name, label_json, value in conn.execute(
+            "SELECT name, labels, SUM(value) FROM gauges WHERE pid != ? GROUP BY name, labels",
+            (os.getpid(),),
+        ):
+            if name not in METRICS:
+                continue
+            key = (name, tuple(tuple(pair) for pair in json.loads(label_json)))
+            values[key] = value
+    finally:
+        conn.close()
+    return values
+
+
+# ============================================
+# Ausgabe im Prometheus-Textformat
+# ============================================
+
+def _format_labels(labels: LabelKey, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    escaped = [
+        '%s="%s"' % (k, v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for k, v in pairs
+    ]
+    return "{" + ",".join(escaped) + "}"
+
+
+def _format_number(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+def render_latest() -> str:
+    """Alle Metriken (eigener Prozess + gemeinsamer Speicher) als Text"""
+    combined = _load_store()
+    for key, value in REGISTRY.snapshot().items():
+        if isinstance(value, list):
+            state = combined.setdefault(key, [0] * len(value))
+            for i, v in enumerate(value):
+                state[i] += v
+        else:
+            combined[key] = combined.get(key, 0) + value
+
+    by_name: Dict[str, List[Tuple[LabelKey, object]]] = {}
+    for (name, labels), value in combined.items():
+        by_name.setdefault(name, []).append((labels, value))
+
+    lines = []
+    for name, (kind, help_text, buckets) in METRICS.items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value in sorted(by_name.get(name, []), key=lambda item: item[0]):
+            if buckets is None:
+                lines.append(f"{name}{_format_labels(labels)} {_format_number(value)}")
+                continue
+            cumulative = 0
+            for bound, count in zip(buckets, value):
+                cumulative += count
+                le = (("le", _format_number(bound)),)
+                lines.append(f"{name}_bucket{_format_labels(labels, le)} {_format_number(cumulative)}")
+            inf = (("le", "+Inf"),)
+            lines.append(f"{name}_bucket{_format_labels(labels, inf)} {_format_number(value[-1])}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {_format_number(value[-2])}")
+            lines.append(f"{name}_count{_format_labels(labels)} {_format_number(value[-1])}")
+    return "\n".join(lines) + "\n"
+
+
+# SQL-Statements aller Prozesse zaehlen
+def _record_query(statement: str, duration: float):
+    operation = statement.lstrip().split(" ", 1)[0].upper() or "OTHER"
+    inc("tenderscout_db_queries_total", operation=operation)
+    observe("tenderscout_db_query_duration_seconds", duration, operation=operation)
+
+
+add_query_listener(_record_query)
@@ -0,0 +1,44 @@
+"""
+Gemeinsame Normalisierung deutscher Texte.
+
+normalize_text() liefert die Vergleichsform fuer Kategorisierung, Suche und
+Duplikaterkennung: klein (casefold), Umlaute/ß als ae/oe/ue/ss, einheitliche
+Bindestriche, ohne weiche Trennzeichen, Whitespace zusammengefasst.
+Sie wird pro Tender einmal berechnet und gespeichert (title_norm, ...).
+
+fold_text() macht dasselbe ohne Kleinschreibung - fuer die Ortserkennung,
+bei der die Grossschreibung Ortsnamen von Woertern unterscheidet
+("Essen" vs. "essen").
+"""
+import re
+
+_UMLAUT_FOLD = str.maketrans({
+    "ä": "ae", "ö": "oe", "ü": "ue", "ß": "ss",
+    "Ä": "Ae", "Ö": "Oe", "Ü": "Ue", "ẞ": "SS",
+})
+
+# Alle Strich-Varianten als "-", weiches Trennzeichen (Silbentrennung) entfernen
+_DASH_FOLD = str.maketrans({
+    "\u2010": "-", "\u2011": "-", "\u2012": "-", "\u2013": "-", "\u2014": "-", "\u2212": "-",
+    "\u00ad": None,
+})
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def fold_umlauts(text: str) -> str:
+    """Ersetzt Umlaute und ß durch ae/oe/ue/ss (Gross-/Kleinschreibung bleibt)"""
+    return text.translate(_UMLAUT_FOLD)
+
+
+def fold_text(text: str) -> str:
+    """Umlaute, Striche und Whitespace vereinheitlichen, Gross-/Kleinschreibung bleibt"""
+    if not text:
+        return ""
+    text = text.translate(_UMLAUT_FOLD).translate(_DASH_FOLD)
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def normalize_text(text: str) -> str:
+    """Vergleichsform: fold_text + casefold"""
+    return fold_text(text).casefold()
@@ -1,133 +1,112 @@
 """
-E-Mail-Benachrichtigung für neue Ausschreibungen
+Benachrichtigung über neue Ausschreibungen (E-Mail, Webhook)
+
+Der Versand läuft nicht im Crawl-Pfad: enqueue_new_tenders() schreibt die
+Benachrichtigungen aller eingerichteten Kanäle (channels.py) in derselben
+Transaktion wie die Tenders in die Outbox (outbox.py),
+dispatch_notification() weckt den NotificationDispatcher und kehrt sofort
+zurück. Dessen Hintergrund-Thread verschickt E-Mails über eine
+wiederverwendete, angemeldete SMTP-Verbindung (SmtpConnection) und
+Webhooks gesammelt über eine Keep-Alive-Verbindung (webhook.py),
+wiederholt Fehlschläge laut Outbox und schließt die Verbindungen nach
+SMTP_IDLE_SECONDS ohne Versand. Beim Prozessende wird höchstens NOTIFY_SHUTDOWN_TIMEOUT
+Sekunden lang weiter zugestellt; der Rest bleibt in der Outbox.
 """
+import atexit
+import html
 import smtplib
 import os
+import threading
+import time
+from email.message import Message
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from typing import List, Dict, Any
+from string import Template
+from typing import List, Dict, Any, NamedTuple, Optional
 from datetime import datetime
 
 # Lade Umgebungsvariablen
 from dotenv import load_dotenv
 load_dotenv()
 
+import metrics
+import outbox
+from channels import NotificationChannel, PartialDelivery
+from subscriptions import SubscriptionIndex
+from webhook import WebhookChannel
 
-class EmailNotifier:
-    """Sendet E-Mail-Benachrichtigungen über neue Ausschreibungen"""
-    
-    def __init__(self):
-        # SMTP-Konfiguration aus Umgebungsvariablen
-        self.smtp_server = os.getenv("SMTP_SERVER", "smtp.gmail.com")
-        self.smtp_port = int(os.getenv("SMTP_PORT", "587"))
-        self.smtp_user = os.getenv("SMTP_USER", "")
-        self.smtp_password = os.getenv("SMTP_PASSWORD", "")
-        self.sender_email = os.getenv("SENDER_EMAIL", self.smtp_user)
-        self.recipient_email = os.getenv("RECIPIENT_EMAIL", "")
-    
-    def is_configured(self) -> bool:
-        """Prüft ob E-Mail konfiguriert ist"""
-        return bool(self.smtp_user and self.smtp_password and self.recipient_email)
-    
-    def send_new_tenders_notification(self, tenders: List[Dict[str, Any]]) -> bool:
-        """
-        Sendet eine E-Mail mit neuen Ausschreibungen
-        
-        Args:
-            tenders: Liste der neuen Ausschreibungen
-            
-        Returns:
-            True wenn erfolgreich, False bei Fehler
-        """
-        if not self.is_configured():
-            print("E-Mail nicht konfiguriert. Bitte SMTP-Einstellungen in .env setzen.")
-            return False
-        
-        if not tenders:
-            print("Keine neuen Ausschreibungen - keine E-Mail gesendet")
-            return True
-        
-        try:
-            # E-Mail erstellen
-            msg = MIMEMultipart("alternative")
-            msg["Subject"] = f"🔔 {len(tenders)} neue Ausschreibungen gefunden - {datetime.now().strftime('%d.%m.%Y')}"
-            msg["From"] = self.sender_email
-            msg["To"] = self.recipient_email
-            
-            # Text-Version
-            text_content = self._create_text_content(tenders)
-            
-            # HTML-Version
-            html_content = self._create_html_content(tenders)
-            
-            msg.attach(MIMEText(text_content, "plain", "utf-8"))
-            msg.attach(MIMEText(html_content, "html", "utf-8"))
-            
-            # E-Mail senden
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.smtp_user, self.smtp_password)
-                server.send_message(msg)
-            
-            print(f"E-Mail erfolgreich gesendet an {self.recipient_email}")
-            return True
-            
-        except Exception as e:
-            print(f"Fehler beim E-Mail-Versand: {e}")
-            return False
-    
-    def _create_text_content(self, tenders: List[Dict[str, Any]]) -> str:
-        """Erstellt den Text-Inhalt der E-Mail"""
-        lines = [
-            f"Guten Tag,",
-            f"",
-            f"es wurden {len(tenders)} neue Ausschreibungen gefunden:",
-            f"",
-            f"=" * 50,
-            f""
-        ]
-        
-        for i, tender in enumerate(tenders, 1):
-            lines.extend([
-                f"{i}. {tender.get('title', 'Ohne Titel')}",
-                f"   Auftraggeber: {tender.get('authority', 'N/A')}",
-                f"   Ort: {tender.get('location', 'N/A')}",
-                f"   Frist: {tender.get('deadline', 'N/A')}",
-                f"   Budget: {tender.get('budget', 'N/A')}",
-                f"   Portal: {tender.get('source_portal', 'N/A')}",
-                f"   Link: {tender.get('source_url', 'N/A')}",
-                f"",
-                f"-" * 50,
-                f""
-            ])
-        
-        lines.extend([
-            f"",
-            f"Mit freundlichen Grüßen",
-            f"TenderScout AI",
-            f"",
-            f"---",
-            f"Diese E-Mail wurde automatisch generiert."
-        ])
-        
-        return "\n".join(lines)
-    
-    def _create_html_content(self, tenders: List[Dict[str, Any]]) -> str:
-        """Erstellt den HTML-Inhalt der E-Mail"""
-        tender_rows = ""
-        for tender in tenders:
-            tender_rows += f"""
+
+SMTP_TIMEOUT = float(os.getenv("SMTP_TIMEOUT", "30"))  # Sekunden je SMTP-Operation
+SMTP_IDLE_SECONDS = float(os.getenv("SMTP_IDLE_SECONDS", "60"))  # Verbindung danach schliessen
+NOTIFY_SHUTDOWN_TIMEOUT = float(os.getenv("NOTIFY_SHUTDOWN_TIMEOUT", "120"))
+NOTIFY_POLL_SECONDS = float(os.getenv("NOTIFY_POLL_SECONDS", "30"))  # Fällige Wiederholungen prüfen
+
+CHANNEL_EMAIL = "email"
+
+DIGEST_MAX_TENDERS = int(os.getenv("DIGEST_MAX_TENDERS", "50"))  # Weitere nur als Anzahl + Link
+DASHBOARD_URL = os.getenv("DASHBOARD_URL", "http://localhost:3000")
+
+
+# Vorlagen werden einmal beim Import kompiliert. Jede E-Mail wird aus den
+# Teilen mit einem einzigen join zusammengesetzt; Texte der Portale werden
+# in der HTML-Version mit html.escape maskiert (_tender_fields).
+class _Wording(NamedTuple):
+    subject: Template  # Platzhalter $count, $date
+    heading: str
+    summary: Template  # $count
+    intro: Template  # $count
+
+
+_WORDING = {
+    outbox.KIND_NEW_TENDERS: _Wording(
+        Template("🔔 $count neue Ausschreibungen gefunden - $date"),
+        "🔔 Neue Ausschreibungen",
+        Template("$count neue Ausschreibungen gefunden"),
+        Template("es wurden $count neue Ausschreibungen gefunden:"),
+    ),
+    outbox.KIND_DEADLINE_REMINDER: _Wording(
+        Template("⏰ $count Ausschreibungen mit naher Abgabefrist - $date"),
+        "⏰ Abgabefristen",
+        Template("$count Ausschreibungen mit naher Abgabefrist"),
+        Template("bei $count vorgemerkten Ausschreibungen endet bald die Abgabefrist:"),
+    ),
+}
+
+_TEXT_HEADER = Template(
+    "Guten Tag,\n\n"
+    "$intro\n\n"
+    + "=" * 50 + "\n\n"
+)
+_TEXT_ITEM = Template(
+    "$index. $title\n"
+    "   Auftraggeber: $authority\n"
+    "   Ort: $location\n"
+    "   Frist: $deadline\n"
+    "   Budget: $budget\n"
+    "   Portal: $source_portal\n"
+    "   Link: $source_url\n\n"
+    + "-" * 50 + "\n\n"
+)
+_TEXT_MORE = Template("... und $more weitere Ausschreibungen im Dashboard: $dashboard_url\n\n")
+_TEXT_FOOTER = (
+    "\nMit freundlichen Grüßen\n"
+    "TenderScout AI\n\n"
+    "---\n"
+    "Diese E-Mail wurde automatisch generiert."
+)
+
+_HTML_ITEM = Template("""
             <tr style="border-bottom: 1px solid #e2e8f0;">
                 <td style="padding: 16px;">
-                    <h3 style="margin: 0 0 8px 0; color: #1e293b;">{tender.get('title', 'Ohne Titel')}</h3>
+                    <h3 style="margin: 0 0 8px 0; color: #1e293b;">$title</h3>
                     <p style="margin: 4px 0; color: #64748b; font-size: 14px;">
-                        <strong>Auftraggeber:</strong> {tender.get('authority', 'N/A')}<br>
-                        <strong>Ort:</strong> {tender.get('location', 'N/A')}<br>
-                        <strong>Frist:</strong> <span style="color: #f97316;">{tender.get('deadline', 'N/A')}</span><br>
-                        <strong>Budget:</strong> {tender.get('budget', 'N/A')}<br>
-                        <strong>Portal:</strong> {tender.get('source_portal', 'N/A')}
+                        <strong>Auftraggeber:</strong> $authority<br>
+                        <strong>Ort:</strong> $location<br>
+                        <strong>Frist:</strong> <span style="color: #f97316;">$deadline</span><br>
+                        <strong>Budget:</strong> $budget<br>
+                        <strong>Portal:</strong> $source_portal
                     </p>
-                    <a href="{tender.get('source_url', '#')}" 
+                    <a href="$href" 
                        style="display: inline-block; margin-top: 8px; padding: 8px 16px; 
                               background-color: #3b82f6; color: white; text-decoration: none; 
                               border-radius: 6px; font-size: 14px;">
@@ -135,9 +114,13 @@ class EmailNotifier:
                     </a>
                 </td>
             </tr>
-            """
-        
-        html = f"""
+""")
+_HTML_MORE = Template("""
+                    <p style="color: #475569; margin-top: 16px; text-align: center;">
+                        <a href="$dashboard_url" style="color: #3b82f6;">… und $more weitere Ausschreibungen im Dashboard</a>
+                    </p>
+""")
+_HTML_PAGE = Template("""
         <!DOCTYPE html>
         <html>
         <head>
@@ -150,9 +133,9 @@ class EmailNotifier:
                 
                 <!-- Header -->
                 <div style="background: linear-gradient(135deg, #3b82f6, #8b5cf6); padding: 24px; text-align: center;">
-                    <h1 style="color: white; margin: 0; font-size: 24px;">🔔 Neue Ausschreibungen</h1>
+                    <h1 style="color: white; margin: 0; font-size: 24px;">$heading</h1>
                     <p style="color: rgba(255,255,255,0.9); margin: 8px 0 0 0;">
-                        {len(tenders)} neue Ausschreibungen gefunden
+                        $summary
                     </p>
                 </div>
                 
@@ -160,27 +143,438 @@ class EmailNotifier:
                 <div style="padding: 24px;">
                     <p style="color: #475569; margin-bottom: 16px;">
                         Guten Tag,<br><br>
-                        folgende neue Ausschreibungen wurden heute gefunden:
+                        $intro
                     </p>
                     
                     <table style="width: 100%; border-collapse: collapse;">
-                        {tender_rows}
+                        $rows
                     </table>
+                    $more
                 </div>
                 
                 <!-- Footer -->
                 <div style="background-color: #f1f5f9; padding: 16px; text-align: center;">
                     <p style="color: #64748b; font-size: 12px; margin: 0;">
                         Diese E-Mail wurde automatisch von TenderScout AI generiert.<br>
-                        {datetime.now().strftime('%d.%m.%Y %H:%M')} Uhr
+                        $timestamp Uhr
                     </p>
                 </div>
             </div>
         </body>
         </html>
+""")
+
+_TENDER_FIELDS = ("authority", "location", "deadline", "budget", "source_portal", "source_url")
+
+
+def _tender_fields(tender: Dict[str, Any], escape: bool = False) -> Dict[str, str]:
+    """Platzhalter-Werte eines Tenders; mit escape für HTML maskiert (inkl. Link-Ziel)"""
+    fields = {key: str(tender.get(key) or "N/A") for key in _TENDER_FIELDS}
+    fields["title"] = str(tender.get("title") or "Ohne Titel")
+    if "days_left" in tender:
+        days_left = tender["days_left"]
+        remaining = "heute" if days_left == 0 else ("morgen" if days_left == 1 else f"noch {days_left} Tage")
+        fields["deadline"] = f"{fields['deadline']} ({remaining})"
+    if not escape:
+        return fields
+    fields = {key: html.escape(value, quote=True) for key, value in fields.items()}
+    # Nur http(s)-Links übernehmen (kein javascript: o.ä. aus Portaldaten)
+    url = str(tender.get("source_url") or "")
+    fields["href"] = html.escape(url, quote=True) if url.lower().startswith(("http://", "https://")) else "#"
+    return fields
+
+
+class SmtpConnection:
+    """
+    Angemeldete SMTP-Verbindung, die über mehrere Nachrichten bestehen bleibt.
+    Nach einem Verbindungsabbruch wird einmal neu verbunden.
+    """
+    
+    def __init__(self, server: str, port: int, user: str, password: str, timeout: float = SMTP_TIMEOUT):
+        self.server = server
+        self.port = port
+        self.user = user
+        self.password = password
+        self.timeout = timeout
+        self._smtp: Optional[smtplib.SMTP] = None
+    
+    def _connect(self) -> smtplib.SMTP:
+        if self._smtp is None:
+            smtp = smtplib.SMTP(self.server, self.port, timeout=self.timeout)
+            try:
+                smtp.starttls()
+                smtp.login(self.user, self.password)
+            except Exception:
+                smtp.close()
+                raise
+            self._smtp = smtp
+        return self._smtp
+    
+    def send(self, msg: Message):
+        try:
+            self._connect().send_message(msg)
+        except (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError):
+            # Server hat die Verbindung zwischenzeitlich geschlossen
+            self.close()
+            self._connect().send_message(msg)
+    
+    def close(self):
+        if self._smtp is None:
+            return
+        try:
+            self._smtp.quit()
+        except Exception:
+            self._smtp.close()
+        self._smtp = None
+
+
+class EmailNotifier:
+    """Sendet E-Mail-Benachrichtigungen über neue Ausschreibungen"""
+    
+    def __init__(self):
+        # SMTP-Konfiguration aus Umgebungsvariablen
+        self.smtp_server = os.getenv("SMTP_SERVER", "smtp.gmail.com")
+        self.smtp_port = int(os.getenv("SMTP_PORT", "587"))
+        self.smtp_user = os.getenv("SMTP_USER", "")
+        self.smtp_password = os.getenv("SMTP_PASSWORD", "")
+        self.sender_email = os.getenv("SENDER_EMAIL", self.smtp_user)
+        self.recipient_email = os.getenv("RECIPIENT_EMAIL", "")
+    
+    def is_configured(self) -> bool:
+        """Prüft ob SMTP konfiguriert ist (Empfänger: RECIPIENT_EMAIL und/oder Abos)"""
+        return bool(self.smtp_user and self.smtp_password)
+    
+    def connect(self) -> SmtpConnection:
+        """Neue (noch nicht geöffnete) Verbindung mit den SMTP-Einstellungen"""
+        return SmtpConnection(self.smtp_server, self.smtp_port, self.smtp_user, self.smtp_password)
+    
+    def build_message(self, tenders: List[Dict[str, Any]], message_id: Optional[str] = None,
+                      recipient: Optional[str] = None, kind: str = outbox.KIND_NEW_TENDERS) -> MIMEMultipart:
+        """Erstellt die E-Mail (Text- und HTML-Version) für neue Ausschreibungen bzw. Fristerinnerungen"""
+        msg = MIMEMultipart("alternative")
+        msg["Subject"] = _WORDING[kind].subject.substitute(
+            count=len(tenders), date=datetime.now().strftime('%d.%m.%Y')
+        )
+        msg["From"] = self.sender_email
+        msg["To"] = recipient or self.recipient_email
+        if message_id:
+            # Gleiche ID bei Wiederholungen - Empfänger können Duplikate erkennen
+            msg["Message-ID"] = f"<{message_id}@tenderscout>"
+        
+        msg.attach(MIMEText(self._create_text_content(tenders, kind), "plain", "utf-8"))
+        msg.attach(MIMEText(self._create_html_content(tenders, kind), "html", "utf-8"))
+        return msg
+    
+    def deliver(self, tenders: List[Dict[str, Any]], connection: SmtpConnection,
+                message_id: Optional[str] = None, recipient: Optional[str] = None,
+                kind: str = outbox.KIND_NEW_TENDERS):
+        """Verschickt die E-Mail über connection; Fehler werden nicht abgefangen"""
+        connection.send(self.build_message(tenders, message_id, recipient, kind))
+    
+    def send_new_tenders_notification(self, tenders: List[Dict[str, Any]],
+                                      connection: Optional[SmtpConnection] = None) -> bool:
+        """
+        Sendet eine E-Mail mit neuen Ausschreibungen
+        
+        Args:
+            tenders: Liste der neuen Ausschreibungen
+            connection: Bestehende Verbindung (sonst wird eine eigene geöffnet und geschlossen)
+            
+        Returns:
+            True wenn erfolgreich, False bei Fehler
         """
+        if not self.is_configured() or not self.recipient_email:
+            print("E-Mail nicht konfiguriert. Bitte SMTP-Einstellungen in .env setzen.")
+            return False
         
-        return html
+        if not tenders:
+            print("Keine neuen Ausschreibungen - keine E-Mail gesendet")
+            return True
+        
+        own_connection = connection is None
+        if own_connection:
+            connection = self.connect()
+        try:
+            self.deliver(tenders, connection)
+            print(f"E-Mail erfolgreich gesendet an {self.recipient_email}")
+            metrics.inc("tenderscout_notifications_total", channel="email", result="sent")
+            return True
+            
+        except Exception as e:
+            print(f"Fehler beim E-Mail-Versand: {e}")
+            metrics.inc("tenderscout_notifications_total", channel="email", result="failed")
+            return False
+        finally:
+            if own_connection:
+                connection.close()
+    
+    def _create_text_content(self, tenders: List[Dict[str, Any]], kind: str = outbox.KIND_NEW_TENDERS) -> str:
+        """Erstellt den Text-Inhalt der E-Mail (höchstens DIGEST_MAX_TENDERS Tenders)"""
+        shown = tenders[:DIGEST_MAX_TENDERS]
+        parts = [_TEXT_HEADER.substitute(intro=_WORDING[kind].intro.substitute(count=len(tenders)))]
+        parts.extend(
+            _TEXT_ITEM.substitute(_tender_fields(tender), index=i)
+            for i, tender in enumerate(shown, 1)
+        )
+        if len(tenders) > len(shown):
+            parts.append(_TEXT_MORE.substitute(more=len(tenders) - len(shown), dashboard_url=DASHBOARD_URL))
+        parts.append(_TEXT_FOOTER)
+        return "".join(parts)
+    
+    def _create_html_content(self, tenders: List[Dict[str, Any]], kind: str = outbox.KIND_NEW_TENDERS) -> str:
+        """Erstellt den HTML-Inhalt der E-Mail (höchstens DIGEST_MAX_TENDERS Tenders)"""
+        shown = tenders[:DIGEST_MAX_TENDERS]
+        rows = "".join(_HTML_ITEM.substitute(_tender_fields(tender, escape=True)) for tender in shown)
+        more = ""
+        if len(tenders) > len(shown):
+            more = _HTML_MORE.substitute(
+                more=len(tenders) - len(shown), dashboard_url=html.escape(DASHBOARD_URL, quote=True)
+            )
+        wording = _WORDING[kind]
+        return _HTML_PAGE.substitute(
+            heading=wording.heading,
+            summary=wording.summary.substitute(count=len(tenders)),
+            intro=wording.intro.substitute(count=len(tenders)),
+            rows=rows, more=more,
+            timestamp=datetime.now().strftime('%d.%m.%Y %H:%M'),
+        )
+
+
+class EmailChannel(NotificationChannel):
+    """
+    E-Mail über eine wiederverwendete SMTP-Verbindung, eine E-Mail pro Outbox-Eintrag.
+    RECIPIENT_EMAIL bekommt alle Tenders, jeder Abonnent eine Sammel-E-Mail
+    mit den zu seinen Abos passenden (subscriptions.py).
+    """
+    
+    name = CHANNEL_EMAIL
+    
+    def __init__(self, notifier: Optional[EmailNotifier] = None):
+        self.notifier = notifier or EmailNotifier()
+        self._connection = self.notifier.connect()
+    
+    def is_configured(self) -> bool:
+        return self.notifier.is_configured()
+    
+    def enqueue(self, db, tenders: List[Dict[str, Any]], kind: str = outbox.KIND_NEW_TENDERS):
+        if self.notifier.recipient_email:
+            key = outbox.idempotency_key(kind, outbox.notification_ids(tenders))
+            outbox.enqueue(db, CHANNEL_EMAIL, key, tenders)
+        
+        index = SubscriptionIndex.load(db)
+        if not len(index):
+            return
+        digests = index.fan_out(tenders)
+        for recipient, recipient_tenders in digests.items():
+            key = outbox.idempotency_key(kind, outbox.notification_ids(recipient_tenders), recipient)
+            outbox.enqueue(db, CHANNEL_EMAIL, key, recipient_tenders, recipient)
+        print(f"  {sum(map(len, digests.values()))} Abo-Treffer für {len(digests)} Empfänger")
+    
+    def send(self, items: List[outbox.OutboxItem]):
+        for i, item in enumerate(items):
+            try:
+                self.notifier.deliver(item.payload, self._connection, item.idempotency_key, item.recipient, item.kind)
+            except Exception as e:
+                raise PartialDelivery(items[:i], e) from e
+    
+    def close(self):
+        self._connection.close()
+
+
+def configured_channels() -> List[NotificationChannel]:
+    """Alle in .env eingerichteten Kanäle"""
+    return [channel for channel in (EmailChannel(), WebhookChannel()) if channel.is_configured()]
+
+
+class NotificationDispatcher:
+    """
+    Arbeitet die Outbox in einem Hintergrund-Thread ab.
+    
+    wake() kehrt sofort zurück; ohne Wecken wird alle NOTIFY_POLL_SECONDS
+    nach fälligen Wiederholungen gesehen. Reservierte Einträge werden je
+    Kanal gesammelt und in Gruppen von batch_size verschickt, eine
+    unvollständige Gruppe spätestens nach flush_seconds. Verbindungen der
+    Kanäle werden nach SMTP_IDLE_SECONDS ohne Versand geschlossen.
+    """
+    
+    def __init__(self, channels: Optional[List[NotificationChannel]] = None,
+                 poll_seconds: float = NOTIFY_POLL_SECONDS, idle_seconds: float = SMTP_IDLE_SECONDS):
+        if channels is None:
+            channels = configured_channels()
+        self.channels: Dict[str, NotificationChannel] = {channel.name: channel for channel in channels}
+        self.poll_seconds = poll_seconds
+        self.idle_seconds = idle_seconds
+        self._buffers: Dict[str, List[outbox.OutboxItem]] = {name: [] for name in self.channels}
+        self._buffered_since: Dict[str, float] = {}
+        self._last_send = 0.0
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="notification-dispatcher", daemon=True)
+        self._thread.start()
+    
+    def wake(self):
+        """Fällige Einträge sofort verschicken (blockiert nie)"""
+        self._wake.set()
+    
+    def _failed(self, items: List[outbox.OutboxItem], error: Exception):
+        for item in items:
+            status = outbox.mark_failed(item, str(error))
+            metrics.inc("tenderscout_notifications_total", channel=item.channel,
+                        result="retry" if status == outbox.STATUS_PENDING else "failed")
+        print(f"{len(items)} Benachrichtigung(en) über {items[0].channel} fehlgeschlagen: {error}")
+    
+    def _sent(self, items: List[outbox.OutboxItem]):
+        for item in items:
+            outbox.mark_sent(item)
+            metrics.inc("tenderscout_notifications_total", channel=item.channel, result="sent")
+        if items:
+            self._last_send = time.monotonic()
+    
+    def _send(self, channel: NotificationChannel, items: List[outbox.OutboxItem]) -> int:
+        try:
+            channel.send(items)
+        except PartialDelivery as e:
+            # Zugestellte nicht wiederholen, sonst kämen sie doppelt an
+            delivered = {item.id for item in e.delivered}
+            self._sent(e.delivered)
+            self._failed([item for item in items if item.id not in delivered], e.error)
+            return len(e.delivered)
+        except Exception as e:
+            self._failed(items, e)
+            return 0
+        self._sent(items)
+        return len(items)
+    
+    def _flush(self, force: bool = False) -> int:
+        """Verschickt volle Gruppen und solche, die flush_seconds gewartet haben"""
+        delivered = 0
+        now = time.monotonic()
+        for name, buffer in self._buffers.items():
+            channel = self.channels[name]
+            while buffer and (force or len(buffer) >= channel.batch_size
+                              or now - self._buffered_since[name] >= channel.flush_seconds):
+                batch = buffer[:channel.batch_size]
+                del buffer[:channel.batch_size]
+                delivered += self._send(channel, batch)
+        return delivered
+    
+    def _next_flush(self) -> Optional[float]:
+        """Sekunden bis zur nächsten fälligen unvollständigen Gruppe (None wenn keine wartet)"""
+        now = time.monotonic()
+        waits = [
+            self._buffered_since[name] + self.channels[name].flush_seconds - now
+            for name, buffer in self._buffers.items() if buffer
+        ]
+        return max(min(waits), 0.0) if waits else None
+    
+    def drain(self) -> int:
+        """
+        Reserviert alle fälligen Outbox-Einträge und verschickt die fälligen Gruppen.
+        Returns:
+            Anzahl zugestellter Einträge
+        """
+        delivered = 0
+        while True:
+            items = outbox.claim_due()
+            for item in items:
+                buffer = self._buffers.get(item.channel)
+                if buffer is None:
+                    self._failed([item], ValueError(f"Kanal nicht konfiguriert: {item.channel}"))
+                    continue
+                if not buffer:
+                    self._buffered_since[item.channel] = time.monotonic()
+                buffer.append(item)
+            delivered += self._flush(force=self._stopping)
+            metrics.flush_to_store()
+            if not items:
+                return delivered
+    
+    def _close_channels(self):
+        for channel in self.channels.values():
+            channel.close()
+    
+    def _run(self):
+        try:
+            while True:
+                try:
+                    delivered = self.drain()
+                    if delivered:
+                        print(f"{delivered} Benachrichtigung(en) zugestellt")
+                except Exception as e:
+                    # z.B. Datenbank kurzzeitig gesperrt - beim nächsten Durchlauf erneut
+                    print(f"Fehler beim Abarbeiten der Outbox: {e}")
+                if self._stopping:
+                    return
+                timeout = self.poll_seconds
+                next_flush = self._next_flush()
+                if next_flush is not None:
+                    timeout = min(timeout, next_flush)
+                self._wake.wait(timeout)
+                self._wake.clear()
+                if time.monotonic() - self._last_send > self.idle_seconds:
+                    self._close_channels()
+        finally:
+            self._close_channels()
+    
+    def shutdown(self, timeout: float = NOTIFY_SHUTDOWN_TIMEOUT) -> bool:
+        """
+        Verschickt noch fällige und gesammelte Einträge und beendet den Thread.
+        Returns:
+            False wenn nach timeout Sekunden noch zugestellt wurde (Rest bleibt in der Outbox)
+        """
+        self._stopping = True
+        self._wake.set()
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            print(f"Benachrichtigungen nach {timeout:.0f}s nicht vollständig zugestellt - verbleiben in der Outbox")
+            return False
+        return True
+
+
+_dispatcher: Optional[NotificationDispatcher] = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_dispatcher() -> NotificationDispatcher:
+    """Dispatcher einmal pro Prozess starten; beim Prozessende wird er abgearbeitet"""
+    global _dispatcher
+    with _dispatcher_lock:
+        if _dispatcher is None:
+            _dispatcher = NotificationDispatcher()
+            atexit.register(_dispatcher.shutdown)
+        return _dispatcher
+
+
+def enqueue_new_tenders(db, new_tenders: List[Dict[str, Any]]):
+    """
+    Legt die Benachrichtigungen über neue Tenders für alle eingerichteten
+    Kanäle in der Outbox an - in der Transaktion von db, also nur wenn auch
+    die Tenders gespeichert werden.
+    """
+    if not new_tenders:
+        return
+    for channel in configured_channels():
+        channel.enqueue(db, new_tenders)
+
+
+def enqueue_deadline_reminders(db, tenders: List[Dict[str, Any]]):
+    """
+    Legt Fristerinnerungen (reminders.py) für alle eingerichteten Kanäle in
+    der Outbox an, in der Transaktion von db. Jeder Tender braucht
+    days_left und reminder_days.
+    """
+    if not tenders:
+        return
+    for channel in configured_channels():
+        channel.enqueue(db, tenders, outbox.KIND_DEADLINE_REMINDER)
+
+
+def dispatch_notification():
+    """Fällige Benachrichtigungen im Hintergrund verschicken (kehrt sofort zurück)"""
+    if not configured_channels():
+        print("Keine Benachrichtigung konfiguriert. Bitte SMTP-Einstellungen oder WEBHOOK_URL in .env setzen.")
+        return
+    get_dispatcher().wake()
 
 
 def send_notification(new_tenders: List[Dict[str, Any]]) -> bool:
@@ -0,0 +1,186 @@
+"""
+Ausgangs-Warteschlange (Outbox) fuer Benachrichtigungen.
+
+save_tenders_to_db schreibt die Benachrichtigung ueber neue Ausschreibungen
+in derselben Transaktion wie die Tenders in notification_outbox. Scheitert
+der Versand oder endet der Prozess vorher, bleibt der Eintrag erhalten.
+
+Der NotificationDispatcher (notifier.py) arbeitet die faelligen Eintraege ab.
+Fehlschlaege werden mit exponentiell wachsendem Abstand wiederholt; nach
+OUTBOX_MAX_ATTEMPTS Versuchen gilt ein Eintrag als failed (erneut anstossen:
+POST /api/notifications/outbox/{id}/retry).
+
+Der eindeutige idempotency_key verhindert doppelte Eintraege fuer dieselben
+Tenders und wird als Message-ID der E-Mail verwendet.
+"""
+import hashlib
+import json
+from datetime import datetime, timedelta
+from typing import Iterable, List, NamedTuple, Optional
+
+from sqlalchemy import func, or_, and_
+from sqlalchemy.dialects.sqlite import insert
+
+from database import SessionLocal, NotificationOutboxEntry
+
+
+STATUS_PENDING = "pending"
+STATUS_SENDING = "sending"
+STATUS_SENT = "sent"
+STATUS_FAILED = "failed"
+STATUSES = (STATUS_PENDING, STATUS_SENDING, STATUS_SENT, STATUS_FAILED)
+
+OUTBOX_MAX_ATTEMPTS = 8
+RETRY_BASE_SECONDS = 60  # 1, 2, 4, ... Minuten
+RETRY_MAX_SECONDS = 6 * 3600
+CLAIM_TIMEOUT_SECONDS = 600  # Haengengebliebene Versaende danach erneut versuchen
+CLAIM_BATCH_SIZE = 20
+
+# Art der Benachrichtigung, steht am Anfang des idempotency_key
+KIND_NEW_TENDERS = "new-tenders"
+KIND_DEADLINE_REMINDER = "deadline-reminder"
+
+
+class OutboxItem(NamedTuple):
+    id: int
+    idempotency_key: str
+    channel: str
+    recipient: Optional[str]
+    payload: object
+    attempts: int
+
+    @property
+    def kind(self) -> str:
+        return self.idempotency_key.split(":", 1)[0]
+
+
+def idempotency_key(kind: str, tender_ids: Iterable[str], recipient: str = "") -> str:
+    """Schluessel aus Art, Empfaenger und den (sortierten) Tender-IDs"""
+    digest = hashlib.sha1("\n".join(sorted(tender_ids)).encode("utf-8")).hexdigest()
+    return f"{kind}:{recipient}:{digest}"
+
+
+def notification_ids(tenders: Iterable[dict]) -> List[str]:
+    """IDs fuer idempotency_key: Tender-ID, bei Fristerinnerungen mit Fenster ("id@7")"""
+    return [
+        f"{tender['id']}@{tender['reminder_days']}" if "reminder_days" in tender else tender["id"]
+        for tender in tenders
+    ]
+
+
+def enqueue(db, channel: str, key: str, payload, recipient: Optional[str] = None):
+    """
+    Fuegt einen Eintrag in der Transaktion von db hinzu (commit macht der Aufrufer).
+    Ein vorhandener Eintrag mit gleichem Schluessel bleibt unveraendert.
+    """
+    db.execute(insert(NotificationOutboxEntry).values(
+        idempotency_key=key,
+        channel=channel,
+        recipient=recipient,
+        payload=json.dumps(payload, ensure_ascii=False, default=str),
+        status=STATUS_PENDING,
+        attempts=0,
+        created_at=datetime.utcnow(),
+        next_attempt_at=datetime.utcnow(),
+    ).on_conflict_do_nothing(index_elements=[NotificationOutboxEntry.idempotency_key]))
+
+
+def _due_condition(now: datetime):
+    return or_(
+        and_(NotificationOutboxEntry.status == STATUS_PENDING, NotificationOutboxEntry.next_attempt_at <= now),
+        and_(
+            NotificationOutboxEntry.status == STATUS_SENDING,
+            NotificationOutboxEntry.claimed_at < now - timedelta(seconds=CLAIM_TIMEOUT_SECONDS),
+        ),
+    )
+
+
+def claim_due(limit: int = CLAIM_BATCH_SIZE) -> List[OutboxItem]:
+    """
+    Reserviert faellige Eintraege fuer den Versand (status sending).
+    Die Reservierung ist ein bedingtes UPDATE - laufen mehrere Prozesse,
+    versendet jeder Eintrag nur einer.
+    """
+    now = datetime.utcnow()
+    db = SessionLocal()
+    try:
+        candidates = db.query(NotificationOutboxEntry).filter(_due_condition(now)).order_by(
+            NotificationOutboxEntry.next_attempt_at, NotificationOutboxEntry.id
+        ).limit(limit).all()
+
+        claimed = []
+        for entry in candidates:
+            updated = db.query(NotificationOutboxEntry).filter(
+                NotificationOutboxEntry.id == entry.id, _due_condition(now)
+            ).update(
+                {NotificationOutboxEntry.status: STATUS_SENDING, NotificationOutboxEntry.claimed_at: now},
+                synchronize_session=False,
+            )
+            if updated:
+                claimed.append(OutboxItem(
+                    entry.id, entry.idempotency_key, entry.channel, entry.recipient,
+                    json.loads(entry.payload), entry.attempts,
+                ))
+        db.commit()
+        return claimed
+    finally:
+        db.close()
+
+
+def mark_sent(item: OutboxItem):
+    db = SessionLocal()
+    try:
+        db.query(NotificationOutboxEntry).filter(NotificationOutboxEntry.id == item.id).update({
+            NotificationOutboxEntry.status: STATUS_SENT,
+            NotificationOutboxEntry.attempts: item.attempts + 1,
+            NotificationOutboxEntry.sent_at: datetime.utcnow(),
+            NotificationOutboxEntry.last_error: None,
+        }, synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+
+def mark_failed(item: OutboxItem, error: str) -> str:
+    """
+    Plant den naechsten Versuch (exponentieller Abstand) oder gibt auf.
+    Returns:
+        Neuer Status (pending oder failed)
+    """
+    attempts = item.attempts + 1
+    status = STATUS_FAILED if attempts >= OUTBOX_MAX_ATTEMPTS else STATUS_PENDING
+    delay = min(RETRY_BASE_SECONDS * 2 ** (attempts - 1), RETRY_MAX_SECONDS)
+    db = SessionLocal()
+    try:
+        db.query(NotificationOutboxEntry).filter(NotificationOutboxEntry.id == item.id).update({
+            NotificationOutboxEntry.status: status,
+            NotificationOutboxEntry.attempts: attempts,
+            NotificationOutboxEntry.last_error: error[:2000],
+            NotificationOutboxEntry.next_attempt_at: datetime.utcnow() + timedelta(seconds=delay),
+            NotificationOutboxEntry.claimed_at: None,
+        }, synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+    return status
+
+
+def retry(db, entry_id: int) -> bool:
+    """Setzt einen fehlgeschlagenen Eintrag auf sofort faellig; False wenn nicht (mehr) failed"""
+    updated = db.query(NotificationOutboxEntry).filter(
+        NotificationOutboxEntry.id == entry_id, NotificationOutboxEntry.status == STATUS_FAILED
+    ).update({
+        NotificationOutboxEntry.status: STATUS_PENDING,
+        NotificationOutboxEntry.attempts: 0,
+        NotificationOutboxEntry.next_attempt_at: datetime.utcnow(),
+    }, synchronize_session=False)
+    db.commit()
+    return bool(updated)
+
+
+def status_counts(db) -> dict:
+    """Anzahl Eintraege je Status"""
+    counts = dict.fromkeys(STATUSES, 0)
+    rows = db.query(NotificationOutboxEntry.status, func.count()).group_by(NotificationOutboxEntry.status)
+    counts.update({status: count for status, count in rows})
+    return counts
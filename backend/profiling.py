@@ -0,0 +1,80 @@
+"""
+Optionales Request-Profiling fuer die API.
+
+Misst pro Request die Gesamtdauer, die Anzahl der SQL-Statements und die
+gesamte SQL-Zeit, liefert sie im Server-Timing-Header aus und protokolliert
+langsame Requests mit ihrer Query-Liste. So fallen N+1-Muster sofort auf.
+
+Aktivierung in .env:
+    API_PROFILING=1
+    SLOW_REQUEST_MS=500
+"""
+import contextvars
+import time
+from typing import List, Optional, Tuple
+
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from database import add_query_listener
+
+
+class RequestProfile:
+    """Gesammelte SQL-Statements eines Requests"""
+
+    def __init__(self):
+        self.queries: List[Tuple[str, float]] = []
+
+    @property
+    def sql_time(self) -> float:
+        return sum(duration for _, duration in self.queries)
+
+
+_current_profile: contextvars.ContextVar[Optional[RequestProfile]] = contextvars.ContextVar(
+    "request_profile", default=None
+)
+
+
+def _record_query(statement: str, duration: float):
+    profile = _current_profile.get()
+    if profile is not None:
+        profile.queries.append((statement, duration))
+
+
+add_query_listener(_record_query)
+
+
+class ProfilingMiddleware(BaseHTTPMiddleware):
+    """Server-Timing-Header und Log fuer langsame Requests"""
+
+    def __init__(self, app, slow_request_ms: float = 500):
+        super().__init__(app)
+        self.slow_request_ms = slow_request_ms
+
+    async def dispatch(self, request, call_next):
+        profile = RequestProfile()
+        token = _current_profile.set(profile)
+        start = time.perf_counter()
+        try:
+            response = await call_next(request)
+        finally:
+            _current_profile.reset(token)
+        total_ms = (time.perf_counter() - start) * 1000
+        sql_ms = profile.sql_time * 1000
+
+        response.headers["Server-Timing"] = (
+            f'app;dur={total_ms:.1f}, '
+            f'db;dur={sql_ms:.1f};desc="{len(profile.queries)} queries"'
+        )
+
+        if total_ms >= self.slow_request_ms:
+            self._log_slow_request(request, total_ms, sql_ms, profile)
+
+        return response
+
+    def _log_slow_request(self, request, total_ms: float, sql_ms: float, profile: RequestProfile):
+        print(
+            f"[Profiling] Langsamer Request {request.method} {request.url.path}: "
+            f"{total_ms:.1f} ms gesamt, {len(profile.queries)} SQL-Statements in {sql_ms:.1f} ms"
+        )
+        for statement, duration in profile.queries:
+            print(f"    {duration * 1000:7.2f} ms  {' '.join(statement.split())[:200]}")
@@ -0,0 +1,137 @@
+"""
+Fristerinnerungen fuer vorgemerkte Ausschreibungen (INTERESTING, APPLIED).
+
+Ausführen mit: cd backend && python reminders.py (der Scheduler startet es taeglich)
+
+Ein Lauf liest mit einer Bereichsabfrage ueber ix_tenders_status_deadline
+alle vorgemerkten Tenders, deren Frist in den naechsten max(REMINDER_DAYS)
+Tagen endet - der Aufwand haengt von der Zahl der Treffer ab, nicht von
+der Groesse der Tabelle. Jeder Tender faellt in das kleinste Fenster, das
+seine Restlaufzeit abdeckt (bei 7/3/1: 5 Tage -> 7, 2 Tage -> 3).
+
+Pro Tender und Fenster wird hoechstens einmal erinnert: verschickte
+Erinnerungen stehen in deadline_reminders und werden in derselben
+Transaktion angelegt wie die Outbox-Eintraege (notifier.enqueue_deadline_reminders).
+Ist kein Kanal eingerichtet, wird nichts angelegt - sonst gaelten die
+Erinnerungen als verschickt und kaemen nach dem Einrichten nie an.
+"""
+import os
+import sys
+from datetime import date, timedelta
+from typing import List, Optional
+
+backend_dir = os.path.dirname(os.path.abspath(__file__))
+if backend_dir not in sys.path:
+    sys.path.insert(0, backend_dir)
+
+from sqlalchemy.dialects.sqlite import insert
+
+from config import REMINDER_DAYS
+from database import SessionLocal, Tender, TenderStatus, DeadlineReminder, init_db
+from notifier import configured_channels, enqueue_deadline_reminders, dispatch_notification
+
+
+REMINDER_STATUSES = (TenderStatus.INTERESTING, TenderStatus.APPLIED)
+CHUNK_SIZE = 500
+
+
+def _parse_deadline(deadline: str) -> Optional[date]:
+    try:
+        return date.fromisoformat((deadline or "")[:10])
+    except ValueError:
+        return None
+
+
+def _window(days_left: int, windows: List[int]) -> Optional[int]:
+    """Kleinstes Fenster, das die Restlaufzeit abdeckt"""
+    return next((days for days in windows if days_left <= days), None)
+
+
+def _tender_payload(tender: Tender, days_left: int, window: int) -> dict:
+    """Tender wie von den Crawlern (fuer Vorlagen und Abos) plus Restlaufzeit"""
+    return {
+        "id": tender.id,
+        "title": tender.title,
+        "authority": tender.authority,
+        "location": tender.location,
+        "deadline": tender.deadline,
+        "budget": tender.budget,
+        "category": tender.category,
+        "description": tender.description,
+        "status": tender.status.value,
+        "source_portal": tender.source_portal,
+        "source_url": tender.source_url,
+        "days_left": days_left,
+        "reminder_days": window,
+    }
+
+
+def reminder_query(db, today: date, windows: List[int] = REMINDER_DAYS):
+    """Vorgemerkte Tenders mit Frist in den naechsten max(windows) Tagen"""
+    # deadline ist ein ISO-String - Vergleich als Text, bis zum Ende des letzten Fenstertags
+    end = (today + timedelta(days=max(windows) + 1)).isoformat()
+    return db.query(Tender).filter(
+        Tender.status.in_(REMINDER_STATUSES),
+        Tender.deadline >= today.isoformat(),
+        Tender.deadline < end,
+    )
+
+
+def run_reminders(today: Optional[date] = None, windows: List[int] = REMINDER_DAYS) -> int:
+    """
+    Legt die faelligen Fristerinnerungen an und stoesst den Versand an.
+    Returns:
+        Anzahl erinnerter Tenders
+    """
+    today = today or date.today()
+    windows = sorted(windows)
+    if not windows:
+        return 0
+    if not configured_channels():
+        print("Keine Benachrichtigung konfiguriert - Fristerinnerungen werden nicht angelegt")
+        return 0
+
+    db = SessionLocal()
+    try:
+        due = []
+        for tender in reminder_query(db, today, windows):
+            deadline = _parse_deadline(tender.deadline)
+            if deadline is None:
+                continue
+            days_left = (deadline - today).days
+            window = _window(days_left, windows)
+            if window is not None:
+                due.append((tender, days_left, window))
+
+        # Bereits verschickte Erinnerungen (Primaerschluessel-Zugriffe)
+        sent = set()
+        ids = [tender.id for tender, _, _ in due]
+        for i in range(0, len(ids), CHUNK_SIZE):
+            sent.update(
+                (row.tender_id, row.days) for row in
+                db.query(DeadlineReminder.tender_id, DeadlineReminder.days)
+                .filter(DeadlineReminder.tender_id.in_(ids[i:i + CHUNK_SIZE]))
+            )
+        due = [(tender, days_left, window) for tender, days_left, window in due
+               if (tender.id, window) not in sent]
+        if not due:
+            return 0
+        due.sort(key=lambda reminder: reminder[1])  # Naechste Frist zuerst
+
+        payload = [_tender_payload(tender, days_left, window) for tender, days_left, window in due]
+        rows = [{"tender_id": tender.id, "days": window} for tender, _, window in due]
+        for i in range(0, len(rows), CHUNK_SIZE):
+            db.execute(insert(DeadlineReminder).values(rows[i:i + CHUNK_SIZE]).on_conflict_do_nothing())
+        enqueue_deadline_reminders(db, payload)
+        db.commit()
+    finally:
+        db.close()
+
+    print(f"{len(payload)} Fristerinnerung(en) angelegt")
+    dispatch_notification()
+    return len(payload)
+
+
+if __name__ == "__main__":
+    init_db()
+    run_reminders()
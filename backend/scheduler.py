@@ -1,77 +1,306 @@
 """
-Scheduler für automatisches Crawling (2x täglich)
+Scheduler für automatisches Crawling
 
 Ausführen mit: python scheduler.py
 
-Der Scheduler läuft kontinuierlich und startet den Crawler:
-- Morgens um 06:00 Uhr
-- Abends um 18:00 Uhr
+Ein langlebiger asyncio-Prozess mit einem Job pro Portal; jedes Portal
+wird einzeln gecrawlt und gespeichert (crawlers.run_all.run_portal_crawler).
+Der Zeitplan steht in settings.json unter "schedules" (Schlüssel wie
+source_portal), z.B.:
+
+    "schedules": {
+        "tender24.de": {"interval": 3600, "jitter": 300, "maxRuntime": 1800},
+        "meinauftrag.rib.de": {"cron": "30 5 * * 1-5"}
+    }
+
+- cron: "Minute Stunde Tag Monat Wochentag" (*, */n, a-b, a,b; 0 = Sonntag)
+- interval: Sekunden zwischen zwei Läufen; jedes Portal bekommt einen
+  festen Versatz innerhalb des Intervalls, damit stündliche Portale nicht
+  alle zur vollen Stunde starten
+- jitter: zufällige Verzögerung jedes Starts um bis zu jitter Sekunden
+- maxRuntime: längere Läufe werden abgebrochen
+- minInterval/maxInterval: adaptiver Takt (cadence.py) - das Intervall
+  folgt der gemessenen Rate neuer Tenders des Portals, so dass ein Lauf
+  etwa targetNew (Standard CRAWL_TARGET_NEW) neue Tenders findet;
+  interval ist dann der Startwert, solange die Historie nicht reicht
+  (ohne jeden Lauf startet das Portal sofort)
+
+    "schedules": {
+        "ausschreibung.at": {"minInterval": 1800, "maxInterval": 86400, "targetNew": 5}
+    }
+
+Portale ohne Eintrag laufen nach DEFAULT_CRAWL_SCHEDULE (06:00 und 18:00).
+Höchstens MAX_CONCURRENT_CRAWLS Browser laufen gleichzeitig.
+Fristerinnerungen (reminders.py) werden täglich um 07:00 Uhr angelegt.
+Geänderte Zeitpläne und neue Portale gelten nach einem Neustart.
 """
-import schedule
-import time
 import asyncio
+import math
 import os
+import random
 import sys
-from datetime import datetime
+import traceback
+import zlib
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, FrozenSet, NamedTuple, Optional
 
 # Pfad konfigurieren
 backend_dir = os.path.dirname(os.path.abspath(__file__))
 if backend_dir not in sys.path:
     sys.path.insert(0, backend_dir)
 
+from config import DEFAULT_CRAWL_SCHEDULE, MAX_CONCURRENT_CRAWLS, CRAWL_TARGET_NEW
+import metrics
 
-def run_crawler():
-    """Startet den Crawler synchron"""
-    print(f"\n{'='*60}")
-    print(f"⏰ Scheduler startet Crawling um {datetime.now().strftime('%d.%m.%Y %H:%M:%S')}")
-    print(f"{'='*60}\n")
-    
-    try:
-        from crawlers.run_all import run_all_crawlers
-        
-        # Neuen Event-Loop erstellen
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
+
+REMINDER_CRON = "0 7 * * *"
+
+
+def _parse_cron_field(field: str, low: int, high: int) -> FrozenSet[int]:
+    """ "*/15", "1-5", "0,30" -> erlaubte Werte"""
+    values = set()
+    for part in field.split(","):
+        value_range, _, step = part.partition("/")
+        if value_range == "*":
+            start, end = low, high
+        elif "-" in value_range:
+            start, end = (int(value) for value in value_range.split("-", 1))
+        else:
+            start = end = int(value_range)
+        if not low <= start <= end <= high:
+            raise ValueError(f"Ungueltiges Cron-Feld: {field}")
+        values.update(range(start, end + 1, int(step) if step else 1))
+    return frozenset(values)
+
+
+class CronSchedule:
+    """Cron-Ausdruck "Minute Stunde Tag Monat Wochentag" in lokaler Zeit"""
+
+    def __init__(self, expression: str):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron-Ausdruck braucht 5 Felder: {expression}")
+        self.expression = expression
+        self.minutes = _parse_cron_field(fields[0], 0, 59)
+        self.hours = _parse_cron_field(fields[1], 0, 23)
+        self.days = _parse_cron_field(fields[2], 1, 31)
+        self.months = _parse_cron_field(fields[3], 1, 12)
+        # 7 ist wie 0 Sonntag
+        self.weekdays = frozenset(day % 7 for day in _parse_cron_field(fields[4], 0, 7))
+        self._any_day = fields[2] == "*"
+        self._any_weekday = fields[4] == "*"
+
+    def _day_matches(self, moment: datetime) -> bool:
+        day = moment.day in self.days
+        weekday = (moment.weekday() + 1) % 7 in self.weekdays
+        # Wie cron: sind Tag und Wochentag eingeschraenkt, genuegt eines von beiden
+        if not self._any_day and not self._any_weekday:
+            return day or weekday
+        return day and weekday
+
+    def next_after(self, after: datetime) -> datetime:
+        moment = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = moment + timedelta(days=5 * 366)
+        while moment < limit:
+            if moment.month not in self.months:
+                moment = (moment.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(moment):
+                moment = moment.replace(hour=0, minute=0) + timedelta(days=1)
+            elif moment.hour not in self.hours:
+                moment = moment.replace(minute=0) + timedelta(hours=1)
+            elif moment.minute not in self.minutes:
+                moment += timedelta(minutes=1)
+            else:
+                return moment
+        raise ValueError(f"Cron-Ausdruck trifft nie zu: {self.expression}")
+
+    def __str__(self) -> str:
+        return f"cron {self.expression}"
+
+
+class IntervalSchedule:
+    """Alle interval Sekunden, mit festem Versatz je Job (gleichmaessig verteilt)"""
+
+    def __init__(self, interval: float, name: str = ""):
+        if interval <= 0:
+            raise ValueError(f"Intervall muss positiv sein: {interval}")
+        self.interval = interval
+        self.offset = zlib.crc32(name.encode("utf-8")) % 1000 / 1000 * interval
+
+    def next_after(self, after: datetime) -> datetime:
+        slot = math.floor((after.timestamp() - self.offset) / self.interval) + 1
+        return datetime.fromtimestamp(slot * self.interval + self.offset)
+
+    def __str__(self) -> str:
+        return f"alle {self.interval:.0f}s"
+
+
+class AdaptiveSchedule:
+    """Intervall aus der Crawl-Historie des Portals (cadence.py), neu berechnet nach jedem Lauf"""
+
+    def __init__(self, portal: str, min_interval: float, max_interval: float,
+                 target_new: float, initial_interval: Optional[float] = None):
+        if not 0 < min_interval <= max_interval:
+            raise ValueError(f"Ungueltige Intervallgrenzen: {min_interval}-{max_interval}")
+        self.portal = portal
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.target_new = target_new
+        self.initial_interval = initial_interval or min_interval
+        self.interval = min(max(self.initial_interval, min_interval), max_interval)
+        self.rate: Optional[float] = None
+        self.last_started: Optional[datetime] = None
+
+    def refresh(self):
+        """Liest die Historie (blockierend, im Scheduler per asyncio.to_thread)"""
+        from cadence import adaptive_interval, load_cadence
+        from database import SessionLocal
+
+        db = SessionLocal()
         try:
-            loop.run_until_complete(run_all_crawlers())
+            cadence = load_cadence(db, self.portal)
         finally:
-            loop.close()
-            
-        print(f"\n✅ Crawling erfolgreich abgeschlossen um {datetime.now().strftime('%H:%M:%S')}")
-        
-    except Exception as e:
-        print(f"\n❌ Fehler beim Crawling: {e}")
-        import traceback
-        traceback.print_exc()
+            db.close()
+        self.rate = cadence.rate
+        self.last_started = cadence.last_started
+        self.interval = adaptive_interval(
+            cadence.rate, self.target_new, self.min_interval, self.max_interval, self.initial_interval,
+        )
+
+    def next_after(self, after: datetime) -> datetime:
+        if self.last_started is None:
+            return after
+        return max(self.last_started + timedelta(seconds=self.interval), after)
+
+    def __str__(self) -> str:
+        rate = "?" if self.rate is None else f"{self.rate:.2f}/h"
+        return f"adaptiv {self.interval:.0f}s ({rate})"
+
+
+class Job(NamedTuple):
+    name: str
+    schedule: object  # CronSchedule, IntervalSchedule oder AdaptiveSchedule
+    run: Callable[[], Awaitable]
+    jitter: float = 0.0
+    max_runtime: Optional[float] = None
+
+
+def build_schedule(name: str, config: dict):
+    if config.get("minInterval") or config.get("maxInterval"):
+        initial = float(config.get("interval") or 0) or None
+        min_interval = float(config.get("minInterval") or 0)
+        max_interval = float(config.get("maxInterval") or 0)
+        # Fehlende Grenze aus interval bzw. der anderen Grenze
+        if not min_interval:
+            min_interval = min(initial or max_interval, max_interval)
+        if not max_interval:
+            max_interval = max(initial or min_interval, min_interval)
+        return AdaptiveSchedule(
+            name, min_interval, max_interval,
+            float(config.get("targetNew") or CRAWL_TARGET_NEW), initial,
+        )
+    if config.get("interval"):
+        return IntervalSchedule(float(config["interval"]), name)
+    return CronSchedule(config.get("cron") or DEFAULT_CRAWL_SCHEDULE["cron"])
+
+
+def build_jobs(settings: dict) -> list:
+    """Ein Crawl-Job pro Portal (Zeitplan aus settings["schedules"]) plus Fristerinnerungen"""
+    from crawlers.run_all import run_portal_crawler
+    from crawlers.working_crawlers import portal_names
+    from reminders import run_reminders
+
+    browsers = asyncio.Semaphore(MAX_CONCURRENT_CRAWLS)
+    schedules = settings.get("schedules", {})
+
+    def crawl(portal: str, max_runtime: Optional[float]):
+        async def run():
+            # Die Laufzeitgrenze gilt ab dem Start des Browsers, nicht fuer die Wartezeit davor
+            async with browsers:
+                await asyncio.wait_for(run_portal_crawler(portal), timeout=max_runtime)
+        return run
+
+    jobs = []
+    for portal in portal_names(settings):
+        config = {**DEFAULT_CRAWL_SCHEDULE, **schedules.get(portal, {})}
+        try:
+            schedule = build_schedule(portal, config)
+        except ValueError as e:
+            # Ein fehlerhafter Eintrag legt nur dieses Portal still, nicht den Scheduler
+            print(f"❌ [{portal}] Zeitplan ungueltig, Portal wird nicht gecrawlt: {e}")
+            continue
+        max_runtime = float(config.get("maxRuntime") or 0) or None
+        jobs.append(Job(
+            portal, schedule, crawl(portal, max_runtime),
+            float(config.get("jitter") or 0), max_runtime,
+        ))
+    jobs.append(Job("reminders", CronSchedule(REMINDER_CRON), lambda: asyncio.to_thread(run_reminders)))
+    return jobs
+
+
+async def run_job(job: Job):
+    """Fuehrt einen Job nach seinem Zeitplan aus, bis der Prozess endet"""
+    while True:
+        next_run = job.schedule.next_after(datetime.now())
+        next_run += timedelta(seconds=random.uniform(0, job.jitter))
+        await asyncio.sleep(max((next_run - datetime.now()).total_seconds(), 0))
+
+        started = datetime.now()
+        print(f"\n⏰ [{job.name}] Start um {started.strftime('%d.%m.%Y %H:%M:%S')}")
+        try:
+            await job.run()
+            result = "ok"
+        except asyncio.TimeoutError:
+            print(f"❌ [{job.name}] nach {job.max_runtime:g}s abgebrochen")
+            result = "timeout"
+        except Exception as e:
+            print(f"❌ [{job.name}] Fehler: {e}")
+            traceback.print_exc()
+            result = "error"
+        metrics.inc("tenderscout_scheduler_runs_total", job=job.name, result=result)
+        metrics.flush_to_store()
+        if isinstance(job.schedule, AdaptiveSchedule):
+            try:
+                await asyncio.to_thread(job.schedule.refresh)
+                print(f"   [{job.name}] Takt: {job.schedule}")
+            except Exception as e:
+                print(f"❌ [{job.name}] Crawl-Historie nicht lesbar: {e}")
+                job.schedule.last_started = started
+
+
+async def run_scheduler(settings: Optional[dict] = None):
+    from crawlers.working_crawlers import load_crawl_settings
+
+    jobs = build_jobs(load_crawl_settings() if settings is None else settings)
+    for job in jobs:
+        if isinstance(job.schedule, AdaptiveSchedule):
+            await asyncio.to_thread(job.schedule.refresh)
+    now = datetime.now()
+    print("Geplante Jobs:")
+    for job in jobs:
+        print(f"  - {job.name:30} {str(job.schedule):20} nächster Lauf {job.schedule.next_after(now):%d.%m. %H:%M}")
+    print()
+    await asyncio.gather(*(run_job(job) for job in jobs))
 
 
 def main():
     """Hauptfunktion - startet den Scheduler"""
+    from database import init_db
+
     print("="*60)
     print("🚀 TenderScout AI - Scheduler gestartet")
     print("="*60)
     print()
-    print("Geplante Crawl-Zeiten:")
-    print("  - 06:00 Uhr (morgens)")
-    print("  - 18:00 Uhr (abends)")
-    print()
     print("Drücke Ctrl+C zum Beenden")
     print("="*60)
     print()
-    
-    # Jobs planen
-    schedule.every().day.at("06:00").do(run_crawler)
-    schedule.every().day.at("18:00").do(run_crawler)
-    
-    # Optional: Beim Start einmal ausführen
-    # run_crawler()
-    
-    # Scheduler-Loop
-    while True:
-        schedule.run_pending()
-        time.sleep(60)  # Jede Minute prüfen
+
+    init_db()
+    try:
+        asyncio.run(run_scheduler())
+    except KeyboardInterrupt:
+        print("\nScheduler beendet")
 
 
 if __name__ == "__main__":
     main()
-
@@ -0,0 +1,138 @@
+"""
+Abos: welche neuen Ausschreibungen welcher Empfaenger bekommt.
+
+Ein Abo (Tabelle subscriptions) besteht aus Bedingungen, die alle erfuellt
+sein muessen; eine leere Bedingung gilt als erfuellt:
+- keywords: mindestens ein Keyword in Titel oder Beschreibung
+- categories: Kategorie ist eine davon
+- regions: Stadt, Region oder Land aus location ist eine davon
+- min_budget: bekanntes Budget (Obergrenze) >= min_budget; ohne Budgetangabe erfuellt
+
+SubscriptionIndex kehrt die Bedingungen in Indizes um (Keyword, Kategorie,
+Region -> Abo-IDs) und zaehlt pro Tender die Treffer je Abo: passend ist
+ein Abo, dessen Trefferzahl der Zahl seiner Bedingungen entspricht. Der
+Aufwand haengt also von den Treffern ab, nicht von der Zahl der Abos.
+Alle Keywords stehen in einer Trie-Regex, der Text wird einmal durchsucht.
+
+fan_out() fasst die Treffer je Empfaenger zusammen (eine Sammel-E-Mail,
+auch wenn mehrere Abos eines Empfaengers passen).
+"""
+import json
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Set
+
+from budget import parse_budget
+from crawlers.trie_regex import build_trie_pattern
+from database import Subscription
+from normalize import normalize_text
+
+
+# Eine Adresse ohne Anzeigename, Leerzeichen oder Trennzeichen; Domain mit Punkt
+EMAIL_PATTERN = re.compile(r"[^@\s,;<>\"()\[\]]+@(?:[A-Za-z0-9-]+\.)+[A-Za-z]{2,}")
+
+
+def is_valid_email(address: str) -> bool:
+    """True fuer eine einzelne E-Mail-Adresse wie "name@firma.at" """
+    return bool(EMAIL_PATTERN.fullmatch(address or ""))
+
+
+def load_list(value) -> List[str]:
+    """JSON-Spalte als Liste (None/leer -> [])"""
+    return json.loads(value) if value else []
+
+
+def _region_terms(location: str) -> Set[str]:
+    """ "Graz, Steiermark, Oesterreich" -> {"graz", "steiermark", "oesterreich"}"""
+    return {normalize_text(part) for part in (location or "").split(",")} - {""}
+
+
+class SubscriptionIndex:
+    """Umgekehrter Index ueber die aktiven Abos"""
+
+    def __init__(self, subscriptions: Iterable[Subscription]):
+        self.recipients: Dict[int, str] = {}
+        self._required: Dict[int, int] = {}  # Abo-ID -> Anzahl Text-Bedingungen
+        self._match_all: List[int] = []  # Abos ohne Keyword/Kategorie/Region
+        self._min_budget: Dict[int, float] = {}
+        self._keywords: Dict[str, Set[int]] = {}
+        self._categories: Dict[str, Set[int]] = {}
+        self._regions: Dict[str, Set[int]] = {}
+
+        for subscription in subscriptions:
+            sub_id = subscription.id
+            self.recipients[sub_id] = subscription.recipient
+            keywords = {normalize_text(keyword) for keyword in load_list(subscription.keywords)} - {""}
+            categories = set(load_list(subscription.categories))
+            regions = {normalize_text(region) for region in load_list(subscription.regions)} - {""}
+
+            for index, values in ((self._keywords, keywords), (self._categories, categories),
+                                  (self._regions, regions)):
+                for value in values:
+                    index.setdefault(value, set()).add(sub_id)
+
+            required = bool(keywords) + bool(categories) + bool(regions)
+            self._required[sub_id] = required
+            if not required:
+                self._match_all.append(sub_id)
+            if subscription.min_budget is not None:
+                self._min_budget[sub_id] = subscription.min_budget
+
+        # Wie im Kategorisierer: der Lookahead liefert an jeder Position das
+        # laengste Keyword, kuerzere Keywords mit gleichem Anfang ergaenzt die Tabelle
+        self._keyword_pattern = re.compile("(?=(" + build_trie_pattern(self._keywords) + "))")
+        self._keyword_prefixes = {
+            keyword: [other for other in self._keywords if keyword.startswith(other)]
+            for keyword in self._keywords
+        }
+
+    @classmethod
+    def load(cls, db) -> "SubscriptionIndex":
+        return cls(db.query(Subscription).filter(Subscription.active == True).all())
+
+    def __len__(self) -> int:
+        return len(self.recipients)
+
+    def _keyword_hits(self, tender: dict) -> Set[int]:
+        if not self._keywords:
+            return set()
+        text = f"{normalize_text(tender.get('title', ''))} {normalize_text(tender.get('description', ''))}"
+        matched = set()
+        for match in self._keyword_pattern.finditer(text):
+            matched.update(self._keyword_prefixes[match.group(1)])
+        hits = set()
+        for keyword in matched:
+            hits |= self._keywords[keyword]
+        return hits
+
+    def _region_hits(self, tender: dict) -> Set[int]:
+        hits = set()
+        for term in _region_terms(tender.get("location", "")):
+            hits |= self._regions.get(term, set())
+        return hits
+
+    def match(self, tender: dict) -> Set[int]:
+        """IDs der Abos, zu denen der Tender (Dict wie von den Crawlern) passt"""
+        counts = Counter()
+        counts.update(self._keyword_hits(tender))
+        counts.update(self._categories.get(tender.get("category"), ()))
+        counts.update(self._region_hits(tender))
+
+        matched = {sub_id for sub_id, count in counts.items() if count == self._required[sub_id]}
+        matched.update(self._match_all)
+
+        budget = parse_budget(tender.get("budget"))
+        if budget is not None and self._min_budget:
+            matched = {
+                sub_id for sub_id in matched
+                if budget.max >= self._min_budget.get(sub_id, budget.max)
+            }
+        return matched
+
+    def fan_out(self, tenders: List[dict]) -> Dict[str, List[dict]]:
+        """Empfaenger -> passende Tenders (Reihenfolge wie tenders, jeder Tender einmal)"""
+        digests: Dict[str, List[dict]] = {}
+        for tender in tenders:
+            for recipient in {self.recipients[sub_id] for sub_id in self.match(tender)}:
+                digests.setdefault(recipient, []).append(tender)
+        return digests
@@ -0,0 +1,47 @@
+"""
+Gemeinsame Einstellungen der Tests: Backend im Pfad, Datenbank, Metriken,
+Kategorie-Modell und Snapshots in einem temporaeren Ordner statt in backend/.
+
+Ausführen mit: cd backend && python -m pytest
+"""
+import os
+import sys
+import tempfile
+
+import pytest
+
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if backend_dir not in sys.path:
+    sys.path.insert(0, backend_dir)
+
+import config
+
+_data_dir = tempfile.mkdtemp(prefix="tenderscout-tests-")
+config.DATABASE_URL = "sqlite:///" + os.path.join(_data_dir, "tenders.db")
+config.METRICS_STORE_PATH = os.path.join(_data_dir, "metrics.db")
+config.CATEGORY_MODEL_PATH = os.path.join(_data_dir, "category_model.npz")
+config.SNAPSHOT_DIR = os.path.join(_data_dir, "snapshots")
+
+
+@pytest.fixture
+def db():
+    """Session auf einer frisch angelegten, leeren Datenbank"""
+    from database import Base, SessionLocal, engine, init_db
+
+    Base.metadata.drop_all(engine)
+    init_db()
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def client(db):
+    """TestClient der API auf der leeren Test-Datenbank (ohne Startup-Event)"""
+    from fastapi.testclient import TestClient
+
+    from api import app
+
+    return TestClient(app)
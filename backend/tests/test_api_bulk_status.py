@@ -0,0 +1,47 @@
+import pytest
+
+from database import Tender, TenderStatus
+
+
+@pytest.fixture
+def tenders(db):
+    for tender_id, category in [("a", "Hochbau"), ("b", "Tiefbau"), ("c", "Tiefbau")]:
+        db.add(Tender(
+            id=tender_id, title=f"Tender {tender_id}", authority="Stadt", location="Graz, Oesterreich",
+            deadline="2026-12-01", description="", category=category, status=TenderStatus.NEW,
+            source_url="https://example.com", source_portal="ausschreibung.at",
+        ))
+    db.commit()
+    return db
+
+
+def statuses(db):
+    db.expire_all()
+    return {tender.id: tender.status.value for tender in db.query(Tender)}
+
+
+def test_update_by_ids(client, tenders):
+    response = client.put("/api/tenders/status", json={"status": "APPLIED", "ids": ["a", "c", "x", "a"]})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["updated"] == 2
+    assert body["results"] == {"a": "updated", "c": "updated", "x": "not_found"}
+    assert statuses(tenders) == {"a": "APPLIED", "b": "NEW", "c": "APPLIED"}
+
+
+def test_update_by_filter(client, tenders):
+    response = client.put("/api/tenders/status", json={"status": "REJECTED", "filters": {"category": ["Tiefbau"]}})
+    assert response.status_code == 200
+    assert response.json()["updated"] == 2
+    assert statuses(tenders) == {"a": "NEW", "b": "REJECTED", "c": "REJECTED"}
+
+
+@pytest.mark.parametrize("payload", [
+    {"status": "REJECTED"},
+    {"status": "REJECTED", "filters": {}},
+    {"status": "REJECTED", "filters": {"dedupe": False}},
+    {"status": "UNKNOWN", "ids": ["a"]},
+])
+def test_rejects_requests_without_target(client, tenders, payload):
+    assert client.put("/api/tenders/status", json=payload).status_code == 400
+    assert set(statuses(tenders).values()) == {"NEW"}
@@ -0,0 +1,56 @@
+import csv
+import io
+import json
+
+import pytest
+
+import api
+from database import Tender, TenderStatus
+
+
+@pytest.fixture
+def tenders(db, monkeypatch):
+    # Kleine Bloecke, damit der Stream mehrere Teile liefert
+    monkeypatch.setattr(api, "EXPORT_BATCH_SIZE", 2)
+    for i, category in enumerate(["Hochbau", "Tiefbau", "Tiefbau", "Hochbau", "Tiefbau"]):
+        db.add(Tender(
+            id=f"t{i}", title=f"Straße; \"Los {i}\"", authority="Gemeinde Völs", location="Völs, Oesterreich",
+            deadline="2026-12-01", budget="90.000 EUR", description="Zeile 1\nZeile 2", category=category,
+            status=TenderStatus.NEW, source_url="https://example.com", source_portal="ausschreibung.at",
+        ))
+    db.commit()
+    return db
+
+
+def test_export_ndjson(client, tenders):
+    response = client.get("/api/tenders/export", params={"category": "Tiefbau"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert response.headers["content-disposition"].endswith('.ndjson"')
+
+    lines = response.content.decode("utf-8").splitlines()
+    rows = [json.loads(line) for line in lines]
+    assert sorted(row["id"] for row in rows) == ["t1", "t2", "t4"]
+    assert rows[0]["title"].startswith("Straße")
+    assert rows[0]["budgetMax"] == 90000
+
+
+def test_export_csv(client, tenders):
+    with client.stream("GET", "/api/tenders/export", params={"format": "csv"}) as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "text/csv; charset=utf-8"
+        content = b"".join(response.iter_bytes())
+
+    # BOM fuer Excel, Semikolon als Trennzeichen
+    assert content.startswith(b"\xef\xbb\xbf")
+    rows = list(csv.reader(io.StringIO(content.decode("utf-8-sig")), delimiter=";"))
+    assert rows[0] == api.EXPORT_CSV_COLUMNS
+    assert len(rows) == 6
+    record = dict(zip(rows[0], rows[1]))
+    assert record["title"].startswith('Straße; "Los')
+    assert record["description"] == "Zeile 1\nZeile 2"
+    assert record["authority"] == "Gemeinde Völs"
+
+
+def test_export_rejects_unknown_format(client, tenders):
+    assert client.get("/api/tenders/export", params={"format": "xlsx"}).status_code == 422
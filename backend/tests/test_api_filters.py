@@ -0,0 +1,41 @@
+import pytest
+
+from api import TenderFilter, apply_tender_filters, apply_tender_sort
+from database import Tender, TenderStatus, explain_query_plan
+
+
+@pytest.fixture
+def tenders(db):
+    for tender_id, budget in [("a", "10.000 EUR"), ("b", "50.000 - 80.000 EUR"), ("c", "250.000 EUR"), ("d", None)]:
+        db.add(Tender(
+            id=tender_id, title=f"Tender {tender_id}", authority="Stadt", location="Innsbruck, Oesterreich",
+            deadline="2026-12-01", budget=budget, description="", category="Hochbau", status=TenderStatus.NEW,
+            source_url="https://example.com", source_portal="ausschreibung.at",
+        ))
+    db.commit()
+    return db
+
+
+@pytest.mark.parametrize("filters, expected", [
+    (TenderFilter(minBudget=60000), {"b", "c"}),
+    (TenderFilter(maxBudget=60000), {"a", "b"}),
+    (TenderFilter(minBudget=60000, maxBudget=100000), {"b"}),
+    (TenderFilter(minBudget=0), {"a", "b", "c"}),
+])
+def test_budget_filter(tenders, filters, expected):
+    assert {tender.id for tender in apply_tender_filters(tenders.query(Tender), filters)} == expected
+
+
+@pytest.mark.parametrize("filters", [TenderFilter(minBudget=50000), TenderFilter(maxBudget=50000)])
+def test_budget_filter_searches_index(db, filters):
+    plan = explain_query_plan(apply_tender_sort(apply_tender_filters(db.query(Tender), filters)))
+    assert any(line.startswith("SEARCH tenders USING INDEX ix_tenders_budget_") for line in plan), plan
+
+
+def test_has_only_status():
+    assert TenderFilter().has_only_status()
+    assert TenderFilter(status="NEW").has_only_status()
+    assert not TenderFilter(minBudget=0).has_only_status()
+    assert not TenderFilter(maxBudget=0).has_only_status()
+    assert not TenderFilter(dedupe=True).has_only_status()
+    assert not TenderFilter(category=["Tiefbau"]).has_only_status()
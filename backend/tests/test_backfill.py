@@ -0,0 +1,35 @@
+from backfill import extract_row, process_batch
+from crawlers import category_cache
+from database import CategoryCacheEntry
+
+
+def row(tender_id, budget, **columns):
+    values = {
+        "id": tender_id, "title": "Rahmenvertrag Gebäudereinigung", "authority": "Stadt Salzburg",
+        "description": "Unterhaltsreinigung der Amtsgebäude", "location": "Salzburg, Österreich",
+        "budget": budget, "category": None, "category_corrected": False, "snapshot_hash": None,
+        "title_norm": None, "authority_norm": None, "description_norm": None,
+        "location_city": None, "location_country": None,
+        "budget_min": None, "budget_max": None, "budget_currency": None,
+    }
+    values.update(columns)
+    return values
+
+
+def test_extract_row_repairs_budget_text_of_older_crawls():
+    result = extract_row(row("a", "Volumen: 3 Jahre, ca. 1,2 Mio. EUR"))
+    assert (result["budget_min"], result["budget_max"], result["budget_currency"]) == (1.2e6, 1.2e6, "EUR")
+
+
+def test_workers_return_cache_entries_instead_of_writing(db):
+    changes, cache_entries = process_batch([row("a", "450.000 EUR"), row("b", None)])
+
+    assert {change["id"] for change in changes} == {"a", "b"}
+    assert all(change["category"] for change in changes)
+    # Gleicher Text - ein Eintrag; geschrieben wird erst im Hauptprozess
+    assert len(cache_entries) == 1
+    assert db.query(CategoryCacheEntry).count() == 0
+
+    category_cache.store_entries(cache_entries)
+    version, text_hash, category, _ = cache_entries[0]
+    assert category_cache.lookup(version, [text_hash]) == {text_hash: category}
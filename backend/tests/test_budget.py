@@ -0,0 +1,35 @@
+import pytest
+
+from budget import Budget, find_budget, parse_amount, parse_budget
+
+
+@pytest.mark.parametrize("page_text, found, budget", [
+    ("Leistungsbeschreibung ... Volumen: 3 Jahre, ca. 1,2 Mio. EUR zzgl. USt.",
+     "1,2 Mio. EUR", Budget(1.2e6, 1.2e6, "EUR")),
+    ("Auftragswert (Los 1): 450.000 EUR netto", "450.000 EUR", Budget(450000, 450000, "EUR")),
+    ("Budget: siehe Unterlagen. Frist 12.05.2025 Vergabe ca. 300.000 EUR",
+     "300.000 EUR", Budget(300000, 300000, "EUR")),
+    ("Geschätzter Auftragswert: EUR 100.000 bis EUR 250.000", "EUR 100.000 bis EUR 250.000",
+     Budget(100000, 250000, "EUR")),
+    ("Schätzwert 2024: 100.000 - 250.000 CHF", "100.000 - 250.000 CHF", Budget(100000, 250000, "CHF")),
+    ("Budget: 1 - 2 Mio. €", "1 - 2 Mio. €", Budget(1e6, 2e6, "EUR")),
+])
+def test_labelled_detail_page_text(page_text, found, budget):
+    assert find_budget(page_text) == found
+    assert parse_budget(find_budget(page_text)) == budget
+
+
+def test_find_budget_needs_label_and_currency():
+    assert find_budget("Volumen: 3 Jahre") == ""
+    assert find_budget("Gesamt 450.000 EUR") == ""
+
+
+def test_parse_budget_prefers_amounts_with_currency():
+    assert parse_budget("Baujahr 2024, Auftrag 80.000 EUR") == Budget(80000, 80000, "EUR")
+    assert parse_budget("Frist 12.05.2025") is None
+
+
+def test_bare_numbers_without_currency():
+    assert parse_budget("bis 500.000") == Budget(500000, 500000, None)
+    assert parse_amount("50000") == 50000
+    assert parse_amount("1,2 Mio.") == 1.2e6
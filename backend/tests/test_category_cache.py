@@ -0,0 +1,23 @@
+from crawlers import category_cache
+from crawlers.text_classifier import get_classifier, train_classifier
+
+HASH = category_cache.text_hash("neubau kindergarten")
+
+
+def test_processes_on_different_versions_keep_their_entries(db):
+    category_cache.store("alt", [(HASH, "Hochbau", None)])
+    category_cache.store("neu", [(HASH, "Tiefbau", None)])
+
+    assert category_cache.lookup("neu", [HASH]) == {HASH: "Tiefbau"}
+    assert category_cache.lookup("alt", [HASH]) == {HASH: "Hochbau"}
+    assert category_cache.lookup("neu", [HASH]) == {HASH: "Tiefbau"}
+
+
+def test_training_keeps_only_saved_version(db):
+    category_cache.store("alt", [(HASH, "Hochbau", None)])
+    train_classifier([("neubau kindergarten", "")], ["Hochbau"])
+    version = get_classifier().version
+    category_cache.store(version, [(HASH, "Hochbau", None)])
+
+    assert category_cache.lookup("alt", [HASH]) == {}
+    assert category_cache.lookup(version, [HASH]) == {HASH: "Hochbau"}
@@ -0,0 +1,52 @@
+from crawlers.dedup import index_unclustered
+from database import Tender, TenderLshBucket, TenderStatus, explain_query_plan
+
+TEXT = "Sanierung der Brücke über die Sill im Stadtgebiet Innsbruck inklusive Geländer und Abdichtung"
+
+
+def add_tender(db, tender_id, description):
+    tender = Tender(
+        id=tender_id, title="Brückensanierung Sill", authority="Stadt Innsbruck", location="Innsbruck",
+        deadline="2026-12-01", description=description, category="Tiefbau", status=TenderStatus.NEW,
+        source_url="https://example.com", source_portal="ausschreibung.at",
+    )
+    db.add(tender)
+    db.flush()
+    return tender
+
+
+def buckets_of(db, tender_id):
+    return {row.bucket for row in db.query(TenderLshBucket).filter(TenderLshBucket.tender_id == tender_id)}
+
+
+def test_duplicates_share_cluster(db):
+    add_tender(db, "a", TEXT)
+    add_tender(db, "b", TEXT + " Los 1")
+    assert index_unclustered(db) == 1
+    assert {tender.cluster_id for tender in db.query(Tender)} == {"a"}
+
+
+def test_changed_text_is_reclustered(db):
+    first = add_tender(db, "a", TEXT)
+    add_tender(db, "b", TEXT)
+    add_tender(db, "c", TEXT)
+    index_unclustered(db)
+    old_buckets = buckets_of(db, "a")
+
+    # Der Repraesentant wird zu einer anderen Ausschreibung
+    first.title = "Neubau Kindergarten"
+    first.authority = "Gemeinde Völs"
+    first.description = "Errichtung eines zweigruppigen Kindergartens in Holzbauweise"
+    first.minhash = None
+    db.flush()
+    assert index_unclustered(db) == 0
+
+    clusters = {tender.id: tender.cluster_id for tender in db.query(Tender)}
+    assert clusters == {"a": "a", "b": "b", "c": "b"}
+    assert buckets_of(db, "a") and not buckets_of(db, "a") & old_buckets
+    assert db.query(TenderLshBucket).count() == 3 * 16
+
+
+def test_bucket_lookup_by_tender_uses_index(db):
+    plan = explain_query_plan(db.query(TenderLshBucket).filter(TenderLshBucket.tender_id == "a"))
+    assert any("ix_tender_lsh_buckets_tender_id" in line for line in plan), plan
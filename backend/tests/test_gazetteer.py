@@ -0,0 +1,41 @@
+import pytest
+
+from crawlers.extract import extract_page_fields
+from crawlers.gazetteer import Gazetteer, Place, find_place
+
+
+@pytest.mark.parametrize("text, place", [
+    ("Neubau Volksschule in Graz", Place("Graz", "Oesterreich")),
+    ("Sanierung Rathaus München", Place("München", "Deutschland")),
+    ("Lieferort: 70173 Stuttgart, Abgabe in Wien", Place("Stuttgart", "Deutschland")),
+    ("Turnhalle Erneuerung", None),
+])
+def test_find_place(text, place):
+    assert find_place(text) == place
+
+
+def test_year_of_a_date_is_no_postcode():
+    # "2025" darf nicht als PLZ vor "Wien" gelten und Wien bevorzugen
+    assert find_place("Abgabe in Linz, Frist 12.03.2025 Wien") == Place("Linz", "Oesterreich")
+    assert find_place("Frist 12.03.2025 Ansfelden") is None
+    assert find_place("Erfüllungsort 4052 Ansfelden") == Place("Ansfelden", None)
+    assert find_place("Erfüllungsort 79639 Grenzach") == Place("Grenzach", "Deutschland")
+
+
+def test_page_fields_have_no_postcode():
+    fields = extract_page_fields("Ort der Leistung: 5020 Salzburg. Auftragswert: 90.000 EUR")
+    assert fields == {"location": "Salzburg", "country": "Oesterreich", "budget": "90.000 EUR"}
+
+
+def test_geonames_export(tmp_path):
+    path = tmp_path / "geonames.txt"
+    path.write_text(
+        "AT\t4052\tAnsfelden\tOberösterreich\t04\tLinz-Land\t410\t\t\t48.2\t14.28\t4\n"
+        "CH\t8400\tWinterthur\tKanton Zürich\tZH\tBezirk Winterthur\t110\t\t\t47.5\t8.72\t1\n"
+        "CH\t8404\tWinterthur\tKanton Zürich\tZH\tBezirk Winterthur\t110\t\t\t47.5\t8.76\t1\n",
+        encoding="utf-8",
+    )
+    gazetteer = Gazetteer(str(path))
+    assert len(gazetteer.places) == 2
+    assert gazetteer.find("Gemeinde Ansfelden, Frist 01.02.2026") == Place("Ansfelden", "Oesterreich")
+    assert gazetteer.find("Schulhaus in Winterthur") == Place("Winterthur", "Schweiz")
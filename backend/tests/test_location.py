@@ -0,0 +1,27 @@
+import pytest
+
+from database import split_location
+
+
+@pytest.mark.parametrize("location, expected", [
+    ("Innsbruck, Oesterreich", ("Innsbruck", "Oesterreich")),
+    ("Oesterreich", (None, "Oesterreich")),
+    ("Innsbruck", ("Innsbruck", None)),
+    ("", (None, None)),
+    (None, (None, None)),
+    # Bundesland + Land: keine Stadt
+    ("Baden-Wuerttemberg, Deutschland", (None, "Deutschland")),
+    ("Tirol, Österreich", (None, "Österreich")),
+    ("Baden-Württemberg", (None, "Deutschland")),
+    # Stadt + Bundesland/Kanton: Land aus der Region
+    ("Stuttgart, Baden-Wuerttemberg", ("Stuttgart", "Deutschland")),
+    ("Kufstein, Tirol", ("Kufstein", "Oesterreich")),
+    ("Chur, Graubuenden", ("Chur", "Schweiz")),
+    ("Stuttgart, Baden-Wuerttemberg, Deutschland", ("Stuttgart", "Deutschland")),
+    # Gleichnamige Stadt bleibt Stadt
+    ("Wien", ("Wien", "Oesterreich")),
+    ("Hamburg, Deutschland", ("Hamburg", "Deutschland")),
+    ("Freiburg", ("Freiburg", None)),
+])
+def test_split_location(location, expected):
+    assert split_location(location) == expected
@@ -0,0 +1,60 @@
+import os
+import sqlite3
+
+import pytest
+
+import metrics
+
+GAUGE = "tenderscout_browsers_open"
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """Leerer gemeinsamer Speicher und leere REGISTRY"""
+    path = str(tmp_path / "metrics.db")
+    monkeypatch.setattr(metrics, "METRICS_STORE_PATH", path)
+    monkeypatch.setattr(metrics, "REGISTRY", metrics.MetricsRegistry())
+    return path
+
+
+def rendered(name):
+    return [line for line in metrics.render_latest().splitlines() if line.startswith(name)]
+
+
+def test_gauge_flush_overwrites_instead_of_adding(store):
+    metrics.inc(GAUGE)
+    metrics.flush_to_store()
+    metrics.inc(GAUGE)
+    metrics.flush_to_store()
+    metrics.flush_to_store()
+
+    conn = sqlite3.connect(store)
+    try:
+        rows = conn.execute("SELECT pid, value FROM gauges WHERE name = ?", (GAUGE,)).fetchall()
+    finally:
+        conn.close()
+    assert rows == [(os.getpid(), 2)]
+    assert rendered(GAUGE) == [f"{GAUGE} 2"]
+
+
+def test_gauges_of_other_processes_are_summed(store):
+    metrics.flush_to_store()  # Tabellen anlegen
+    metrics.inc(GAUGE)
+    metrics.inc("tenderscout_crawl_errors_total", portal="vergabe.at")
+    metrics.flush_to_store()
+    conn = sqlite3.connect(store)
+    try:
+        with conn:
+            conn.execute("INSERT INTO gauges VALUES (?, '[]', ?, 3)", (GAUGE, os.getpid() + 1))
+    finally:
+        conn.close()
+
+    assert rendered(GAUGE) == [f"{GAUGE} 4"]
+    # Counter werden weiterhin addiert und lokal zurueckgesetzt
+    metrics.inc("tenderscout_crawl_errors_total", portal="vergabe.at")
+    metrics.flush_to_store()
+    assert rendered("tenderscout_crawl_errors_total{") == ['tenderscout_crawl_errors_total{portal="vergabe.at"} 2']
+
+    metrics._remove_own_gauges()
+    metrics.REGISTRY.inc(GAUGE, -1)
+    assert rendered(GAUGE) == [f"{GAUGE} 3"]
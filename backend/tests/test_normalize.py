@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from crawlers import category_cache
+from crawlers.categorizer import categorize_many
+from crawlers.dedup import index_unclustered, tender_signature
+from database import CategoryCacheEntry, Tender, TenderStatus
+from normalize import fold_text, normalize_text
+
+# Gleicher Text in zwei Schreibweisen: Umlaute/ß, Gedankenstrich, weiches Trennzeichen, Whitespace
+VARIANTS = [
+    ("Straßensanierung – Ortsdurchfahrt Völs", "Gemeinde Völs",
+     "Erneuerung der Fahrbahn\u00addecke und Gehsteige  im Ortszentrum"),
+    ("STRASSENSANIERUNG - Ortsdurchfahrt Voels", "Gemeinde Voels",
+     "Erneuerung der Fahrbahndecke und Gehsteige im Ortszentrum"),
+]
+
+
+@pytest.mark.parametrize("text, normalized", [
+    ("Straßen\u00adsanierung – BAUAMT  Köln", "strassensanierung - bauamt koeln"),
+    ("  Ärztehaus\nÜberdachung ", "aerztehaus ueberdachung"),
+    ("", ""),
+    (None, ""),
+])
+def test_normalize_text(text, normalized):
+    assert normalize_text(text) == normalized
+
+
+def test_fold_text_keeps_case():
+    assert fold_text("Essen – Ärztehaus") == "Essen - Aerztehaus"
+
+
+def add_tenders(db):
+    for i, (title, authority, description) in enumerate(VARIANTS):
+        db.add(Tender(
+            id=f"v{i}", title=title, authority=authority, description=description, location="Völs",
+            deadline="2026-12-01", category="Tiefbau", status=TenderStatus.NEW,
+            source_url="https://example.com", source_portal="ausschreibung.at",
+        ))
+    db.commit()
+    db.expire_all()
+    return db.query(Tender).order_by(Tender.id).all()
+
+
+def test_stored_norms_match_normalize_text(db):
+    for tender, (title, authority, description) in zip(add_tenders(db), VARIANTS):
+        assert tender.title_norm == normalize_text(title)
+        assert tender.authority_norm == normalize_text(authority)
+        assert tender.description_norm == normalize_text(description)
+    first, second = db.query(Tender).order_by(Tender.id)
+    assert (first.title_norm, first.authority_norm, first.description_norm) == \
+        (second.title_norm, second.authority_norm, second.description_norm)
+
+
+def test_categorizer_uses_stored_norms(db):
+    tenders = add_tenders(db)
+    raw = categorize_many([(title, description) for title, _, description in VARIANTS])
+    # Derselbe Cache-Eintrag fuer Rohtext und gespeicherte Vergleichsform
+    assert db.query(CategoryCacheEntry).count() == 1
+    stored = categorize_many([(t.title_norm, t.description_norm) for t in tenders], normalized=True)
+    assert stored == raw
+    assert db.query(CategoryCacheEntry).one().text_hash == category_cache.text_hash(
+        tenders[0].title_norm, tenders[0].description_norm
+    )
+
+
+def test_dedup_uses_stored_norms(db):
+    first, second = add_tenders(db)
+    assert np.array_equal(tender_signature(first), tender_signature(second))
+    assert index_unclustered(db) == 1
+    assert first.cluster_id == second.cluster_id == "v0"
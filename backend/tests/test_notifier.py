@@ -0,0 +1,153 @@
+import threading
+
+import pytest
+
+import notifier
+import outbox
+from channels import NotificationChannel
+from database import NotificationOutboxEntry
+from notifier import NotificationDispatcher
+
+
+class RecordingChannel(NotificationChannel):
+    """Kanal, der verschickte Gruppen nur mitschreibt"""
+
+    name = "recording"
+
+    def __init__(self, batch_size=1, flush_seconds=0.0):
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.batches = []
+        self.closed = 0
+        self.sent = threading.Event()
+
+    def is_configured(self):
+        return True
+
+    def enqueue(self, db, tenders, kind=outbox.KIND_NEW_TENDERS):
+        for tender in tenders:
+            outbox.enqueue(db, self.name, outbox.idempotency_key(kind, [tender["id"]]), tender)
+
+    def send(self, items):
+        self.batches.append([item.payload["id"] for item in items])
+        self.sent.set()
+
+    def close(self):
+        self.closed += 1
+
+
+def enqueue(db, channel, *ids):
+    channel.enqueue(db, [{"id": tender_id} for tender_id in ids])
+    db.commit()
+
+
+def statuses(db):
+    db.expire_all()
+    return {entry.status for entry in db.query(NotificationOutboxEntry)}
+
+
+def test_sends_pending_entries_and_shuts_down(db):
+    channel = RecordingChannel(batch_size=2)
+    enqueue(db, channel, "a", "b", "c")
+
+    dispatcher = NotificationDispatcher([channel], poll_seconds=60)
+    assert channel.sent.wait(5)
+    # Wecken verschickt neue Eintraege ohne auf poll_seconds zu warten
+    channel.sent.clear()
+    enqueue(db, channel, "d")
+    dispatcher.wake()
+    assert channel.sent.wait(5)
+
+    assert dispatcher.shutdown(timeout=5)
+    assert not dispatcher._thread.is_alive()
+    assert sorted(id_ for batch in channel.batches for id_ in batch) == ["a", "b", "c", "d"]
+    assert max(len(batch) for batch in channel.batches) == 2
+    assert statuses(db) == {outbox.STATUS_SENT}
+    assert channel.closed >= 1
+
+
+def test_shutdown_flushes_incomplete_batch(db):
+    # Eine unvollstaendige Gruppe wartet flush_seconds - beim Beenden wird sie sofort verschickt
+    channel = RecordingChannel(batch_size=10, flush_seconds=3600)
+    enqueue(db, channel, "a", "b")
+
+    dispatcher = NotificationDispatcher([channel], poll_seconds=60)
+    assert not channel.sent.wait(0.3)
+    assert dispatcher.shutdown(timeout=5)
+    assert channel.batches == [["a", "b"]]
+    assert statuses(db) == {outbox.STATUS_SENT}
+
+
+def test_failed_send_is_retried_later(db):
+    class FailingChannel(RecordingChannel):
+        def send(self, items):
+            raise ConnectionError("Server nicht erreichbar")
+
+    channel = FailingChannel()
+    enqueue(db, channel, "a")
+    dispatcher = NotificationDispatcher([channel], poll_seconds=60)
+    assert dispatcher.shutdown(timeout=5)
+
+    db.expire_all()
+    entry = db.query(NotificationOutboxEntry).one()
+    assert (entry.status, entry.attempts) == (outbox.STATUS_PENDING, 1)
+    assert "Server nicht erreichbar" in entry.last_error
+
+
+HOSTILE = {
+    "title": '<script>alert("x")</script> Neubau & Umbau',
+    "authority": 'Gemeinde "Völs" <b>',
+    "location": "Völs",
+    "deadline": "2026-12-01",
+    "source_portal": "ausschreibung.at",
+    "source_url": "javascript:alert(1)",
+}
+
+
+def html_and_text(tenders, kind=outbox.KIND_NEW_TENDERS):
+    msg = notifier.EmailNotifier().build_message(tenders, kind=kind)
+    text_part, html_part = msg.get_payload()
+    return html_part.get_payload(decode=True).decode("utf-8"), text_part.get_payload(decode=True).decode("utf-8")
+
+
+def test_html_escapes_portal_texts():
+    body, text = html_and_text([HOSTILE])
+    assert "<script>" not in body and "<b>" not in body
+    assert "&lt;script&gt;alert(&quot;x&quot;)&lt;/script&gt; Neubau &amp; Umbau" in body
+    assert "Gemeinde &quot;Völs&quot; &lt;b&gt;" in body
+    # Die Textversion bleibt unverändert, fehlende Felder als N/A
+    assert '<script>alert("x")</script> Neubau & Umbau' in text
+    assert "Budget: N/A" in text
+
+
+@pytest.mark.parametrize("source_url, href", [
+    ("javascript:alert(1)", "#"),
+    ("data:text/html,<b>x</b>", "#"),
+    ("", "#"),
+    ("HTTPS://example.com/t?id=1&lot=2", "HTTPS://example.com/t?id=1&amp;lot=2"),
+    ('http://example.com/"onmouseover="x', "http://example.com/&quot;onmouseover=&quot;x"),
+])
+def test_href_only_for_http_links(source_url, href):
+    body, _ = html_and_text([dict(HOSTILE, source_url=source_url)])
+    assert f'<a href="{href}"' in body
+    assert "javascript:" not in body
+
+
+def test_digest_is_capped_with_dashboard_link(monkeypatch):
+    monkeypatch.setattr(notifier, "DIGEST_MAX_TENDERS", 2)
+    monkeypatch.setattr(notifier, "DASHBOARD_URL", "https://tenders.example.com/?a=1&b=2")
+    tenders = [dict(HOSTILE, title=f"Los {i}") for i in range(5)]
+    body, text = html_and_text(tenders)
+    assert "Los 1" in body and "Los 2" not in body
+    assert '<a href="https://tenders.example.com/?a=1&amp;b=2"' in body
+    assert "und 3 weitere Ausschreibungen" in body
+    assert "... und 3 weitere Ausschreibungen im Dashboard: https://tenders.example.com/?a=1&b=2" in text
+
+
+def test_reminder_wording_shows_days_left():
+    tenders = [dict(HOSTILE, days_left=days_left) for days_left in (0, 1, 4)]
+    body, text = html_and_text(tenders, kind=outbox.KIND_DEADLINE_REMINDER)
+    assert "Abgabefristen" in body
+    for remaining in ("(heute)", "(morgen)", "(noch 4 Tage)"):
+        assert f"2026-12-01 {remaining}" in body
+        assert f"Frist: 2026-12-01 {remaining}" in text
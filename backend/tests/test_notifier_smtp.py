@@ -0,0 +1,129 @@
+"""
+E-Mail-Kanal gegen einen lokalen Stand-in-SMTP-Server (aiosmtpd mit STARTTLS und AUTH)
+"""
+import shutil
+import socket
+import ssl
+import subprocess
+from email import message_from_string
+
+import pytest
+
+aiosmtpd_controller = pytest.importorskip("aiosmtpd.controller")
+from aiosmtpd.smtp import AuthResult
+
+import outbox
+from notifier import EmailChannel, EmailNotifier
+
+
+class Mailbox:
+    """Merkt sich jede Nachricht mit der Absenderadresse der Verbindung"""
+
+    def __init__(self):
+        self.messages = []
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append((session.peer, envelope.rcpt_tos, envelope.content.decode("utf-8", "replace")))
+        return "250 OK"
+
+
+def authenticate(server, session, envelope, mechanism, auth_data):
+    return AuthResult(success=auth_data.login == b"scout" and auth_data.password == b"secret")
+
+
+@pytest.fixture(scope="module")
+def tls_context(tmp_path_factory):
+    if shutil.which("openssl") is None:
+        pytest.skip("openssl fuer das Testzertifikat nicht gefunden")
+    directory = tmp_path_factory.mktemp("smtp-tls")
+    cert, key = directory / "cert.pem", directory / "key.pem"
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+         "-subj", "/CN=localhost", "-keyout", str(key), "-out", str(cert)],
+        check=True, capture_output=True,
+    )
+    context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    context.load_cert_chain(cert, key)
+    return context
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class StandInServer:
+    """SMTP-Server, der neu gestartet werden kann (schliesst dabei alle Verbindungen)"""
+
+    def __init__(self, tls_context):
+        self.mailbox = Mailbox()
+        self.port = free_port()
+        self.tls_context = tls_context
+        self.controller = None
+
+    def start(self):
+        self.controller = aiosmtpd_controller.Controller(
+            self.mailbox, hostname="127.0.0.1", port=self.port,
+            tls_context=self.tls_context, require_starttls=True,
+            authenticator=authenticate, auth_require_tls=True,
+        )
+        self.controller.start()
+
+    def stop(self):
+        self.controller.stop()
+
+
+@pytest.fixture
+def smtp_server(tls_context):
+    server = StandInServer(tls_context)
+    server.start()
+    try:
+        yield server
+    finally:
+        server.stop()
+
+
+@pytest.fixture
+def channel(smtp_server):
+    notifier = EmailNotifier()
+    notifier.smtp_server = "127.0.0.1"
+    notifier.smtp_port = smtp_server.port
+    notifier.smtp_user = "scout"
+    notifier.smtp_password = "secret"
+    notifier.sender_email = "scout@example.com"
+    notifier.recipient_email = "buero@example.com"
+    channel = EmailChannel(notifier)
+    try:
+        yield channel
+    finally:
+        channel.close()
+
+
+def item(item_id, tender_id, recipient=None):
+    tenders = [{"id": tender_id, "title": f"Tender {tender_id}", "authority": "Stadt Graz",
+                "location": "Graz", "deadline": "2026-12-01", "source_url": "https://example.com"}]
+    key = outbox.idempotency_key(outbox.KIND_NEW_TENDERS, [tender_id], recipient or "")
+    return outbox.OutboxItem(item_id, key, "email", recipient, tenders, 0)
+
+
+def test_mails_share_one_connection(smtp_server, channel):
+    channel.send([item(1, "a"), item(2, "b", "abo@example.com"), item(3, "c")])
+
+    messages = smtp_server.mailbox.messages
+    assert [rcpt for _, rcpt, _ in messages] == [["buero@example.com"], ["abo@example.com"], ["buero@example.com"]]
+    assert len({peer for peer, _, _ in messages}) == 1
+    message_id = message_from_string(messages[0][2])["Message-ID"].strip()
+    assert message_id == f"<{item(1, 'a').idempotency_key}@tenderscout>"
+
+
+def test_reconnects_after_server_closed_connection(smtp_server, channel):
+    channel.send([item(1, "a")])
+    smtp_server.stop()
+    smtp_server.start()
+    channel.send([item(2, "b"), item(3, "c")])
+
+    peers = [peer for peer, _, _ in smtp_server.mailbox.messages]
+    assert len(peers) == 3
+    # Nach dem Abbruch eine neue Verbindung, die dann wiederverwendet wird
+    assert peers[0] != peers[1] == peers[2]
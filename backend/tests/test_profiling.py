@@ -0,0 +1,41 @@
+import re
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from database import SessionLocal
+from profiling import ProfilingMiddleware
+
+
+def profiled_app(slow_request_ms):
+    app = FastAPI()
+    app.add_middleware(ProfilingMiddleware, slow_request_ms=slow_request_ms)
+
+    @app.get("/queries/{count}")
+    def run_queries(count: int):
+        db = SessionLocal()
+        try:
+            for i in range(count):
+                db.execute(text("SELECT :i"), {"i": i})
+        finally:
+            db.close()
+        return {"count": count}
+
+    return TestClient(app)
+
+
+def test_server_timing_counts_queries(db):
+    client = profiled_app(slow_request_ms=60_000)
+    for count in (0, 3):
+        timing = client.get(f"/queries/{count}").headers["Server-Timing"]
+        assert re.fullmatch(rf'app;dur=[\d.]+, db;dur=[\d.]+;desc="{count} queries"', timing), timing
+
+
+def test_slow_requests_are_logged(db, capsys):
+    client = profiled_app(slow_request_ms=0)
+    client.get("/queries/2")
+    output = capsys.readouterr().out
+    assert "Langsamer Request GET /queries/2" in output
+    assert "2 SQL-Statements" in output
+    assert output.count("SELECT ?") == 2
@@ -0,0 +1,12 @@
+import check_query_plans
+
+
+def test_filtered_queries_search_an_index(db):
+    assert check_query_plans.main() == 0
+
+
+def test_index_scan_does_not_count_as_search():
+    full_walk = ["SCAN tenders USING INDEX ix_tenders_crawled_at"]
+    assert not check_query_plans.uses_index(full_walk)
+    assert check_query_plans.uses_index(full_walk, filtered=False)
+    assert check_query_plans.uses_index(["SEARCH tenders USING INDEX ix_tenders_budget_max (budget_max>?)"])
@@ -0,0 +1,39 @@
+from budget import find_budget
+from crawlers.relevance import RelevanceFilter
+
+
+def tender(title, description, budget=""):
+    return {"id": "t1", "title": title, "authority": "Stadt Linz", "description": description,
+            "budget": budget, "source_portal": "ausschreibung.at", "source_url": "https://example.com"}
+
+
+def test_min_budget_uses_labelled_amount():
+    relevance = RelevanceFilter(min_budget="50000")
+    page_text = "Rahmenvertrag Gebäudereinigung. Volumen: 3 Jahre, ca. 1,2 Mio. EUR"
+    assert relevance.check_detail(tender("Gebäudereinigung", page_text, find_budget(page_text)))
+
+    small = tender("Gebäudereinigung", "Auftragswert: 20.000 EUR", "20.000 EUR")
+    assert not relevance.check_detail(small)
+    assert relevance.dropped[-1]["reason"] == "min_budget"
+
+
+def test_min_budget_ignores_amounts_without_currency():
+    relevance = RelevanceFilter(min_budget="50000")
+    assert relevance.check_detail(tender("Gebäudereinigung", "Laufzeit 3 Jahre", "3 Jahre"))
+
+
+def test_detail_needs_a_global_keyword():
+    relevance = RelevanceFilter("Reinigung, Winterdienst")
+    # Kategorie-Keyword allein reicht fuer den Detail-Abruf ...
+    assert relevance.check_listing({"id": "t1", "title": "Neubau Kindergarten"})
+    # ... aber nicht zum Behalten
+    assert not relevance.check_detail(tender("Neubau Kindergarten", "Errichtung in Holzbauweise"))
+    assert relevance.dropped[-1]["reason"] == "no_keyword"
+    assert relevance.check_detail(tender("Neubau Kindergarten", "inkl. Reinigung der Baustelle"))
+
+
+def test_without_global_keywords_nothing_is_scored():
+    relevance = RelevanceFilter(exclude_keywords="Catering")
+    assert relevance.check_detail(tender("Lieferung Büromaterial", ""))
+    assert not relevance.check_detail(tender("Catering Kantine", ""))
+    assert relevance.dropped[-1]["reason"] == "exclude:catering"
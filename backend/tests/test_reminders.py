@@ -0,0 +1,66 @@
+from datetime import date, timedelta
+
+import pytest
+
+import notifier
+import reminders
+from database import DeadlineReminder, NotificationOutboxEntry, Tender, TenderStatus
+from webhook import WebhookChannel
+
+TODAY = date(2026, 10, 19)
+
+
+@pytest.fixture
+def channels(monkeypatch):
+    """Ein eingerichteter Webhook; verschickt wird im Test nicht"""
+    configured = [WebhookChannel("http://127.0.0.1:9/hook")]
+    monkeypatch.setattr(reminders, "configured_channels", lambda: configured)
+    monkeypatch.setattr(notifier, "configured_channels", lambda: configured)
+    monkeypatch.setattr(reminders, "dispatch_notification", lambda: None)
+    return configured
+
+
+@pytest.fixture
+def tenders(db):
+    for tender_id, days, status in [
+        ("today", 0, TenderStatus.INTERESTING),
+        ("in2", 2, TenderStatus.APPLIED),
+        ("in3", 3, TenderStatus.INTERESTING),
+        ("in5", 5, TenderStatus.INTERESTING),
+        ("in8", 8, TenderStatus.INTERESTING),
+        ("past", -1, TenderStatus.INTERESTING),
+        ("new", 2, TenderStatus.NEW),
+    ]:
+        db.add(Tender(
+            id=tender_id, title=f"Tender {tender_id}", authority="Stadt", location="Wels, Oesterreich",
+            deadline=(TODAY + timedelta(days=days)).isoformat(), description="", category="Hochbau",
+            status=status, source_url="https://example.com", source_portal="ausschreibung.at",
+        ))
+    db.commit()
+    return db
+
+
+def reminded(db):
+    return {(row.tender_id, row.days) for row in db.query(DeadlineReminder)}
+
+
+@pytest.mark.parametrize("days_left, window", [(0, 1), (1, 1), (2, 3), (3, 3), (5, 7), (7, 7), (8, None)])
+def test_smallest_covering_window(days_left, window):
+    assert reminders._window(days_left, [1, 3, 7]) == window
+
+
+def test_reminds_once_per_window(tenders, channels):
+    assert reminders.run_reminders(TODAY, [7, 3, 1]) == 4
+    assert reminded(tenders) == {("today", 1), ("in2", 3), ("in3", 3), ("in5", 7)}
+    assert tenders.query(NotificationOutboxEntry).count() == 4
+
+    assert reminders.run_reminders(TODAY, [7, 3, 1]) == 0
+    # Zwei Tage spaeter rutschen alle ins naechstkleinere Fenster, in8 kommt dazu
+    assert reminders.run_reminders(TODAY + timedelta(days=2), [7, 3, 1]) == 4
+    assert reminded(tenders) >= {("in2", 1), ("in3", 1), ("in5", 3), ("in8", 7)}
+
+
+def test_nothing_is_marked_without_channel(tenders, monkeypatch):
+    monkeypatch.setattr(reminders, "configured_channels", lambda: [])
+    assert reminders.run_reminders(TODAY, [7, 3, 1]) == 0
+    assert reminded(tenders) == set()
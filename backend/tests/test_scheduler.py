@@ -0,0 +1,106 @@
+import asyncio
+import sys
+import types
+from datetime import datetime, timedelta
+
+import pytest
+
+import metrics
+from config import DEFAULT_CRAWL_SCHEDULE
+from scheduler import (
+    REMINDER_CRON, AdaptiveSchedule, CronSchedule, IntervalSchedule, build_jobs, build_schedule, run_job,
+)
+
+
+def schedule_for(**entry):
+    return build_schedule("tender24.de", {**DEFAULT_CRAWL_SCHEDULE, **entry})
+
+
+def test_cron_and_interval():
+    assert isinstance(schedule_for(), CronSchedule)
+    assert isinstance(schedule_for(interval=3600), IntervalSchedule)
+    # Samstag -> naechster Werktag 05:30
+    assert CronSchedule("30 5 * * 1-5").next_after(datetime(2026, 10, 17, 12, 0)) == datetime(2026, 10, 19, 5, 30)
+
+
+def test_adaptive_with_both_bounds():
+    schedule = schedule_for(minInterval=1800, maxInterval=86400)
+    assert isinstance(schedule, AdaptiveSchedule)
+    assert (schedule.min_interval, schedule.max_interval, schedule.interval) == (1800, 86400, 1800)
+
+
+@pytest.mark.parametrize("entry, bounds", [
+    ({"minInterval": 1800}, (1800, 1800)),
+    ({"maxInterval": 7200}, (7200, 7200)),
+    ({"minInterval": 1800, "interval": 3600}, (1800, 3600)),
+    ({"maxInterval": 7200, "interval": 3600}, (3600, 7200)),
+    ({"maxInterval": 1800, "interval": 3600}, (1800, 1800)),
+])
+def test_adaptive_with_partial_bounds(entry, bounds):
+    schedule = schedule_for(**entry)
+    assert (schedule.min_interval, schedule.max_interval) == bounds
+    assert schedule.min_interval <= schedule.interval <= schedule.max_interval
+
+
+def test_adaptive_rejects_inverted_bounds():
+    with pytest.raises(ValueError, match="Intervallgrenzen"):
+        schedule_for(minInterval=7200, maxInterval=1800)
+
+
+@pytest.fixture
+def crawler(monkeypatch):
+    """Ersetzt die Crawler-Module (Playwright) durch einen Crawler, der bis zum Abbruch laeuft"""
+    started = []
+
+    async def run_portal_crawler(portal):
+        started.append(portal)
+        await asyncio.sleep(3600)
+
+    run_all = types.ModuleType("crawlers.run_all")
+    run_all.run_portal_crawler = run_portal_crawler
+    working_crawlers = types.ModuleType("crawlers.working_crawlers")
+    working_crawlers.portal_names = lambda settings: ["tender24.de", "meinauftrag.rib.de", "ausschreibung.at"]
+    monkeypatch.setitem(sys.modules, "crawlers.run_all", run_all)
+    monkeypatch.setitem(sys.modules, "crawlers.working_crawlers", working_crawlers)
+    return started
+
+
+def test_broken_entry_only_skips_its_portal(crawler, capsys):
+    jobs = build_jobs({"schedules": {
+        "tender24.de": {"interval": 3600, "maxRuntime": 1800},
+        "meinauftrag.rib.de": {"cron": "30 25 * * *"},
+    }})
+    assert [job.name for job in jobs] == ["tender24.de", "ausschreibung.at", "reminders"]
+    assert "[meinauftrag.rib.de] Zeitplan ungueltig" in capsys.readouterr().out
+    assert isinstance(jobs[0].schedule, IntervalSchedule)
+    assert jobs[0].max_runtime == 1800
+    assert jobs[1].max_runtime == DEFAULT_CRAWL_SCHEDULE["maxRuntime"]
+    assert str(jobs[2].schedule) == f"cron {REMINDER_CRON}"
+
+
+def test_max_runtime_cancels_crawl(crawler, monkeypatch, capsys):
+    job = build_jobs({"schedules": {"tender24.de": {"interval": 3600, "jitter": 0, "maxRuntime": 0.05}}})[0]
+    results = []
+
+    async def run_once():
+        # Einmal sofort faellig, danach erst nach dem Test; die Endlosschleife wird danach beendet
+        due = iter([0, 3600])
+        immediate = job._replace(schedule=types.SimpleNamespace(
+            next_after=lambda after: after + timedelta(seconds=next(due))
+        ))
+        finished = asyncio.Event()
+
+        def inc(name, **labels):
+            results.append((name, labels))
+            finished.set()
+
+        monkeypatch.setattr(metrics, "inc", inc)
+        monkeypatch.setattr(metrics, "flush_to_store", lambda: None)
+        task = asyncio.create_task(run_job(immediate))
+        await asyncio.wait_for(finished.wait(), timeout=5)
+        task.cancel()
+
+    asyncio.run(run_once())
+    assert crawler == ["tender24.de"]
+    assert results == [("tenderscout_scheduler_runs_total", {"job": "tender24.de", "result": "timeout"})]
+    assert "[tender24.de] nach 0.05s abgebrochen" in capsys.readouterr().out
@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta
+
+import pytest
+import zstandard
+
+from crawlers import snapshot_store
+from database import PageSnapshot, Tender, TenderStatus
+
+HTML = "<html><body><h1>Neubau Feuerwehrhaus</h1><p>Auftragswert: 1,2 Mio. €</p></body></html>" * 20
+TEXT = "Neubau Feuerwehrhaus Auftragswert: 1,2 Mio. €"
+
+
+@pytest.fixture
+def store(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(snapshot_store, "SNAPSHOT_DIR", str(tmp_path))
+    return db
+
+
+def test_round_trip(store):
+    snapshot_hash = snapshot_store.store_snapshot("https://example.com/t/1", HTML, TEXT)
+
+    with open(snapshot_store.snapshot_path(snapshot_hash), "rb") as f:
+        compressed = f.read()
+    assert compressed.startswith(b"\x28\xb5\x2f\xfd")  # zstd-Frame
+    assert len(compressed) < len(HTML)
+    assert zstandard.ZstdDecompressor().decompress(compressed)
+
+    assert snapshot_store.load_snapshot(snapshot_hash) == {"url": "https://example.com/t/1", "html": HTML, "text": TEXT}
+    row = store.query(PageSnapshot).one()
+    assert row.compressed_size == len(compressed)
+    assert row.size > row.compressed_size
+
+
+def test_same_content_is_stored_once(store):
+    first = snapshot_store.store_snapshot("https://example.com/t/1", HTML, TEXT)
+    assert snapshot_store.store_snapshot("https://example.com/t/1", HTML, TEXT) == first
+    assert snapshot_store.store_snapshot("https://example.com/t/1", HTML + " ", TEXT) != first
+    assert store.query(PageSnapshot).count() == 2
+
+
+def test_missing_snapshot(store):
+    assert snapshot_store.load_snapshot(None) is None
+    assert snapshot_store.load_snapshot("0" * 64) is None
+
+
+def test_prune_removes_expired_snapshots_and_references(store):
+    snapshot_hash = snapshot_store.store_snapshot("https://example.com/t/1", HTML, TEXT)
+    store.add(Tender(
+        id="t1", title="Neubau Feuerwehrhaus", authority="Gemeinde", location="Wels", deadline="2026-12-01",
+        description="", category="Hochbau", status=TenderStatus.NEW, snapshot_hash=snapshot_hash,
+        source_url="https://example.com/t/1", source_portal="ausschreibung.at",
+    ))
+    store.query(PageSnapshot).update({PageSnapshot.last_seen_at: datetime.utcnow() - timedelta(days=400)})
+    store.commit()
+
+    assert snapshot_store.prune_snapshots(retention_days=365) == 1
+    assert snapshot_store.load_snapshot(snapshot_hash) is None
+    store.expire_all()
+    assert store.query(Tender).one().snapshot_hash is None
@@ -0,0 +1,75 @@
+import json
+
+import pytest
+
+from database import Subscription
+from subscriptions import SubscriptionIndex, is_valid_email
+
+
+def subscription(sub_id, recipient, keywords=(), categories=(), regions=(), min_budget=None):
+    return Subscription(
+        id=sub_id, recipient=recipient, keywords=json.dumps(list(keywords)),
+        categories=json.dumps(list(categories)), regions=json.dumps(list(regions)),
+        min_budget=min_budget, active=True,
+    )
+
+
+def tender(tender_id, title, category="Hochbau", location="Graz, Steiermark, Oesterreich", budget=None):
+    return {"id": tender_id, "title": title, "description": "", "category": category,
+            "location": location, "budget": budget}
+
+
+@pytest.fixture
+def index():
+    return SubscriptionIndex([
+        subscription(1, "dach@example.com", keywords=["Dachsanierung", "Dach"]),
+        subscription(2, "graz@example.com", categories=["Tiefbau"], regions=["Graz"]),
+        subscription(3, "gross@example.com", min_budget=100000),
+        subscription(4, "dach@example.com", keywords=["Fenster"], regions=["Tirol"]),
+    ])
+
+
+def test_all_conditions_must_match(index):
+    assert index.match(tender("a", "Dachsanierung Volksschule")) == {1, 3}
+    assert index.match(tender("b", "Kanalbau Lend", category="Tiefbau")) == {2, 3}
+    assert index.match(tender("c", "Kanalbau Lienz", category="Tiefbau", location="Lienz, Tirol")) == {3}
+    assert index.match(tender("d", "Neue Türen", location="Innsbruck, Tirol")) == {3}
+    # Keywords treffen auch in Komposita (wie im Kategorisierer)
+    assert index.match(tender("e", "Fenstertausch", location="Innsbruck, Tirol")) == {3, 4}
+
+
+def test_min_budget(index):
+    assert 3 not in index.match(tender("a", "Dach", budget="50.000 EUR"))
+    assert 3 in index.match(tender("b", "Dach", budget="80.000 - 120.000 EUR"))
+
+
+def test_fan_out_sends_one_digest_per_recipient(index):
+    tenders = [tender("a", "Dach und Fenster", location="Innsbruck, Tirol"), tender("b", "Lagerhalle")]
+    digests = index.fan_out(tenders)
+    assert [t["id"] for t in digests["dach@example.com"]] == ["a"]
+    assert [t["id"] for t in digests["gross@example.com"]] == ["a", "b"]
+    assert "graz@example.com" not in digests
+
+
+@pytest.mark.parametrize("address, valid", [
+    ("einkauf@stadt-graz.at", True),
+    ("a.b+abo@mail.example.com", True),
+    ("einkauf@stadt", False),
+    ("einkauf @stadt.at", False),
+    ("a@b.at, c@d.at", False),
+    ("Einkauf <einkauf@stadt.at>", False),
+    ("@stadt.at", False),
+])
+def test_is_valid_email(address, valid):
+    assert is_valid_email(address) is valid
+
+
+def test_api_rejects_invalid_recipient(client):
+    payload = {"recipient": "einkauf@stadt", "keywords": ["Dach"]}
+    assert client.post("/api/subscriptions", json=payload).status_code == 400
+
+    created = client.post("/api/subscriptions", json={**payload, "recipient": " einkauf@stadt.at "})
+    assert created.status_code == 200
+    assert created.json()["recipient"] == "einkauf@stadt.at"
+    response = client.put(f"/api/subscriptions/{created.json()['id']}", json={**payload, "recipient": "x@y"})
+    assert response.status_code == 400
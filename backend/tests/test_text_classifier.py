@@ -0,0 +1,23 @@
+import os
+
+from crawlers import text_classifier
+from crawlers.text_classifier import TextClassifier, get_classifier
+
+ITEM = ("errichtung einer photovoltaikanlage am dach der volksschule", "")
+
+
+def test_reloads_model_saved_by_another_process():
+    before = get_classifier()
+    assert get_classifier() is before
+
+    # Anderer Prozess trainiert und speichert ein neues Modell
+    other = TextClassifier()
+    other.fit([ITEM], ["Hochbau"])
+    other.save()
+    stat = os.stat(text_classifier.CATEGORY_MODEL_PATH)
+    os.utime(text_classifier.CATEGORY_MODEL_PATH, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    reloaded = get_classifier()
+    assert reloaded is not before
+    assert reloaded.version == other.version
+    assert get_classifier() is reloaded
@@ -0,0 +1,118 @@
+"""
+Webhook-Kanal gegen einen lokalen Stand-in-Empfaenger (http.server in einem Thread)
+"""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import outbox
+from channels import PartialDelivery
+from database import NotificationOutboxEntry
+from webhook import WebhookChannel
+
+
+class Receiver(ThreadingHTTPServer):
+    """Merkt sich jeden Request; Events in fail_events werden mit HTTP 500 beantwortet"""
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), ReceiverHandler)
+        self.requests = []
+        self.fail_events = set()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/hook"
+
+
+class ReceiverHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-Alive
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.requests.append((self.client_address, self.path, body))
+        status = 500 if body["event"] in self.server.fail_events else 204
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def receiver():
+    server = Receiver()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def item(item_id, kind, tender_id):
+    key = outbox.idempotency_key(kind, [tender_id], "hook")
+    return outbox.OutboxItem(item_id, key, "webhook", "hook", {"id": tender_id, "title": f"Tender {tender_id}"}, 0)
+
+
+def test_batch_is_one_request_per_kind(receiver):
+    channel = WebhookChannel(receiver.url)
+    try:
+        channel.send([
+            item(1, outbox.KIND_NEW_TENDERS, "a"),
+            item(2, outbox.KIND_DEADLINE_REMINDER, "b"),
+            item(3, outbox.KIND_NEW_TENDERS, "c"),
+        ])
+        channel.send([item(4, outbox.KIND_NEW_TENDERS, "d")])
+    finally:
+        channel.close()
+
+    bodies = [body for _, _, body in receiver.requests]
+    assert [(body["event"], body["count"]) for body in bodies] == [
+        ("new_tenders", 2), ("deadline_reminder", 1), ("new_tenders", 1),
+    ]
+    assert [tender["id"] for tender in bodies[0]["tenders"]] == ["a", "c"]
+    assert bodies[0]["tenders"][0]["idempotencyKey"] == item(1, outbox.KIND_NEW_TENDERS, "a").idempotency_key
+    assert {path for _, path, _ in receiver.requests} == {"/hook"}
+    # Alle Requests ueber dieselbe Keep-Alive-Verbindung
+    assert len({client for client, _, _ in receiver.requests}) == 1
+
+
+def test_failed_kind_reports_delivered_items(receiver):
+    receiver.fail_events.add("deadline_reminder")
+    channel = WebhookChannel(receiver.url)
+    new_tender = item(1, outbox.KIND_NEW_TENDERS, "a")
+    try:
+        with pytest.raises(PartialDelivery) as excinfo:
+            channel.send([new_tender, item(2, outbox.KIND_DEADLINE_REMINDER, "b")])
+    finally:
+        channel.close()
+    assert excinfo.value.delivered == [new_tender]
+
+
+def test_dispatcher_retries_only_undelivered(db, receiver):
+    from notifier import NotificationDispatcher
+
+    receiver.fail_events.add("deadline_reminder")
+    channel = WebhookChannel(receiver.url, flush_seconds=0)
+    channel.enqueue(db, [{"id": "a"}, {"id": "b"}])
+    channel.enqueue(db, [{"id": "c", "reminder_days": 7}], outbox.KIND_DEADLINE_REMINDER)
+    db.commit()
+
+    dispatcher = NotificationDispatcher([channel], poll_seconds=60)
+    assert dispatcher.shutdown(timeout=10)
+
+    entries = {
+        entry.idempotency_key.split(":", 1)[0] + "/" + json.loads(entry.payload)["id"]: entry
+        for entry in db.query(NotificationOutboxEntry)
+    }
+    assert entries["new-tenders/a"].status == outbox.STATUS_SENT
+    assert entries["new-tenders/b"].status == outbox.STATUS_SENT
+    assert entries["deadline-reminder/c"].status == outbox.STATUS_PENDING
+    assert entries["deadline-reminder/c"].attempts == 1
+    # Der Fehlschlag hat die zugestellten Tenders nicht erneut ausgeloest
+    new_requests = [body for _, _, body in receiver.requests if body["event"] == "new_tenders"]
+    assert sum(body["count"] for body in new_requests) == 2
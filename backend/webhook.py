@@ -0,0 +1,118 @@
+"""
+Webhook-Kanal: neue Ausschreibungen als JSON per HTTP POST an WEBHOOK_URL.
+
+Gedacht fuer Chat-Integrationen und eigene Dienste, die neue Tenders
+Sekunden nach dem Speichern bekommen sollen. Jeder neue Tender ist ein
+eigener Outbox-Eintrag; der Dispatcher sammelt bis zu WEBHOOK_BATCH_SIZE
+davon (oder wartet hoechstens WEBHOOK_FLUSH_SECONDS) und verschickt sie in
+einem Request:
+
+    {"event": "new_tenders", "count": 2, "tenders": [{"idempotencyKey": "...", "id": "...", ...}]}
+
+Fristerinnerungen (reminders.py) kommen als "event": "deadline_reminder"
+mit days_left und reminder_days je Tender.
+
+Die HTTP-Verbindung bleibt zwischen den Requests offen (Keep-Alive) und
+wird nach einem Abbruch einmal neu aufgebaut. Antworten ausser 2xx gelten
+als Fehler und werden ueber die Outbox wiederholt; Empfaenger erkennen
+doppelt zugestellte Tenders am idempotencyKey.
+"""
+import http.client
+import json
+import os
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+
+from dotenv import load_dotenv
+load_dotenv()
+
+import outbox
+from channels import NotificationChannel, PartialDelivery
+
+
+WEBHOOK_URL = os.getenv("WEBHOOK_URL", "")
+WEBHOOK_BATCH_SIZE = int(os.getenv("WEBHOOK_BATCH_SIZE", "20"))  # Tenders pro Request
+WEBHOOK_FLUSH_SECONDS = float(os.getenv("WEBHOOK_FLUSH_SECONDS", "5"))
+WEBHOOK_TIMEOUT = float(os.getenv("WEBHOOK_TIMEOUT", "10"))
+
+CHANNEL_WEBHOOK = "webhook"
+
+
+class WebhookChannel(NotificationChannel):
+    """POST der neuen Tenders an eine URL (http oder https)"""
+
+    name = CHANNEL_WEBHOOK
+
+    def __init__(self, url: str = WEBHOOK_URL, batch_size: int = WEBHOOK_BATCH_SIZE,
+                 flush_seconds: float = WEBHOOK_FLUSH_SECONDS, timeout: float = WEBHOOK_TIMEOUT):
+        self.url = url
+        self.batch_size = max(batch_size, 1)
+        self.flush_seconds = flush_seconds
+        self.timeout = timeout
+        parts = urlsplit(url)
+        self._https = parts.scheme == "https"
+        self._host = parts.hostname
+        self._port = parts.port
+        self._path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        self._connection: Optional[http.client.HTTPConnection] = None
+
+    def is_configured(self) -> bool:
+        return bool(self._host)
+
+    def enqueue(self, db, tenders: List[Dict[str, Any]], kind: str = outbox.KIND_NEW_TENDERS):
+        for tender, notification_id in zip(tenders, outbox.notification_ids(tenders)):
+            key = outbox.idempotency_key(kind, [notification_id], self.url)
+            outbox.enqueue(db, CHANNEL_WEBHOOK, key, tender, self.url)
+
+    def _connect(self) -> http.client.HTTPConnection:
+        if self._connection is None:
+            connection_class = http.client.HTTPSConnection if self._https else http.client.HTTPConnection
+            self._connection = connection_class(self._host, self._port, timeout=self.timeout)
+        return self._connection
+
+    def _post(self, body: bytes) -> int:
+        connection = self._connect()
+        try:
+            connection.request("POST", self._path, body, {"Content-Type": "application/json"})
+            response = connection.getresponse()
+            response.read()  # Antwort vollstaendig lesen, sonst ist die Verbindung nicht wiederverwendbar
+        except Exception:
+            self.close()
+            raise
+        if response.will_close:
+            self.close()
+        return response.status
+
+    def _send_event(self, event: str, items: List[outbox.OutboxItem]):
+        body = json.dumps({
+            "event": event,
+            "count": len(items),
+            "tenders": [{"idempotencyKey": item.idempotency_key, **item.payload} for item in items],
+        }, ensure_ascii=False, default=str).encode("utf-8")
+
+        try:
+            status = self._post(body)
+        except (http.client.HTTPException, ConnectionError):
+            # Server hat die Keep-Alive-Verbindung zwischenzeitlich geschlossen
+            status = self._post(body)
+        if not 200 <= status < 300:
+            raise http.client.HTTPException(f"Webhook antwortet mit HTTP {status}")
+
+    def send(self, items: List[outbox.OutboxItem]):
+        # Ein Request pro Art (new_tenders, deadline_reminder); schon zugestellte
+        # Arten werden bei einem spaeteren Fehler nicht wiederholt
+        by_kind: Dict[str, List[outbox.OutboxItem]] = {}
+        for item in items:
+            by_kind.setdefault(item.kind, []).append(item)
+        delivered: List[outbox.OutboxItem] = []
+        for kind, kind_items in by_kind.items():
+            try:
+                self._send_event(kind.replace("-", "_"), kind_items)
+            except Exception as e:
+                raise PartialDelivery(delivered, e) from e
+            delivered.extend(kind_items)
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
@@ -15,12 +15,16 @@ export interface Tender {
   deadline: string;
   publishedAt?: string;
   budget?: string;
+  budgetMin?: number | null;
+  budgetMax?: number | null;
+  budgetCurrency?: string | null;
   category: string;
   description: string;
   status: "NEW" | "INTERESTING" | "APPLIED" | "REJECTED";
   sourceUrl: string;
   sourcePortal: string;
   crawledAt: string;
+  clusterId: string;
   aiAnalysis?: AIAnalysis;
 }
 
@@ -63,13 +67,36 @@ export interface CrawlStatus {
 
 // API Funktionen
 
+export interface TenderQuery {
+  category?: string[];
+  portal?: string[];
+  country?: string;
+  city?: string;
+  deadlineFrom?: string;
+  deadlineTo?: string;
+  dedupe?: boolean;
+  minBudget?: number;
+  maxBudget?: number;
+  sort?: "crawledAt" | "deadline" | "publishedAt" | "title";
+  order?: "asc" | "desc";
+  limit?: number;
+  offset?: number;
+}
+
 export async function fetchTenders(
   status?: string,
-  search?: string
+  search?: string,
+  query: TenderQuery = {}
 ): Promise<Tender[]> {
   const params = new URLSearchParams();
   if (status && status !== "ALL") params.append("status", status);
   if (search) params.append("search", search);
+  for (const [key, value] of Object.entries(query)) {
+    if (value === undefined || value === "") continue;
+    for (const item of Array.isArray(value) ? value : [value]) {
+      params.append(key, String(item));
+    }
+  }
 
   const url = `${API_BASE}/tenders${params.toString() ? "?" + params.toString() : ""}`;
   const response = await fetch(url);
@@ -106,6 +133,39 @@ export async function updateTenderStatus(
   }
 }
 
+export async function bulkUpdateTenderStatus(
+  ids: string[],
+  status: string
+): Promise<Record<string, "updated" | "not_found">> {
+  const response = await fetch(`${API_BASE}/tenders/status`, {
+    method: "PUT",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({ ids, status }),
+  });
+
+  if (!response.ok) {
+    throw new Error("Fehler beim Aktualisieren des Status");
+  }
+
+  const data = await response.json();
+  return data.results;
+}
+
+export async function updateTenderCategory(
+  id: string,
+  category: string
+): Promise<void> {
+  const response = await fetch(`${API_BASE}/tenders/${id}/category`, {
+    method: "PUT",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({ category }),
+  });
+
+  if (!response.ok) {
+    throw new Error("Fehler beim Aktualisieren der Kategorie");
+  }
+}
+
 export async function saveTenderAnalysis(
   id: string,
   analysis: AIAnalysis